@@ -0,0 +1,190 @@
+"""Throughput benchmark for the HTML to Markdown converter on the real theory book.
+
+Times four stages over the bundled chapters: ``convert_file`` on every HTML
+file, ``clean_markdown`` on every converted document, and
+``_remove_heading_duplicates`` / ``_remove_line_duplicates`` on every input
+they receive during conversion. Throughput is reported in MB/s of stage input.
+
+Results can be saved as a baseline and later runs compared against it; the
+script exits with status 1 if any stage is slower than the baseline by more
+than the threshold, so it can gate CI.
+
+Usage:
+    python benchmarks/bench_converter.py [--html-dir DIR] [--limit N] [--repeat N]
+        [--save-baseline FILE] [--compare FILE] [--threshold FRACTION]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from rich.console import Console
+from rich.table import Table
+
+from forerkortet_tools.html_converter import HTMLToMarkdownConverter
+
+DEFAULT_HTML_DIR = Path(__file__).parents[1] / "data" / "input" / "theory-book-html"
+
+CAPTURED = ["clean_markdown", "_remove_heading_duplicates", "_remove_line_duplicates"]
+STAGES = ["convert_file", *CAPTURED]
+
+
+def capture_inputs(converter: HTMLToMarkdownConverter, html_files: list[Path]) -> dict[str, list[str]]:
+    """Convert the chapters once and record the inputs of each captured stage."""
+    inputs: dict[str, list[str]] = {name: [] for name in CAPTURED}
+
+    for name in CAPTURED:
+        original = getattr(converter, name)
+
+        def recorder(text: str, _name: str = name, _original=original) -> str:
+            inputs[_name].append(text)
+            return _original(text)
+
+        setattr(converter, name, recorder)
+
+    for html_file in html_files:
+        converter.convert_file(html_file)
+
+    for name in CAPTURED:
+        delattr(converter, name)
+
+    return inputs
+
+
+def best_time(run: Callable[[], None], repeat: int) -> float:
+    """Get the fastest of several timed runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(html_dir: Path, limit: int | None, repeat: int) -> dict:
+    """Time every stage and return the results keyed by stage name."""
+    results = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        converter = HTMLToMarkdownConverter(html_dir, Path(output_dir), Console(quiet=True))
+        html_files = converter.find_html_files()[:limit]
+        inputs = capture_inputs(converter, html_files)
+
+        def convert_all_files() -> None:
+            for html_file in html_files:
+                converter.convert_file(html_file)
+
+        results["convert_file"] = {
+            "calls": len(html_files),
+            "bytes": sum(html_file.stat().st_size for html_file in html_files),
+            "seconds": best_time(convert_all_files, repeat),
+        }
+
+        for name in CAPTURED:
+            method = getattr(converter, name)
+            texts = inputs[name]
+
+            def call_all(_method=method, _texts=texts) -> None:
+                for text in _texts:
+                    _method(text)
+
+            results[name] = {
+                "calls": len(texts),
+                "bytes": sum(len(text.encode("utf-8")) for text in texts),
+                "seconds": best_time(call_all, repeat),
+            }
+
+    for result in results.values():
+        result["mb_per_s"] = result["bytes"] / 1e6 / result["seconds"] if result["seconds"] else 0.0
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Get the stages whose throughput dropped more than the threshold."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("stages", {}).get(name)
+        if previous and result["mb_per_s"] * (1 + threshold) < previous["mb_per_s"]:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--html-dir", type=Path, default=DEFAULT_HTML_DIR)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N chapters")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions")
+    parser.add_argument("--save-baseline", type=Path, help="Write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="Compare against a saved baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="Allowed throughput drop against the baseline (default: 0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    console = Console()
+    results = run_benchmarks(args.html_dir, args.limit, args.repeat)
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get("limit") != args.limit:
+            console.print("[yellow]⚠️  Baseline was recorded over a different set of chapters[/yellow]")
+
+    table = Table(title=f"Converter throughput over {results['convert_file']['calls']} chapters")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Input (MB)", justify="right")
+    table.add_column("Best (ms)", justify="right", style="green")
+    table.add_column("MB/s", justify="right", style="yellow")
+    if baseline:
+        table.add_column("vs baseline", justify="right")
+
+    for name in STAGES:
+        result = results[name]
+        row = [
+            name,
+            str(result["calls"]),
+            f"{result['bytes'] / 1e6:.2f}",
+            f"{result['seconds'] * 1000:.1f}",
+            f"{result['mb_per_s']:.2f}",
+        ]
+        if baseline:
+            previous = baseline.get("stages", {}).get(name)
+            if previous and previous["mb_per_s"]:
+                change = result["mb_per_s"] / previous["mb_per_s"] - 1
+                color = "red" if change < -args.threshold else "green"
+                row.append(f"[{color}]{change:+.1%}[/{color}]")
+            else:
+                row.append("-")
+        table.add_row(*row)
+
+    console.print(table)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(
+            json.dumps(
+                {"python": platform.python_version(), "limit": args.limit, "stages": results},
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        console.print(f"[green]💾 Saved baseline to: {args.save_baseline}[/green]")
+
+    if baseline:
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            console.print(
+                f"[red]❌ Throughput dropped more than {args.threshold:.0%} for: "
+                f"{', '.join(regressions)}[/red]"
+            )
+            sys.exit(1)
+        console.print(f"[green]✓ No stage regressed more than {args.threshold:.0%}[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Micro-benchmark for duplicate phrase removal on real theory-book lines.
+
+Converts the bundled theory-book chapters once to capture every argument
+passed to ``_remove_heading_duplicates`` and ``_remove_line_duplicates``,
+then times repeated calls over exactly those inputs.
+
+Usage:
+    python benchmarks/bench_duplicate_phrases.py [--html-dir DIR] [--limit N] [--repeat N]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from rich.console import Console
+from rich.table import Table
+
+from forerkortet_tools.html_converter import HTMLToMarkdownConverter
+
+DEFAULT_HTML_DIR = Path(__file__).parents[1] / "data" / "input" / "theory-book-html"
+
+METHODS = ["_remove_heading_duplicates", "_remove_line_duplicates"]
+
+
+def capture_inputs(converter: HTMLToMarkdownConverter, html_files: list[Path]) -> dict[str, list[str]]:
+    """Run the converter over the chapters and record the inputs of each method."""
+    inputs: dict[str, list[str]] = {name: [] for name in METHODS}
+
+    for name in METHODS:
+        original = getattr(converter, name)
+
+        def recorder(text: str, _name: str = name, _original=original) -> str:
+            inputs[_name].append(text)
+            return _original(text)
+
+        setattr(converter, name, recorder)
+
+    for html_file in html_files:
+        soup = BeautifulSoup(html_file.read_text(encoding="utf-8"), "lxml")
+        converter.extract_main_content(soup)
+
+    for name in METHODS:
+        delattr(converter, name)
+
+    return inputs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--html-dir", type=Path, default=DEFAULT_HTML_DIR)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N chapters")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    console = Console()
+    with tempfile.TemporaryDirectory() as output_dir:
+        converter = HTMLToMarkdownConverter(args.html_dir, Path(output_dir), Console(quiet=True))
+        html_files = converter.find_html_files()[: args.limit]
+        inputs = capture_inputs(converter, html_files)
+
+        table = Table(title=f"Duplicate phrase removal over {len(html_files)} chapters")
+        table.add_column("Method", style="cyan")
+        table.add_column("Calls", justify="right")
+        table.add_column("Words", justify="right")
+        table.add_column("Best total (ms)", justify="right", style="green")
+        table.add_column("Per call (µs)", justify="right", style="yellow")
+
+        for name in METHODS:
+            method = getattr(converter, name)
+            texts = inputs[name]
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                for text in texts:
+                    method(text)
+                best = min(best, time.perf_counter() - start)
+
+            words = sum(len(text.split()) for text in texts)
+            per_call = best / len(texts) * 1e6 if texts else 0.0
+            table.add_row(name, str(len(texts)), str(words), f"{best * 1000:.1f}", f"{per_call:.1f}")
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 """CLI commands for HTML to Markdown conversion."""
 
 import click
+from functools import partial
 from pathlib import Path
+from typing import Optional
 from rich.console import Console
 
 from ..html_converter import HTMLToMarkdownConverter
+from ..html_converter.backends import backend_names
+from ..html_converter.cleanup import CleanupPipeline
 from ..utils.console import get_console
 
 console = get_console()
@@ -29,14 +33,127 @@ def html_to_markdown():
     default="questions-generator/theory-book-markdown",
     help="Output directory for Markdown files"
 )
-def convert(html_dir: Path, output_dir: Path):
+@click.option(
+    '--jobs', '-j',
+    type=click.IntRange(min=0),
+    default=1,
+    help="Number of worker processes (0 = one per CPU core)"
+)
+@click.option(
+    '--force', is_flag=True,
+    help="Reconvert all files, even those unchanged since the last run"
+)
+@click.option(
+    '--streaming/--no-streaming',
+    default=True,
+    help="Only build a full tree for the <main> content container (default: on)"
+)
+@click.option(
+    '--profile', is_flag=True,
+    help="Show the time spent in each Markdown cleanup rule"
+)
+@click.option(
+    '--bundle',
+    type=click.Path(file_okay=True, dir_okay=False, path_type=Path),
+    help="Also write every chapter to a single JSONL book bundle"
+)
+@click.option(
+    '--trace',
+    type=click.Path(file_okay=True, dir_okay=False, path_type=Path),
+    help="Write per-stage time, peak RSS and bytes in/out of each file to this JSONL file"
+)
+@click.option(
+    '--trace-memory', is_flag=True,
+    help="With --trace, also measure allocations per stage (several times slower)"
+)
+@click.option(
+    '--markdown-backend',
+    type=click.Choice(backend_names()),
+    default="tree",
+    help="How to turn HTML into Markdown: walk the parsed tree, or re-parse with markdownify"
+)
+@click.option(
+    '--low-memory', is_flag=True,
+    help="Free each page's parse tree as soon as it is converted"
+)
+@click.option(
+    '--max-worker-rss',
+    type=click.IntRange(min=1),
+    help="Restart worker processes once one grows past this many MB of RSS (implies worker processes)"
+)
+@click.option(
+    '--watch', is_flag=True,
+    help="Keep running and reconvert chapters whenever they change"
+)
+@click.option(
+    '--poll', is_flag=True,
+    help="With --watch, poll for changes instead of using inotify"
+)
+@click.option(
+    '--debounce',
+    type=click.FloatRange(min=0),
+    default=0.5,
+    help="With --watch, seconds without changes before reconverting (default: 0.5)"
+)
+def convert(
+    html_dir: Path,
+    output_dir: Path,
+    jobs: int,
+    force: bool,
+    streaming: bool,
+    profile: bool,
+    bundle: Optional[Path],
+    trace: Optional[Path],
+    trace_memory: bool,
+    markdown_backend: str,
+    low_memory: bool,
+    max_worker_rss: Optional[int],
+    watch: bool,
+    poll: bool,
+    debounce: float,
+) -> None:
     """Convert all HTML theory book chapters to Markdown."""
     console.print(f"[bold blue]HTML to Markdown Converter[/bold blue]")
     console.print(f"Input: {html_dir}")
     console.print(f"Output: {output_dir}\n")
     
-    converter = HTMLToMarkdownConverter(html_dir, output_dir, console)
-    converter.convert_all()
+    converter = HTMLToMarkdownConverter(
+        html_dir,
+        output_dir,
+        console,
+        streaming=streaming,
+        cleanup=CleanupPipeline(profile=profile),
+        trace=trace is not None,
+        trace_allocations=trace_memory,
+        markdown_backend=markdown_backend,
+        low_memory=low_memory,
+    )
+    
+    def write_bundle(bundle_file: Path) -> None:
+        from ..question_generator.book_bundle import write_book_bundle
+        
+        chapters = write_book_bundle(output_dir, bundle_file)
+        console.print(f"[green]📦 Wrote {chapters} chapters to {bundle_file}[/green]")
+    
+    if watch:
+        from ..html_converter.watch import watch as watch_directory
+        
+        watch_directory(
+            converter,
+            jobs=jobs,
+            force=force,
+            debounce=debounce,
+            poll=poll,
+            on_rebuild=partial(write_bundle, bundle) if bundle else None,
+            trace_file=trace,
+            max_worker_rss_mb=max_worker_rss,
+        )
+        return
+    
+    converter.convert_all(jobs=jobs, force=force, trace_file=trace, max_worker_rss_mb=max_worker_rss)
+    
+    if bundle:
+        write_bundle(bundle)
 
 
 @html_to_markdown.command()
@@ -52,19 +169,46 @@ def convert(html_dir: Path, output_dir: Path):
     default="questions-generator/theory-book-markdown",
     help="Output directory for Markdown file"
 )
-def convert_single(html_file: Path, output_dir: Path):
+@click.option(
+    '--streaming/--no-streaming',
+    default=True,
+    help="Only build a full tree for the <main> content container (default: on)"
+)
+@click.option(
+    '--profile', is_flag=True,
+    help="Show the time spent in each Markdown cleanup rule"
+)
+@click.option(
+    '--markdown-backend',
+    type=click.Choice(backend_names()),
+    default="tree",
+    help="How to turn HTML into Markdown: walk the parsed tree, or re-parse with markdownify"
+)
+def convert_single(
+    html_file: Path, output_dir: Path, streaming: bool, profile: bool, markdown_backend: str
+) -> None:
     """Convert a single HTML file to Markdown."""
     console.print(f"[bold blue]Converting single file[/bold blue]")
     console.print(f"Input: {html_file}")
     console.print(f"Output: {output_dir}\n")
     
-    converter = HTMLToMarkdownConverter(html_file.parent, output_dir, console)
+    converter = HTMLToMarkdownConverter(
+        html_file.parent,
+        output_dir,
+        console,
+        streaming=streaming,
+        cleanup=CleanupPipeline(profile=profile),
+        markdown_backend=markdown_backend,
+    )
     output_file = converter.convert_file(html_file)
     
     if output_file:
         console.print(f"\n[green]✓ Converted to: {output_file}[/green]")
     else:
         console.print(f"\n[red]✗ Conversion failed[/red]")
+    
+    if converter.cleanup.profile is not None:
+        console.print(converter.cleanup.profile.to_table())
 
 
 @html_to_markdown.command()
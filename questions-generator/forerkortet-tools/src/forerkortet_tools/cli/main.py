@@ -8,6 +8,8 @@ from ..utils.console import get_console
 from .html_converter_cli import html_to_markdown
 from .road_signs_cli import road_signs
 from .question_generator_cli import questions
+from .sample_questions_cli import sample_questions
+from .theory_cli import theory
 
 console = get_console()
 
@@ -21,6 +23,8 @@ def main():
     - HTML to Markdown conversion for theory books
     - Road signs data scraping
     - AI-powered question generation
+    - Sample exam question extraction
+    - Full-text search over the theory book
     """
     pass
 
@@ -29,6 +33,8 @@ def main():
 main.add_command(html_to_markdown)
 main.add_command(road_signs)
 main.add_command(questions)
+main.add_command(sample_questions)
+main.add_command(theory)
 
 
 if __name__ == "__main__":
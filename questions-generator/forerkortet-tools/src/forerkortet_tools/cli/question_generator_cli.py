@@ -2,18 +2,29 @@
 
 import json
 from pathlib import Path
+from typing import Any, Callable, TypeVar
 
 import click
 from dotenv import load_dotenv
 from rich.table import Table
 
 from ..question_generator import QuestionGenerator, RoadSignsQuestionGenerator
+from ..question_generator.chunking import DEFAULT_CHUNK_TOKENS
+from ..question_generator.rate_limiter import DEFAULT_MAX_CONCURRENCY
+from ..question_generator.response_cache import (
+    CACHE_MODES,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_MODE,
+    ResponseCache,
+)
 from ..utils.console import get_console
 
 load_dotenv()
 
 console = get_console()
 
+F = TypeVar("F", bound=Callable[..., Any])
+
 
 @click.group(name="questions")
 def questions():
@@ -21,6 +32,48 @@ def questions():
     pass
 
 
+def cache_options(command: F) -> F:
+    """Add the options for caching responses to a generation command."""
+    command = click.option(
+        "--cache-dir",
+        type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory to cache responses in (default: {DEFAULT_CACHE_DIR})",
+    )(command)
+    return click.option(
+        "--cache-mode",
+        type=click.Choice(CACHE_MODES),
+        default=DEFAULT_CACHE_MODE,
+        help="read: reuse cached responses; write: also store new ones; refresh: store "
+        f"new ones without reusing any; off: no cache (default: {DEFAULT_CACHE_MODE})",
+    )(command)
+
+
+def structured_output_option(command: F) -> F:
+    """Add the option for structured output to a generation command."""
+    return click.option(
+        "--structured-output",
+        is_flag=True,
+        help="Hold responses to the questions' JSON schema; needs a model with structured output",
+    )(command)
+
+
+def _open_cache(cache_mode: str, cache_dir: Path) -> ResponseCache | None:
+    """Create the response cache for a command, or None if caching is off."""
+    if cache_mode == "off":
+        return None
+    return ResponseCache(cache_dir, mode=cache_mode)
+
+
+def _report_requests(
+    generator: QuestionGenerator | RoadSignsQuestionGenerator, cache: ResponseCache | None
+) -> None:
+    """Show how the requests went and how the response cache was used."""
+    console.print(f"[blue]Requests: {generator.openai_client.scheduler.summary()}[/blue]")
+    if cache:
+        console.print(f"[blue]Response cache: {cache.summary()}[/blue]")
+
+
 @questions.command()
 @click.option(
     "--markdown-dir",
@@ -50,6 +103,32 @@ def questions():
     default=20,
     help="Number of incorrect answers per question",
 )
+@click.option(
+    "--bundle",
+    "-b",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=Path),
+    help="Read chapters from a book bundle instead of the markdown directory",
+)
+@click.option(
+    "--chunk-tokens",
+    type=click.IntRange(min=100),
+    default=DEFAULT_CHUNK_TOKENS,
+    help="Estimated tokens of chapter content per request; longer chapters are split (default: 3000)",
+)
+@click.option(
+    "--concurrency",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of requests in flight; above 1, chapters are generated concurrently",
+)
+@click.option(
+    "--batch-api",
+    is_flag=True,
+    help="Submit all requests as one Batch API job and wait for it; cheaper, but takes up to 24h",
+)
+@cache_options
+@structured_output_option
 @click.option("--api-key", envvar="OPENAI_API_KEY", help="OpenAI API key")
 @click.option("--api-base", help="OpenAI API base URL")
 @click.option("--model", default="gpt-4", help="Model to use for generation")
@@ -58,6 +137,13 @@ def batch(
     output: Path,
     questions_per_chapter: int,
     incorrect_answers: int,
+    bundle: Path | None,
+    chunk_tokens: int,
+    concurrency: int,
+    batch_api: bool,
+    cache_mode: str,
+    cache_dir: Path,
+    structured_output: bool,
     api_key: str,
     api_base: str,
     model: str,
@@ -65,6 +151,7 @@ def batch(
     """Generate questions from all markdown files in a directory."""
     console.print("[bold blue]Question Generator - Batch Mode[/bold blue]\n")
 
+    cache = _open_cache(cache_mode, cache_dir)
     generator = QuestionGenerator(
         openai_api_key=api_key,
         openai_api_base=api_base,
@@ -72,9 +159,19 @@ def batch(
         questions_per_chapter=questions_per_chapter,
         incorrect_answers_per_question=incorrect_answers,
         console=console,
+        max_chunk_tokens=chunk_tokens,
+        concurrency=concurrency,
+        cache=cache,
+        structured_output=structured_output,
+        batch_api=batch_api,
     )
 
-    question_bank = generator.generate_from_directory(markdown_dir, output)
+    if bundle:
+        question_bank = generator.generate_from_bundle(bundle, output)
+    else:
+        question_bank = generator.generate_from_directory(markdown_dir, output)
+
+    _report_requests(generator, cache)
 
     # Show statistics
     if question_bank.questions:
@@ -111,6 +208,26 @@ def batch(
     default=20,
     help="Number of incorrect answers per question",
 )
+@click.option(
+    "--chunk-tokens",
+    type=click.IntRange(min=100),
+    default=DEFAULT_CHUNK_TOKENS,
+    help="Estimated tokens of chapter content per request; longer chapters are split (default: 3000)",
+)
+@click.option(
+    "--concurrency",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of requests in flight; above 1, chapters are generated concurrently",
+)
+@click.option(
+    "--batch-api",
+    is_flag=True,
+    help="Submit all requests as one Batch API job and wait for it; cheaper, but takes up to 24h",
+)
+@cache_options
+@structured_output_option
 @click.option("--api-key", envvar="OPENAI_API_KEY", help="OpenAI API key")
 @click.option("--api-base", help="OpenAI API base URL")
 @click.option("--model", default="gpt-4", help="Model to use for generation")
@@ -119,6 +236,12 @@ def batch_separate(
     output_dir: Path,
     questions_per_chapter: int,
     incorrect_answers: int,
+    chunk_tokens: int,
+    concurrency: int,
+    batch_api: bool,
+    cache_mode: str,
+    cache_dir: Path,
+    structured_output: bool,
     api_key: str,
     api_base: str,
     model: str,
@@ -126,6 +249,7 @@ def batch_separate(
     """Generate questions from markdown files, creating separate JSON files per chapter."""
     console.print("[bold blue]Question Generator - Separate Files Mode[/bold blue]\n")
 
+    cache = _open_cache(cache_mode, cache_dir)
     generator = QuestionGenerator(
         openai_api_key=api_key,
         openai_api_base=api_base,
@@ -133,10 +257,17 @@ def batch_separate(
         questions_per_chapter=questions_per_chapter,
         incorrect_answers_per_question=incorrect_answers,
         console=console,
+        max_chunk_tokens=chunk_tokens,
+        concurrency=concurrency,
+        cache=cache,
+        structured_output=structured_output,
+        batch_api=batch_api,
     )
 
     question_bank = generator.generate_from_directory_separate(markdown_dir, output_dir)
 
+    _report_requests(generator, cache)
+
     # Show statistics
     if question_bank.questions:
         stats = generator.get_statistics(question_bank)
@@ -165,6 +296,14 @@ def batch_separate(
     default=20,
     help="Number of incorrect answers per question",
 )
+@click.option(
+    "--chunk-tokens",
+    type=click.IntRange(min=100),
+    default=DEFAULT_CHUNK_TOKENS,
+    help="Estimated tokens of chapter content per request; longer chapters are split (default: 3000)",
+)
+@cache_options
+@structured_output_option
 @click.option("--api-key", envvar="OPENAI_API_KEY", help="OpenAI API key")
 @click.option("--api-base", help="OpenAI API base URL")
 @click.option("--model", default="gpt-4", help="Model to use for generation")
@@ -173,6 +312,10 @@ def single(
     output: Path,
     questions: int,
     incorrect_answers: int,
+    chunk_tokens: int,
+    cache_mode: str,
+    cache_dir: Path,
+    structured_output: bool,
     api_key: str,
     api_base: str,
     model: str,
@@ -180,6 +323,7 @@ def single(
     """Generate questions from a single markdown file."""
     console.print("[bold blue]Question Generator - Single File Mode[/bold blue]\n")
 
+    cache = _open_cache(cache_mode, cache_dir)
     generator = QuestionGenerator(
         openai_api_key=api_key,
         openai_api_base=api_base,
@@ -187,9 +331,13 @@ def single(
         questions_per_chapter=questions,
         incorrect_answers_per_question=incorrect_answers,
         console=console,
+        max_chunk_tokens=chunk_tokens,
+        cache=cache,
+        structured_output=structured_output,
     )
 
     questions_list = generator.generate_from_single_file(file, output)
+    _report_requests(generator, cache)
 
     if questions_list:
         console.print(f"\n[green]Generated {len(questions_list)} questions[/green]")
@@ -221,6 +369,8 @@ def single(
     default=20,
     help="Number of incorrect answers per question",
 )
+@cache_options
+@structured_output_option
 @click.option("--api-key", envvar="OPENAI_API_KEY", help="OpenAI API key")
 @click.option("--api-base", help="OpenAI API base URL")
 @click.option("--model", default="espen-gpt-4.1", help="Model to use for vision tasks")
@@ -231,6 +381,9 @@ def road_signs(
     max_signs: int,
     categories: tuple,
     incorrect_answers: int,
+    cache_mode: str,
+    cache_dir: Path,
+    structured_output: bool,
     api_key: str,
     api_base: str,
     model: str,
@@ -239,12 +392,15 @@ def road_signs(
     """Generate questions from road signs data using vision AI."""
     console.print("[bold blue]Road Signs Question Generator[/bold blue]\n")
 
+    cache = _open_cache(cache_mode, cache_dir)
     generator = RoadSignsQuestionGenerator(
         openai_api_key=api_key,
         openai_api_base=api_base,
         model=model,
         incorrect_answers_per_question=incorrect_answers,
         console=console,
+        cache=cache,
+        structured_output=structured_output,
     )
 
     question_bank = generator.generate_from_signs_data(
@@ -255,6 +411,8 @@ def road_signs(
         require_descriptions=not no_descriptions,
     )
 
+    _report_requests(generator, cache)
+
     # Show statistics
     if question_bank.questions:
         stats = generator.get_statistics(question_bank)
@@ -287,6 +445,8 @@ def road_signs(
     default=20,
     help="Number of incorrect answers per question",
 )
+@cache_options
+@structured_output_option
 @click.option("--api-key", envvar="OPENAI_API_KEY", help="OpenAI API key")
 @click.option("--api-base", help="OpenAI API base URL")
 @click.option("--model", default="espen-gpt-4.1", help="Model to use for vision tasks")
@@ -294,29 +454,48 @@ def road_signs(
 @click.option(
     "--skip-existing", is_flag=True, help="Skip signs that already have generated JSON files"
 )
-@click.option("--concurrency", "-j", type=int, default=3, help="Number of parallel requests")
+@click.option(
+    "--concurrency",
+    "-j",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_CONCURRENCY,
+    help="Maximum number of parallel requests; fewer are sent while rate limited (default: 16)",
+)
+@click.option(
+    "--batch-api",
+    is_flag=True,
+    help="Submit all requests as one Batch API job and wait for it; cheaper, but takes up to 24h",
+)
 def road_signs_separate(
     signs_file: Path,
     output_dir: Path,
     max_signs: int,
     categories: tuple,
     incorrect_answers: int,
+    cache_mode: str,
+    cache_dir: Path,
+    structured_output: bool,
     api_key: str,
     api_base: str,
     model: str,
     no_descriptions: bool,
     skip_existing: bool,
     concurrency: int,
+    batch_api: bool,
 ):
     """Generate questions from road signs, creating separate files per sign."""
     console.print("[bold blue]Road Signs Question Generator - Separate Files Mode[/bold blue]\n")
 
+    cache = _open_cache(cache_mode, cache_dir)
     generator = RoadSignsQuestionGenerator(
         openai_api_key=api_key,
         openai_api_base=api_base,
         model=model,
         incorrect_answers_per_question=incorrect_answers,
         console=console,
+        cache=cache,
+        structured_output=structured_output,
+        concurrency=concurrency,
     )
 
     question_bank = generator.generate_from_signs_data_separate(
@@ -326,9 +505,11 @@ def road_signs_separate(
         categories=list(categories) if categories else None,
         require_descriptions=not no_descriptions,
         skip_existing=skip_existing,
-        concurrency=concurrency,
+        batch_api=batch_api,
     )
 
+    _report_requests(generator, cache)
+
     # Show statistics
     if question_bank.questions:
         stats = generator.get_statistics(question_bank)
@@ -0,0 +1,65 @@
+"""CLI commands for the sample-question corpus."""
+
+from collections import Counter
+from pathlib import Path
+
+import click
+from rich.table import Table
+
+from ..question_generator.sample_questions import extract_sample_questions, load_sample_questions
+from ..utils.console import get_console
+from ..utils.scanner import DirectoryScanner
+
+console = get_console()
+
+
+@click.group(name="sample-questions")
+def sample_questions() -> None:
+    """Extract real exam questions from saved sample-question pages."""
+    pass
+
+
+@sample_questions.command()
+@click.option(
+    "--input-dir",
+    "-i",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    default="questions-generator/forerkortet-tools/data/input/sample-questions",
+    help="Directory containing saved sample-question HTML pages",
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(file_okay=True, dir_okay=False, path_type=Path),
+    default="sample-questions.jsonl",
+    help="Output JSONL file, one question per line",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=0),
+    default=1,
+    help="Number of worker processes (0 = one per CPU core)",
+)
+def extract(input_dir: Path, output: Path, jobs: int) -> None:
+    """Extract questions, answers and explanations into a deduplicated corpus."""
+    console.print("[bold blue]Sample Questions Extractor[/bold blue]\n")
+
+    html_files = DirectoryScanner(input_dir, ".html").scan()
+    if not html_files:
+        console.print("[red]No HTML files found![/red]")
+        return
+
+    console.print(f"[blue]Found {len(html_files)} pages[/blue]")
+    written, duplicates = extract_sample_questions(html_files, output, jobs=jobs)
+
+    console.print(f"[green]✓ Wrote {written} questions to {output}[/green]")
+    console.print(f"Duplicates dropped: {duplicates}")
+
+    categories = Counter(question.category or "Unknown" for question in load_sample_questions(output))
+    table = Table(title="Questions per category")
+    table.add_column("Category", style="cyan")
+    table.add_column("Questions", justify="right", style="green")
+    for category, count in categories.most_common():
+        table.add_row(category, str(count))
+    console.print(table)
@@ -0,0 +1,71 @@
+"""CLI commands for working with the converted theory book."""
+
+import time
+from pathlib import Path
+
+import click
+from rich.markup import escape
+from rich.table import Table
+
+from ..question_generator.search import HIGHLIGHT_END, HIGHLIGHT_START, TheorySearchIndex
+from ..utils.console import get_console
+
+console = get_console()
+
+
+@click.group(name="theory")
+def theory() -> None:
+    """Search and inspect the converted theory book."""
+    pass
+
+
+@theory.command()
+@click.argument("query", nargs=-1, required=True)
+@click.option(
+    "--markdown-dir",
+    "-i",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    default="questions-generator/theory-book-markdown",
+    help="Directory containing markdown files",
+)
+@click.option("--limit", "-n", type=click.IntRange(min=1), default=10, help="Number of passages to show")
+@click.option("--all", "match_all", is_flag=True, help="Only show passages containing every word")
+def search(query: tuple[str, ...], markdown_dir: Path, limit: int, match_all: bool) -> None:
+    """Find the chapters and subsections best matching QUERY."""
+    index = TheorySearchIndex(markdown_dir)
+    try:
+        start = time.perf_counter()
+        updated, removed = index.update()
+        if updated or removed:
+            console.print(
+                f"[blue]Indexed {updated} changed chapters, removed {removed} "
+                f"in {time.perf_counter() - start:.2f}s[/blue]"
+            )
+
+        start = time.perf_counter()
+        passages = index.search(" ".join(query), limit=limit, match_all=match_all)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    finally:
+        index.close()
+
+    if not passages:
+        console.print("[yellow]No matching passages[/yellow]")
+        return
+
+    table = Table(title=f"{len(passages)} passages ({elapsed_ms:.1f} ms)", show_lines=True)
+    table.add_column("Score", justify="right", style="green")
+    table.add_column("Chapter", style="cyan")
+    table.add_column("Passage")
+    for passage in passages:
+        section = f"\n[dim]{escape(passage.section)}[/dim]" if passage.section else ""
+        snippet = (
+            escape(passage.snippet)
+            .replace(HIGHLIGHT_START, "[bold yellow]")
+            .replace(HIGHLIGHT_END, "[/bold yellow]")
+        )
+        table.add_row(
+            f"{passage.score:.2f}",
+            f"{escape(passage.chapter_number)} {escape(passage.chapter_title)}{section}",
+            snippet,
+        )
+    console.print(table)
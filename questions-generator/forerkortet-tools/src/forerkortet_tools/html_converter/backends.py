@@ -0,0 +1,79 @@
+"""Backends turning a chapter's content element into Markdown."""
+
+from typing import Any, Dict, List, Type
+
+from bs4 import Tag
+from markdownify import MarkdownConverter, markdownify
+
+# Options every backend converts with
+MARKDOWN_OPTIONS: Dict[str, Any] = {
+    "heading_style": "ATX",
+    "bullets": "-",
+    "code_language": "",
+    "strip": ["a"],
+}
+
+
+class MarkdownBackend:
+    """Converts an HTML element of an already parsed tree to Markdown."""
+
+    name = ""
+
+    def convert(self, element: Tag) -> str:
+        """Convert an element and everything inside it to Markdown."""
+        raise NotImplementedError
+
+
+class MarkdownifyBackend(MarkdownBackend):
+    """Serializes the element and lets markdownify parse and convert the markup."""
+
+    name = "markdownify"
+
+    def convert(self, element: Tag) -> str:
+        return markdownify(str(element), **MARKDOWN_OPTIONS)
+
+
+class TreeBackend(MarkdownBackend):
+    """Walks the parsed tree directly with markdownify's converter.
+
+    This skips serializing the element and parsing the markup again, and
+    produces the same Markdown as MarkdownifyBackend: the element is
+    converted as if it were the only child of a document, including the
+    document-level stripping of surrounding blank lines.
+    """
+
+    name = "tree"
+
+    def __init__(self) -> None:
+        self._converter = MarkdownConverter(**MARKDOWN_OPTIONS)
+
+    def convert(self, element: Tag) -> str:
+        # markdownify's type stubs leave out process_tag
+        markdown: str = self._converter.process_tag(  # type: ignore[attr-defined]
+            element, parent_tags={"[document]"}
+        )
+        return markdown.strip('\n')
+
+
+BACKENDS: Dict[str, Type[MarkdownBackend]] = {
+    backend.name: backend for backend in (TreeBackend, MarkdownifyBackend)
+}
+
+
+def backend_names() -> List[str]:
+    """Get the names of the available backends."""
+    return list(BACKENDS)
+
+
+def get_backend(name: str) -> MarkdownBackend:
+    """Create a backend by name.
+
+    Raises:
+        ValueError: If there is no backend with that name
+    """
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown markdown backend: {name}. Available: {', '.join(BACKENDS)}"
+        ) from None
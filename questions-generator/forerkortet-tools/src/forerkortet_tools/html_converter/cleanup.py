@@ -0,0 +1,276 @@
+"""Compiled cleanup rules applied to converted Markdown."""
+
+import re
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+from rich.table import Table
+
+from .dedupe import NearDuplicateIndex
+
+if TYPE_CHECKING:
+    from .converter import HTMLToMarkdownConverter
+
+# Patterns used by the converter outside the cleanup pipeline
+CHAPTER_NUMBER = re.compile(r'^(\d+(?:\.\d+)*)')
+TITLE_NUMBER_PREFIX = re.compile(r'^\d+(\.\d+)*\s*-?\s*')
+UNSAFE_FILENAME_CHARS = re.compile(r'[^a-zA-Z0-9æøåÆØÅ\s-]')
+NESTED_BOILERPLATE_CLASS = re.compile(r"nav|header|footer|sidebar|menu|ad", re.I)
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+\s+')
+WHITESPACE_RUN = re.compile(r'\s+')
+
+WORD = re.compile(r'\w+')
+NUMBERS_ONLY = re.compile(r'^#?\d+$')
+NAVIGATION_TEXT = re.compile(r'^(Forrige|Neste|Tilbake.*|Previous|Next)$', re.I)
+HEADING_HASHES = re.compile(r'^#+')
+HEADING_PREFIX = re.compile(r'^#+\s*')
+
+
+class RegexRule:
+    """Cleanup rule replacing every match of a compiled pattern."""
+
+    def __init__(self, pattern: str, replacement: str, flags: int = 0):
+        self.pattern = re.compile(pattern, flags)
+        self.replacement = replacement
+
+    def __call__(self, markdown: str) -> str:
+        return self.pattern.sub(self.replacement, markdown)
+
+
+class LineContext:
+    """State shared by the line rules while cleaning one document."""
+
+    def __init__(self, converter: "HTMLToMarkdownConverter", lines: List[str], markdown: str):
+        self.converter = converter
+        self.lines = lines
+        self.index = 0
+        self.seen_content = NearDuplicateIndex(
+            threshold=0.8,
+            min_words=5,
+            word_frequencies=Counter(WORD.findall(markdown.lower())),
+        )
+
+
+LineRule = Callable[[str, LineContext], Optional[str]]
+
+
+def _strip_trailing_whitespace(markdown: str) -> str:
+    return '\n'.join(line.rstrip() for line in markdown.split('\n'))
+
+
+def _drop_numbers_only(line: str, context: LineContext) -> Optional[str]:
+    # Lines that are just numbers are likely navigation/page numbers
+    return None if NUMBERS_ONLY.match(line) else line
+
+
+def _drop_navigation(line: str, context: LineContext) -> Optional[str]:
+    return None if NAVIGATION_TEXT.match(line) else line
+
+
+def _heading_duplicates(line: str, context: LineContext) -> Optional[str]:
+    hashes = HEADING_HASHES.match(line)
+    if not hashes:
+        return line
+    heading_level = len(hashes.group())
+    heading_content = HEADING_PREFIX.sub('', line)
+
+    # Fix duplicated text within headings using multiple strategies
+    cleaned_heading = context.converter._remove_heading_duplicates(heading_content)
+    return '#' * heading_level + ' ' + cleaned_heading
+
+
+def _drop_consecutive_duplicates(line: str, context: LineContext) -> Optional[str]:
+    # Compared against the previous line as it was before cleaning
+    if context.index > 0 and line == context.lines[context.index - 1].strip():
+        return None
+    return line
+
+
+def _line_duplicates(line: str, context: LineContext) -> Optional[str]:
+    if line.startswith(('#', '-', '*')):
+        return line
+    return context.converter._remove_line_duplicates(line)
+
+
+def _drop_near_duplicates(line: str, context: LineContext) -> Optional[str]:
+    # A line whose words overlap 80% with an earlier substantial line is
+    # likely a duplicate; short lines are always kept (might be important)
+    content_words = set(WORD.findall(line.lower()))
+    if len(content_words) <= 2:
+        return line
+    if context.seen_content.is_duplicate(content_words):
+        return None
+    context.seen_content.add(content_words)
+    return line
+
+
+# Rules applied to the whole document before the line rules
+DOCUMENT_RULES: Dict[str, Callable[[str], str]] = {
+    "collapse_blank_lines": RegexRule(r'\n{3,}', '\n\n'),
+    "strip_trailing_whitespace": _strip_trailing_whitespace,
+    "remove_empty_bold": RegexRule(r'\*\*\s*\*\*', ''),
+    "remove_empty_italic": RegexRule(r'__\s*__', ''),
+    "remove_empty_links": RegexRule(r'\[\s*\]\s*\(\s*\)', ''),
+}
+
+# Rules applied to each stripped, non-empty line; returning None drops the line
+LINE_RULES: Dict[str, LineRule] = {
+    "drop_numbers_only": _drop_numbers_only,
+    "drop_navigation": _drop_navigation,
+    "heading_duplicates": _heading_duplicates,
+    "drop_consecutive_duplicates": _drop_consecutive_duplicates,
+    "line_duplicates": _line_duplicates,
+    "drop_near_duplicates": _drop_near_duplicates,
+}
+
+# Rules applied to the whole document after the line rules
+FINAL_RULES: Dict[str, Callable[[str], str]] = {
+    "remove_html_comments": RegexRule(r'<!--.*?-->', '', re.DOTALL),
+    "remove_html_entities": RegexRule(r'&\w+;', ''),
+    "collapse_spaces": RegexRule(r' {2,}', ' '),
+}
+
+
+def _select(registry: Dict[str, Callable], names: Optional[Sequence[str]], stage: str) -> List[Tuple[str, Callable]]:
+    """Look up rules by name, keeping the given order."""
+    if names is None:
+        return list(registry.items())
+    unknown = [name for name in names if name not in registry]
+    if unknown:
+        raise ValueError(
+            f"Unknown {stage} rule(s): {', '.join(unknown)}. Available: {', '.join(registry)}"
+        )
+    return [(name, registry[name]) for name in names]
+
+
+class RuleProfile:
+    """Time spent in each cleanup rule, accumulated over any number of documents."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float, calls: int = 1) -> None:
+        """Record time spent in a rule."""
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + calls
+
+    def merge(self, other: "RuleProfile") -> None:
+        """Add another profile's timings to this one."""
+        for name, seconds in other.seconds.items():
+            self.add(name, seconds, other.calls[name])
+
+    def to_table(self, title: str = "Cleanup rule profile") -> Table:
+        """Render the profile as a table, most expensive rule first."""
+        total = sum(self.seconds.values())
+        table = Table(title=title)
+        table.add_column("Rule", style="cyan")
+        table.add_column("Calls", justify="right")
+        table.add_column("Total (ms)", justify="right", style="green")
+        table.add_column("Per call (µs)", justify="right", style="yellow")
+        table.add_column("Share", justify="right")
+
+        for name, seconds in sorted(self.seconds.items(), key=lambda item: -item[1]):
+            calls = self.calls[name]
+            table.add_row(
+                name,
+                str(calls),
+                f"{seconds * 1000:.1f}",
+                f"{seconds / calls * 1e6:.1f}" if calls else "-",
+                f"{seconds / total:.1%}" if total else "-",
+            )
+        return table
+
+
+class CleanupPipeline:
+    """Ordered cleanup rules applied to the Markdown of each chapter.
+
+    Cleaning runs in three stages: document rules on the whole text, line
+    rules on each stripped non-empty line, then final rules on the whole
+    text again. Each stage's rules can be chosen and reordered by name; the
+    defaults reproduce the converter's standard cleanup.
+    """
+
+    def __init__(
+        self,
+        document_rules: Optional[Sequence[str]] = None,
+        line_rules: Optional[Sequence[str]] = None,
+        final_rules: Optional[Sequence[str]] = None,
+        profile: bool = False,
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            document_rules: Names from DOCUMENT_RULES in the order to apply them
+            line_rules: Names from LINE_RULES in the order to apply them
+            final_rules: Names from FINAL_RULES in the order to apply them
+            profile: Record the time spent in each rule in ``self.profile``
+
+        Raises:
+            ValueError: If a rule name is unknown
+        """
+        self.document_rules = _select(DOCUMENT_RULES, document_rules, "document")
+        self.line_rules = _select(LINE_RULES, line_rules, "line")
+        self.final_rules = _select(FINAL_RULES, final_rules, "final")
+        self.profile: Optional[RuleProfile] = RuleProfile() if profile else None
+
+    def rule_names(self) -> Dict[str, List[str]]:
+        """Get the names of each stage's rules, in the order they are applied."""
+        return {
+            "document": [name for name, _ in self.document_rules],
+            "line": [name for name, _ in self.line_rules],
+            "final": [name for name, _ in self.final_rules],
+        }
+
+    def run(self, markdown: str, converter: "HTMLToMarkdownConverter") -> str:
+        """Clean a converted Markdown document.
+
+        Args:
+            markdown: Markdown produced from a chapter's content
+            converter: Converter providing the duplicate removal strategies
+
+        Returns:
+            Cleaned Markdown
+        """
+        for name, rule in self.document_rules:
+            markdown = self._apply_document_rule(name, rule, markdown)
+
+        lines = markdown.split('\n')
+        context = LineContext(converter, lines, markdown)
+        cleaned_lines = []
+        profile = self.profile
+
+        for i, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                cleaned_lines.append('')
+                continue
+
+            context.index = i
+            for name, rule in self.line_rules:
+                if profile is None:
+                    line = rule(line, context)
+                else:
+                    start = time.perf_counter()
+                    line = rule(line, context)
+                    profile.add(name, time.perf_counter() - start)
+                if line is None:
+                    break
+            else:
+                cleaned_lines.append(line)
+
+        markdown = '\n'.join(cleaned_lines)
+
+        for name, rule in self.final_rules:
+            markdown = self._apply_document_rule(name, rule, markdown)
+
+        return markdown.strip()
+
+    def _apply_document_rule(self, name: str, rule: Callable[[str], str], markdown: str) -> str:
+        if self.profile is None:
+            return rule(markdown)
+        start = time.perf_counter()
+        markdown = rule(markdown)
+        self.profile.add(name, time.perf_counter() - start)
+        return markdown
@@ -1,52 +1,188 @@
 """HTML to Markdown converter for Norwegian driving theory book."""
 
-import re
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Optional, Set, Tuple
+from typing import Any, Deque, Dict, Generator, Iterator, List, NamedTuple, Optional, Set, Tuple
 
-import html2text
-from bs4 import BeautifulSoup, NavigableString
-from markdownify import markdownify as md
+from bs4 import BeautifulSoup, NavigableString, Tag
 from rich.console import Console
 from rich.progress import track
 
 from ..utils.console import get_console
 from ..utils.file_utils import ensure_directory
+from ..utils.scanner import ASSET_DIR_MARKER, DirectoryScanner
+from .backends import MarkdownBackend, get_backend
+from .cleanup import (
+    CHAPTER_NUMBER,
+    NESTED_BOILERPLATE_CLASS,
+    SENTENCE_BOUNDARY,
+    TITLE_NUMBER_PREFIX,
+    UNSAFE_FILENAME_CHARS,
+    WHITESPACE_RUN,
+    CleanupPipeline,
+    RuleProfile,
+)
+from .dedupe import find_repeated_phrase
+from .manifest import BuildManifest, file_hash
+from .streaming import (
+    BOILERPLATE_TAGS,
+    CONTENT_TAG,
+    UNWANTED_ATTR_PATTERNS,
+    stream_main_content,
+)
+from .trace import (
+    NULL_STAGE,
+    ConversionTracer,
+    Stage,
+    StageData,
+    TraceSummary,
+    current_rss_kb,
+)
+
+# Bump whenever a change to the conversion logic changes the generated Markdown,
+# so incremental builds reconvert every chapter.
+CONVERTER_VERSION = "2"
+
+
+class TextLengthIndex:
+    """Length of ``get_text(strip=True)`` for every element of a tree.
+    
+    The lengths are computed in a single bottom-up pass, so looking up the
+    text length of nested containers doesn't re-walk their subtrees.
+    """
+    
+    def __init__(self, root: Tag):
+        """Index the text lengths of all elements under root.
+        
+        Args:
+            root: Tree to index; it must not be modified while the index is used
+        """
+        self._lengths: Dict[int, int] = {}
+        
+        # In reverse document order every element comes after its descendants
+        for node in reversed([root, *root.descendants]):
+            parent = node.parent
+            if isinstance(node, Tag):
+                length = self._lengths.setdefault(id(node), 0)
+            elif isinstance(node, NavigableString) and type(node) in Tag.MAIN_CONTENT_STRING_TYPES:
+                length = len(node.strip())
+            else:
+                continue
+            if parent is not None and node is not root:
+                self._lengths[id(parent)] = self._lengths.get(id(parent), 0) + length
+    
+    def length(self, element: Tag) -> int:
+        """Get the length of an element's stripped text."""
+        # Tags like <script> count their own kind of string instead; rare enough
+        # to just ask BeautifulSoup
+        if element.interesting_string_types not in (None, Tag.MAIN_CONTENT_STRING_TYPES):
+            return len(element.get_text(strip=True))
+        if id(element) not in self._lengths:
+            return len(element.get_text(strip=True))
+        return self._lengths[id(element)]
+
+
+class ConversionResult(NamedTuple):
+    """Outcome of converting one file in ``convert_all``."""
+    
+    html_file: Path
+    output_file: Optional[Path]
+    seconds: float
+    profile: Optional[RuleProfile]
+    trace: Optional[Dict[str, Any]]
+    rss_kb: Optional[int] = None
+    failed: bool = False
 
 
 class HTMLToMarkdownConverter:
     """Converts HTML theory book chapters to structured Markdown files."""
     
-    def __init__(self, html_dir: Path, output_dir: Path, console: Optional[Console] = None):
+    def __init__(
+        self,
+        html_dir: Path,
+        output_dir: Path,
+        console: Optional[Console] = None,
+        streaming: bool = True,
+        cleanup: Optional[CleanupPipeline] = None,
+        trace: bool = False,
+        trace_allocations: bool = False,
+        markdown_backend: str = "tree",
+        low_memory: bool = False,
+    ):
         """Initialize the converter.
         
         Args:
             html_dir: Directory containing HTML files
             output_dir: Directory to save markdown files
             console: Optional Rich console for output
+            streaming: Parse pages incrementally and only build a BeautifulSoup
+                tree for the content container, falling back to the full tree
+                for pages without a usable <main> element
+            cleanup: Cleanup rules applied to the converted Markdown; defaults
+                to the standard pipeline
+            trace: Record the time, peak RSS and bytes in/out of every
+                conversion stage of each file
+            trace_allocations: When tracing, also measure each stage's memory
+                allocations with tracemalloc (slow)
+            markdown_backend: Name of the backend converting HTML to Markdown,
+                see ``backends.BACKENDS``
+            low_memory: Decompose every parsed tree as soon as its file is
+                converted instead of leaving it to the garbage collector
         """
         self.html_dir = Path(html_dir)
         self.output_dir = Path(output_dir)
         self.console = console or get_console()
+        self.streaming = streaming
+        self.cleanup = cleanup or CleanupPipeline()
+        self.tracer = ConversionTracer(allocations=trace_allocations) if trace else None
+        self.markdown_backend: MarkdownBackend = get_backend(markdown_backend)
+        self.low_memory = low_memory
+        self._last_error: Optional[Exception] = None
+        self.scanner = DirectoryScanner(
+            self.html_dir, ".html", exclude=(ASSET_DIR_MARKER, "saved_resource")
+        )
         
         ensure_directory(self.output_dir)
         
-        # Configure html2text
-        self.h2t = html2text.HTML2Text()
-        self.h2t.ignore_links = False
-        self.h2t.ignore_images = False
-        self.h2t.body_width = 0  # Don't wrap lines
-        self.h2t.unicode_snob = True
-        self.h2t.skip_internal_links = True
+    def _stage(self, name: str, data_in: StageData = None) -> Stage:
+        """Context manager tracing a conversion stage, a no-op unless tracing."""
+        if self.tracer is None:
+            return NULL_STAGE
+        return self.tracer.stage(name, data_in)
+    
+    def _dispose(self, soup: BeautifulSoup) -> None:
+        """Break up a parsed tree in low-memory mode so it is freed right away.
         
+        Elements link to their parents and siblings, so a discarded tree is
+        otherwise only freed by the cyclic garbage collector, and the trees of
+        several large pages can pile up before it runs.
+        """
+        if self.low_memory:
+            soup.decompose()
+    
+    def output_version(self) -> str:
+        """Get the converter version with a fingerprint of the options affecting the output.
+        
+        Stored with each build manifest entry, so changing the backend or
+        the cleanup rules reconverts every chapter.
+        """
+        options = {
+            "streaming": self.streaming,
+            "markdown_backend": self.markdown_backend.name,
+            "cleanup": self.cleanup.rule_names(),
+        }
+        digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8'))
+        return f"{CONVERTER_VERSION}:{digest.hexdigest()[:16]}"
+    
     def find_html_files(self) -> List[Path]:
         """Find all main HTML files (excluding resource files)."""
-        html_files = []
-        for file in self.html_dir.glob("*.html"):
-            # Skip resource files
-            if "_files" not in file.name and "saved_resource" not in file.name:
-                html_files.append(file)
-        return sorted(html_files)
+        return self.scanner.scan()
     
     def extract_title(self, soup: BeautifulSoup) -> str:
         """Extract chapter title from HTML."""
@@ -64,57 +200,59 @@ class HTMLToMarkdownConverter:
         
         return "Untitled"
     
-    def extract_main_content(self, soup: BeautifulSoup) -> str:
-        """Extract the main content from the HTML."""
+    def remove_boilerplate(self, soup: BeautifulSoup) -> None:
+        """Remove scripts, navigation, cookie banners and similar elements in place."""
         # Remove script and style elements
-        for elem in soup(["script", "style", "iframe", "noscript", "nav", "header", "footer"]):
+        for elem in soup(BOILERPLATE_TAGS):
             elem.decompose()
             
         # Remove unwanted elements by class/id patterns
-        unwanted_patterns = [
-            re.compile(r"nav|menu|header|footer|sidebar|ads?|social|share|comment", re.I),
-            re.compile(r"cookie|gdpr|consent", re.I)
-        ]
-        
-        for pattern in unwanted_patterns:
+        for pattern in UNWANTED_ATTR_PATTERNS:
             for elem in soup.find_all(attrs={"class": pattern}):
                 elem.decompose()
             for elem in soup.find_all(attrs={"id": pattern}):
                 elem.decompose()
-        
-        # Try to find main content area - look for specific content containers
-        content_selectors = [
-            "main",
-            "article", 
-            "[role='main']",
-            ".content",
-            ".main-content",
-            ".course-content",
-            ".teorikurs-content",
-            "#content",
-            "#main-content"
-        ]
-        
-        content = None
-        for selector in content_selectors:
-            try:
-                content = soup.select_one(selector)
-                if content and len(content.get_text(strip=True)) > 100:
-                    break
-            except Exception:
-                continue
-        
-        # If no specific content area found, look for the largest text container
-        if not content:
-            # Find all divs and get the one with most text content
-            divs = soup.find_all("div")
-            if divs:
-                content = max(divs, key=lambda d: len(d.get_text(strip=True)), default=None)
-        
-        # Fallback to body
-        if not content:
-            content = soup.find("body")
+    
+    def extract_main_content(self, soup: BeautifulSoup) -> str:
+        """Extract the main content from the HTML."""
+        with self._stage("boilerplate"):
+            self.remove_boilerplate(soup)
+            
+            # Try to find main content area - look for specific content containers
+            content_selectors = [
+                "main",
+                "article", 
+                "[role='main']",
+                ".content",
+                ".main-content",
+                ".course-content",
+                ".teorikurs-content",
+                "#content",
+                "#main-content"
+            ]
+            
+            text_lengths = TextLengthIndex(soup)
+            
+            content = None
+            for selector in content_selectors:
+                try:
+                    content = soup.select_one(selector)
+                    if content and text_lengths.length(content) > 100:
+                        break
+                except Exception:
+                    continue
+            
+            # If no specific content area found, look for the largest text container
+            if not content:
+                # Find all divs and get the one with most text content
+                divs = soup.find_all("div")
+                if divs:
+                    content = max(divs, key=text_lengths.length, default=None)
             
+            # Fallback to body
+            if not content:
+                content = soup.find("body")
+        
         if not content:
             return ""
             
@@ -124,160 +262,76 @@ class HTMLToMarkdownConverter:
     def clean_content(self, element) -> str:
         """Clean and extract text content from HTML element."""
         # Remove navigation, headers, footers, ads
-        for unwanted in element.find_all(
-            ["nav", "header", "footer", "aside"],
-            class_=re.compile(r"nav|header|footer|sidebar|menu|ad", re.I)
-        ):
-            unwanted.decompose()
+        with self._stage("strip_nested"):
+            for unwanted in element.find_all(
+                ["nav", "header", "footer", "aside"],
+                class_=NESTED_BOILERPLATE_CLASS
+            ):
+                unwanted.decompose()
             
         # Convert to markdown
-        html_str = str(element)
-        
-        # Use markdownify for better conversion
-        markdown = md(html_str, 
-                     heading_style="ATX",
-                     bullets="-",
-                     code_language="",
-                     strip=["a"])
+        with self._stage("markdown", element) as stage:
+            markdown = self.markdown_backend.convert(element)
+            stage.set_output(markdown)
         
         # Clean up the markdown
-        markdown = self.clean_markdown(markdown)
+        with self._stage("clean_markdown", markdown) as stage:
+            markdown = self.clean_markdown(markdown)
+            stage.set_output(markdown)
         
         return markdown
     
     def clean_markdown(self, markdown: str) -> str:
-        """Clean up the converted markdown."""
-        # Remove multiple blank lines
-        markdown = re.sub(r'\n{3,}', '\n\n', markdown)
-        
-        # Remove leading/trailing whitespace from lines
-        lines = [line.rstrip() for line in markdown.split('\n')]
-        markdown = '\n'.join(lines)
-        
-        # Fix common conversion issues
-        markdown = re.sub(r'\*\*\s*\*\*', '', markdown)  # Remove empty bold
-        markdown = re.sub(r'__\s*__', '', markdown)  # Remove empty italic
-        markdown = re.sub(r'\[\s*\]\s*\(\s*\)', '', markdown)  # Remove empty links
-        
-        # Advanced duplicate removal and text cleaning
-        lines = markdown.split('\n')
-        cleaned_lines = []
-        seen_content: Set[str] = set()
-        
-        for i, line in enumerate(lines):
-            original_line = line
-            line = line.strip()
-            
-            if not line:
-                cleaned_lines.append('')
-                continue
-            
-            # Remove lines that are just numbers (likely navigation/page numbers)
-            if re.match(r'^#?\d+$', line):
-                continue
-                
-            # Remove navigation text
-            if re.match(r'^(Forrige|Neste|Tilbake.*|Previous|Next)$', line, re.I):
-                continue
-            
-            # Handle headings specially - remove duplicate heading text
-            if line.startswith('#'):
-                heading_level = len(re.match(r'^#+', line).group())
-                heading_content = re.sub(r'^#+\s*', '', line)
-                
-                # Fix duplicated text within headings using multiple strategies
-                cleaned_heading = self._remove_heading_duplicates(heading_content)
-                line = '#' * heading_level + ' ' + cleaned_heading
-            
-            # Check for duplicate consecutive content (exact match)
-            if i > 0 and line == lines[i-1].strip():
-                continue
-            
-            # Check for content that appears to be duplicated within the same line
-            if not line.startswith('#') and not line.startswith('-') and not line.startswith('*'):
-                line = self._remove_line_duplicates(line)
-            
-            # Check against previously seen content (fuzzy matching for similar content)
-            content_words = set(re.findall(r'\w+', line.lower()))
-            is_duplicate = False
-            
-            for seen in seen_content:
-                seen_words = set(re.findall(r'\w+', seen.lower()))
-                # If 80% of words overlap and both have substantial content, it's likely a duplicate
-                if (len(content_words) > 5 and len(seen_words) > 5 and 
-                    len(content_words & seen_words) / len(content_words | seen_words) > 0.8):
-                    is_duplicate = True
-                    break
-            
-            if not is_duplicate and len(content_words) > 2:  # Only track substantial content
-                seen_content.add(line)
-                cleaned_lines.append(line)
-            elif len(content_words) <= 2:  # Keep short lines (might be important)
-                cleaned_lines.append(line)
-        
-        markdown = '\n'.join(cleaned_lines)
-        
-        # Remove HTML comments
-        markdown = re.sub(r'<!--.*?-->', '', markdown, flags=re.DOTALL)
-        
-        # Clean up remaining HTML entities
-        markdown = re.sub(r'&\w+;', '', markdown)
-        
-        # Remove excessive whitespace
-        markdown = re.sub(r' {2,}', ' ', markdown)
-        
-        return markdown.strip()
+        """Clean up the converted markdown with the cleanup pipeline."""
+        return self.cleanup.run(markdown, self)
     
     def _remove_heading_duplicates(self, heading_content: str) -> str:
         """Remove duplicated text within headings using multiple strategies."""
         
-        # First check if the entire text is exactly duplicated (character level)
-        text_no_spaces = heading_content.replace(' ', '')
-        if len(text_no_spaces) % 2 == 0:
-            half_len = len(text_no_spaces) // 2
-            first_half = text_no_spaces[:half_len]
-            second_half = text_no_spaces[half_len:]
-            if first_half == second_half:
-                # The text is exactly duplicated at character level
-                # Return the first half with original spacing preserved
-                original_half_len = len(heading_content) // 2
-                return heading_content[:original_half_len]
-        
-        # Strategy 1: Check if text is simply concatenated (no spaces between duplicates)
-        words = heading_content.split()
-        
-        # Special case: check if it's just the same word repeated without spaces
-        if len(words) == 1:
-            word = words[0]
-            # Check if the word contains repeated patterns
-            for i in range(1, len(word) // 2 + 1):
-                if len(word) % i == 0:
-                    pattern = word[:i]
-                    if pattern * (len(word) // i) == word:
-                        return pattern
-        
-        # Strategy 2: Check for exact duplicates by splitting in half (word level)
-        if len(words) > 1:
-            half_len = len(words) // 2
-            first_half = ' '.join(words[:half_len])
-            second_half = ' '.join(words[half_len:])
+        # Strategies 1-3 start over whenever strategy 3 removes a repeated phrase
+        while True:
+            # First check if the entire text is exactly duplicated (character level)
+            text_no_spaces = heading_content.replace(' ', '')
+            if len(text_no_spaces) % 2 == 0:
+                half_len = len(text_no_spaces) // 2
+                first_half = text_no_spaces[:half_len]
+                second_half = text_no_spaces[half_len:]
+                if first_half == second_half:
+                    # The text is exactly duplicated at character level
+                    # Return the first half with original spacing preserved
+                    original_half_len = len(heading_content) // 2
+                    return heading_content[:original_half_len]
             
-            if first_half == second_half and half_len > 0:
-                return first_half
-        
-        # Strategy 3: Look for repeating patterns of 2+ words
-        for pattern_length in range(min(len(words) // 2, 10), 1, -1):
-            for start in range(len(words) - pattern_length):
-                pattern = words[start:start + pattern_length]
+            # Strategy 1: Check if text is simply concatenated (no spaces between duplicates)
+            words = heading_content.split()
+            
+            # Special case: check if it's just the same word repeated without spaces
+            if len(words) == 1:
+                word = words[0]
+                # Check if the word contains repeated patterns
+                for i in range(1, len(word) // 2 + 1):
+                    if len(word) % i == 0:
+                        pattern = word[:i]
+                        if pattern * (len(word) // i) == word:
+                            return pattern
+            
+            # Strategy 2: Check for exact duplicates by splitting in half (word level)
+            if len(words) > 1:
+                half_len = len(words) // 2
+                first_half = ' '.join(words[:half_len])
+                second_half = ' '.join(words[half_len:])
                 
-                # Check if this pattern repeats immediately after
-                next_start = start + pattern_length
-                if next_start + pattern_length <= len(words):
-                    next_pattern = words[next_start:next_start + pattern_length]
-                    if pattern == next_pattern:
-                        # Found a duplicate pattern, remove it
-                        new_words = words[:start + pattern_length] + words[next_start + pattern_length:]
-                        return self._remove_heading_duplicates(' '.join(new_words))
+                if first_half == second_half and half_len > 0:
+                    return first_half
+            
+            # Strategy 3: Look for patterns of 2+ words that repeat immediately after
+            repeat = find_repeated_phrase(words, min_length=2, max_length=10, adjacent=True)
+            if not repeat:
+                break
+            
+            # Found a duplicate pattern, remove it
+            _, repeat_start, pattern_length = repeat
+            heading_content = ' '.join(words[:repeat_start] + words[repeat_start + pattern_length:])
         
         # Strategy 4: Look for words that might be concatenated with other words
         # E.g., "reaksjonerOffentlige" should be split
@@ -313,8 +367,29 @@ class HTMLToMarkdownConverter:
     
     def _remove_line_duplicates(self, line: str) -> str:
         """Remove duplicated content within a single line."""
-        # Check if the line contains duplicated sentences
-        sentences = re.split(r'[.!?]+\s+', line)
+        # Sentence and phrase removal are repeated until the phrase pass finds nothing
+        while True:
+            line = self._remove_duplicate_sentences(line)
+            
+            # Check for word-level duplicates in the middle of the line
+            words = line.split()
+            if len(words) <= 4:
+                return line
+            
+            # Look for patterns where the same phrase appears twice
+            repeat = find_repeated_phrase(
+                [w.lower() for w in words], min_length=3, max_length=8
+            )
+            if not repeat:
+                return line
+            
+            # Remove the duplicate pattern
+            _, repeat_start, pattern_length = repeat
+            line = ' '.join(words[:repeat_start] + words[repeat_start + pattern_length:])
+    
+    def _remove_duplicate_sentences(self, line: str) -> str:
+        """Remove sentences that occur more than once in a line."""
+        sentences = SENTENCE_BOUNDARY.split(line)
         if len(sentences) > 1:
             unique_sentences = []
             seen_sentences: Set[str] = set()
@@ -323,7 +398,7 @@ class HTMLToMarkdownConverter:
                 sentence = sentence.strip()
                 if sentence:
                     # Normalize for comparison
-                    normalized = re.sub(r'\s+', ' ', sentence.lower())
+                    normalized = WHITESPACE_RUN.sub(' ', sentence.lower())
                     if normalized not in seen_sentences:
                         unique_sentences.append(sentence)
                         seen_sentences.add(normalized)
@@ -334,32 +409,38 @@ class HTMLToMarkdownConverter:
                 if line and not line.endswith('.'):
                     line += '.'
         
-        # Check for word-level duplicates in the middle of the line
-        words = line.split()
-        if len(words) > 4:
-            # Look for patterns where the same phrase appears twice
-            for pattern_length in range(min(len(words) // 2, 8), 2, -1):
-                for start in range(len(words) - pattern_length):
-                    pattern = words[start:start + pattern_length]
-                    pattern_str = ' '.join(pattern).lower()
-                    
-                    # Look for this pattern elsewhere in the line
-                    remaining_words = words[start + pattern_length:]
-                    remaining_str = ' '.join(remaining_words).lower()
-                    
-                    if pattern_str in remaining_str:
-                        # Find the exact position and remove the duplicate
-                        for next_start in range(len(remaining_words) - pattern_length + 1):
-                            next_pattern = remaining_words[next_start:next_start + pattern_length]
-                            if [w.lower() for w in pattern] == [w.lower() for w in next_pattern]:
-                                # Remove the duplicate pattern
-                                new_words = (words[:start + pattern_length] + 
-                                            remaining_words[:next_start] + 
-                                            remaining_words[next_start + pattern_length:])
-                                return self._remove_line_duplicates(' '.join(new_words))
-        
         return line
     
+    def _extract_streaming(self, html_file: Path) -> Optional[Tuple[str, str]]:
+        """Extract title and content with the streaming parser.
+        
+        Returns:
+            Tuple of (title, markdown content), or None if the page needs the
+            full-tree path
+        """
+        with self._stage("stream", html_file) as stage:
+            streamed = stream_main_content(html_file)
+            stage.set_output(streamed[1] if streamed else None)
+        if not streamed:
+            return None
+        
+        title, content_html = streamed
+        with self._stage("parse", content_html):
+            soup = BeautifulSoup(content_html, 'lxml')
+        
+        try:
+            with self._stage("boilerplate"):
+                self.remove_boilerplate(soup)
+                
+                # Same check the full-tree path applies before accepting <main>
+                content = soup.find(CONTENT_TAG)
+                if not content or len(content.get_text(strip=True)) <= 100:
+                    return None
+            
+            return title, self.clean_content(content)
+        finally:
+            self._dispose(soup)
+    
     def create_chapter_structure(self, chapter_num: str, title: str, content: str) -> str:
         """Create a well-structured markdown document."""
         # Extract chapter number and clean title
@@ -367,7 +448,7 @@ class HTMLToMarkdownConverter:
         main_chapter = chapter_parts[0] if chapter_parts else "0"
         
         # Clean the title
-        title = re.sub(r'^\d+(\.\d+)*\s*-?\s*', '', title)
+        title = TITLE_NUMBER_PREFIX.sub('', title)
         
         markdown = f"# Kapittel {chapter_num}: {title}\n\n"
         
@@ -383,18 +464,33 @@ class HTMLToMarkdownConverter:
         return markdown
     
     def convert_file(self, html_file: Path) -> Optional[Path]:
-        """Convert a single HTML file to Markdown."""
+        """Convert a single HTML file to Markdown.
+        
+        Returns:
+            Path of the written file, or None if the file had too little
+            content or failed to convert
+        """
+        self._last_error = None
         try:
-            # Read HTML file
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # Parse HTML
-            soup = BeautifulSoup(html_content, 'lxml')
+            extracted = self._extract_streaming(html_file) if self.streaming else None
             
-            # Extract components
-            title = self.extract_title(soup)
-            content = self.extract_main_content(soup)
+            if extracted:
+                title, content = extracted
+            else:
+                # Read and parse HTML file
+                with self._stage("parse", html_file):
+                    with open(html_file, 'r', encoding='utf-8') as f:
+                        html_content = f.read()
+                    
+                    soup = BeautifulSoup(html_content, 'lxml')
+                    del html_content
+                
+                # Extract components
+                try:
+                    title = self.extract_title(soup)
+                    content = self.extract_main_content(soup)
+                finally:
+                    self._dispose(soup)
             
             if not content or len(content.strip()) < 100:
                 self.console.print(f"[yellow]⚠️  Skipping {html_file.name} - insufficient content[/yellow]")
@@ -402,47 +498,250 @@ class HTMLToMarkdownConverter:
             
             # Extract chapter number from filename
             filename = html_file.stem
-            chapter_match = re.match(r'^(\d+(?:\.\d+)*)', filename)
+            chapter_match = CHAPTER_NUMBER.match(filename)
             chapter_num = chapter_match.group(1) if chapter_match else "0"
             
-            # Create structured markdown
-            markdown = self.create_chapter_structure(chapter_num, title, content)
-            
-            # Save to file
-            output_filename = f"{chapter_num} - {re.sub(r'[^a-zA-Z0-9æøåÆØÅ\s-]', '', title)}.md"
-            output_file = self.output_dir / output_filename
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(markdown)
+            with self._stage("write", content) as stage:
+                # Create structured markdown
+                markdown = self.create_chapter_structure(chapter_num, title, content)
+                
+                # Save to file
+                safe_title = UNSAFE_FILENAME_CHARS.sub('', title)
+                output_filename = f"{chapter_num} - {safe_title}.md"
+                output_file = self.output_dir / output_filename
+                
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(markdown)
+                stage.set_output(markdown)
             
             return output_file
             
         except Exception as e:
+            self._last_error = e
             self.console.print(f"[red]❌ Error converting {html_file.name}: {e}[/red]")
             return None
     
-    def convert_all(self) -> Tuple[int, int]:
+    def convert_all(
+        self,
+        jobs: int = 1,
+        force: bool = False,
+        trace_file: Optional[Path] = None,
+        files: Optional[List[Path]] = None,
+        max_worker_rss_mb: Optional[int] = None,
+        trace_append: bool = False,
+    ) -> Tuple[int, int]:
         """Convert all HTML files to Markdown.
         
+        Conversion is incremental: a build manifest in the output directory
+        records each source file's hash, and files whose hash and converter
+        version, including the options affecting the output, are unchanged
+        are not converted again. Files that failed to convert are retried on
+        the next run. Outputs whose source file has disappeared are deleted.
+        
+        Args:
+            jobs: Number of worker processes to convert with. 1 converts in
+                this process, 0 uses one worker per CPU core.
+            force: Reconvert every file, ignoring the build manifest
+            trace_file: Write each file's stage trace to this JSONL file;
+                only used when the converter was created with trace=True
+            files: Only consider these HTML files for conversion, e.g. the
+                ones known to have changed. Outputs of removed sources are
+                still deleted.
+            max_worker_rss_mb: Replace the worker processes once one of them
+                has grown past this resident set size. Setting it always
+                converts in worker processes, even with a single job.
+            trace_append: Add to the trace file instead of overwriting it
+        
         Returns:
-            Tuple of (successful conversions, total files)
+            Tuple of (successful conversions, total files considered)
         """
         html_files = self.find_html_files()
+        manifest = BuildManifest(self.output_dir, self.output_version())
+        if not force:
+            manifest.load()
+        
+        for removed in manifest.prune(html_files):
+            self.console.print(f"[yellow]🗑  Removed {removed.name} - source file is gone[/yellow]")
+        
+        if files is not None:
+            selected = {Path(html_file) for html_file in files}
+            html_files = [html_file for html_file in html_files if html_file in selected]
         
         if not html_files:
-            self.console.print("[red]No HTML files found![/red]")
+            manifest.save()
+            if files is None:
+                self.console.print("[red]No HTML files found![/red]")
             return 0, 0
         
-        self.console.print(f"[green]Found {len(html_files)} HTML files to convert[/green]")
+        source_hashes = {html_file: file_hash(html_file) for html_file in html_files}
+        up_to_date = {
+            html_file for html_file in html_files
+            if manifest.is_current(html_file, source_hashes[html_file])
+        }
+        stale_files = [html_file for html_file in html_files if html_file not in up_to_date]
         
-        successful = 0
-        for html_file in track(html_files, description="Converting files...", console=self.console):
-            output_file = self.convert_file(html_file)
-            if output_file:
-                successful += 1
-                self.console.print(f"[green]✓[/green] {html_file.name} → {output_file.name}")
+        self.console.print(f"[green]Found {len(html_files)} HTML files to convert[/green]")
+        if up_to_date:
+            self.console.print(f"[blue]Skipping {len(up_to_date)} unchanged files[/blue]")
+        
+        successful = sum(1 for html_file in up_to_date if manifest.output_for(html_file))
+        start = time.perf_counter()
+        
+        if jobs <= 0:
+            jobs = os.cpu_count() or 1
+        jobs = min(jobs, len(stale_files))
+        
+        pool_results = None
+        results: Iterator[ConversionResult]
+        if jobs > 1 or (jobs and max_worker_rss_mb is not None):
+            self.console.print(f"[blue]Using {jobs} worker process{'es' if jobs > 1 else ''}[/blue]")
+            max_worker_rss_kb = max_worker_rss_mb * 1024 if max_worker_rss_mb is not None else None
+            results = pool_results = self._convert_in_pool(stale_files, jobs, max_worker_rss_kb)
+        else:
+            results = map(self._timed_convert, stale_files)
+        
+        run_profile = RuleProfile() if self.cleanup.profile is not None else None
+        trace_summary = TraceSummary() if self.tracer is not None else None
+        
+        # Cleanups run in reverse order once the loop finishes or fails
+        with ExitStack() as stack:
+            stack.callback(manifest.save)
+            if self.tracer is not None:
+                stack.callback(self.tracer.close)
+            if pool_results is not None:
+                # Shuts the worker pool down
+                stack.callback(pool_results.close)
+            trace_out = None
+            if trace_file and self.tracer:
+                trace_mode = 'a' if trace_append else 'w'
+                trace_out = stack.enter_context(open(trace_file, trace_mode, encoding='utf-8'))
+            
+            for result in track(
+                results, total=len(stale_files), description="Converting files...", console=self.console
+            ):
+                html_file, output_file = result.html_file, result.output_file
+                if not result.failed:
+                    manifest.record(html_file, source_hashes[html_file], output_file)
+                if run_profile is not None and result.profile is not None:
+                    run_profile.merge(result.profile)
+                if trace_summary is not None and result.trace is not None:
+                    trace_summary.add(result.trace)
+                    if trace_out:
+                        trace_out.write(json.dumps(result.trace, ensure_ascii=False) + '\n')
+                if output_file:
+                    successful += 1
+                    self.console.print(
+                        f"[green]✓[/green] {html_file.name} → {output_file.name} [dim]({result.seconds:.2f}s)[/dim]"
+                    )
         
         self.console.print(f"\n[bold green]Conversion complete![/bold green]")
         self.console.print(f"Successfully converted {successful}/{len(html_files)} files")
+        self.console.print(f"Total time: {time.perf_counter() - start:.2f}s")
+        
+        if run_profile is not None:
+            self.cleanup.profile = run_profile
+            self.console.print(run_profile.to_table())
+        
+        if trace_summary is not None and trace_summary.files:
+            self.console.print(trace_summary.to_table())
+            if trace_file:
+                self.console.print(f"[green]Stage trace written to {trace_file}[/green]")
         
-        return successful, len(html_files)
\ No newline at end of file
+        return successful, len(html_files)
+    
+    def _timed_convert(self, html_file: Path) -> ConversionResult:
+        """Convert a single file, measuring it and, if enabled, its rules and stages."""
+        if self.cleanup.profile is not None:
+            self.cleanup.profile = RuleProfile()
+        if self.tracer is not None:
+            self.tracer.begin(html_file)
+        start = time.perf_counter()
+        output_file = self.convert_file(html_file)
+        elapsed = time.perf_counter() - start
+        failed = self._last_error is not None
+        trace = self.tracer.end(output_file) if self.tracer is not None else None
+        return ConversionResult(
+            html_file, output_file, elapsed, self.cleanup.profile, trace, current_rss_kb(), failed
+        )
+    
+    def _create_pool(self, jobs: int) -> ProcessPoolExecutor:
+        """Start worker processes with a copy of this converter's settings."""
+        return ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(
+                self.html_dir,
+                self.output_dir,
+                {
+                    "streaming": self.streaming,
+                    "cleanup": self.cleanup,
+                    "markdown_backend": self.markdown_backend.name,
+                    "low_memory": self.low_memory,
+                },
+                self.tracer,
+            ),
+        )
+    
+    def _convert_in_pool(
+        self, html_files: List[Path], jobs: int, max_worker_rss_kb: Optional[int] = None
+    ) -> Generator[ConversionResult, None, None]:
+        """Convert files in worker processes, yielding results as they finish.
+        
+        Results are yielded in submission order, so output stays deterministic,
+        and at most two files per worker are in flight, so neither pending work
+        nor finished results pile up however many files there are. Once a
+        worker reports an RSS above max_worker_rss_kb no more files are
+        submitted; the files in flight are finished and the pool is replaced
+        with fresh workers for the rest.
+        """
+        pending = deque(html_files)
+        while pending:
+            executor = self._create_pool(jobs)
+            in_flight: Deque[Future] = deque()
+            recycle = False
+            try:
+                while pending or in_flight:
+                    while pending and not recycle and len(in_flight) < 2 * jobs:
+                        in_flight.append(executor.submit(_convert_in_worker, pending.popleft()))
+                    if not in_flight:
+                        break
+                    result = in_flight.popleft().result()
+                    if max_worker_rss_kb is not None and (result.rss_kb or 0) > max_worker_rss_kb:
+                        recycle = True
+                    yield result
+            finally:
+                executor.shutdown(cancel_futures=True)
+            if recycle and pending and max_worker_rss_kb is not None:
+                self.console.print(
+                    f"[blue]♻  Restarting workers above {max_worker_rss_kb / 1024:.0f} MB RSS[/blue]"
+                )
+
+
+# Per-process converter used by the worker pool in convert_all
+_worker_converter: Optional[HTMLToMarkdownConverter] = None
+
+
+def _init_worker(
+    html_dir: Path,
+    output_dir: Path,
+    options: Dict[str, Any],
+    tracer: Optional[ConversionTracer],
+) -> None:
+    """Create the converter once per worker process.
+
+    Args:
+        html_dir: Directory containing HTML files
+        output_dir: Directory to save markdown files
+        options: Keyword arguments for the converter
+        tracer: Tracer to record stages with, or None
+    """
+    global _worker_converter
+    _worker_converter = HTMLToMarkdownConverter(html_dir, output_dir, **options)
+    _worker_converter.tracer = tracer
+
+
+def _convert_in_worker(html_file: Path) -> ConversionResult:
+    """Convert a file inside a worker process."""
+    if _worker_converter is None:
+        raise RuntimeError("Worker process was started without a converter")
+    return _worker_converter._timed_convert(html_file)
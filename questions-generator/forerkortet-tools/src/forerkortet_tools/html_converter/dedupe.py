@@ -0,0 +1,127 @@
+"""Duplicate detection helpers for cleaning converted Markdown."""
+
+import math
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+
+class NearDuplicateIndex:
+    """Index of word sets that finds near-duplicates by Jaccard similarity.
+
+    A set is a near-duplicate of an indexed set when both have more than
+    ``min_words`` words and their Jaccard similarity is above ``threshold``.
+
+    Instead of comparing against every indexed set, this uses prefix
+    filtering: with all words sorted in one global order, two sets whose
+    similarity is above the threshold must share a word among the first
+    ``n - floor(threshold * n)`` words of each set. Only sets sharing such a
+    word are compared, so the result is exactly that of the pairwise scan.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        min_words: int = 5,
+        word_frequencies: Optional[Dict[str, int]] = None,
+    ):
+        """Initialize the index.
+
+        Args:
+            threshold: Jaccard similarity a pair has to exceed
+            min_words: Sets with this many words or fewer are never duplicates
+            word_frequencies: Optional word counts for the document. Rare words
+                are put first in the global order, which keeps candidate lists
+                short; any order gives the same results.
+        """
+        self.threshold = threshold
+        self.min_words = min_words
+        self.word_frequencies = word_frequencies or {}
+        self._sets: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+    def _prefix(self, words: Set[str]) -> List[str]:
+        """Get the words of a set that at least one near-duplicate must share."""
+        ordered = sorted(words, key=lambda w: (self.word_frequencies.get(w, 0), w))
+        prefix_length = len(words) - math.floor(self.threshold * len(words))
+        return ordered[:prefix_length]
+
+    def is_duplicate(self, words: Set[str]) -> bool:
+        """Check whether a word set is a near-duplicate of any indexed set."""
+        if len(words) <= self.min_words:
+            return False
+
+        checked: Set[int] = set()
+        for word in self._prefix(words):
+            for candidate in self._postings.get(word, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                seen_words = self._sets[candidate]
+                if len(words & seen_words) / len(words | seen_words) > self.threshold:
+                    return True
+        return False
+
+    def add(self, words: Set[str]) -> None:
+        """Add a word set to the index."""
+        # Small sets can never be part of a duplicate pair, so don't index them
+        if len(words) <= self.min_words:
+            return
+
+        set_id = len(self._sets)
+        self._sets.append(words)
+        for word in self._prefix(words):
+            self._postings[word].append(set_id)
+
+
+def find_repeated_phrase(
+    words: Sequence[str],
+    min_length: int,
+    max_length: int,
+    adjacent: bool = False,
+) -> Optional[Tuple[int, int, int]]:
+    """Find the first phrase of words that occurs again later in the list.
+
+    Longer phrases are preferred, then earlier positions, then the earliest
+    repeat. Repeats never overlap the original phrase.
+
+    Each phrase length is handled in a single pass: every n-gram is hashed
+    once into a table of its positions, so finding the next occurrence of a
+    phrase is a lookup rather than a rescan of the rest of the list.
+
+    Args:
+        words: Words to search (normalize case beforehand if needed)
+        min_length: Shortest phrase length to look for
+        max_length: Longest phrase length to look for, capped at half the words
+        adjacent: Only match a repeat that immediately follows the phrase
+
+    Returns:
+        Tuple of (phrase start, repeat start, phrase length), or None
+    """
+    n = len(words)
+
+    # Any repeated phrase starts with a repeated phrase of min_length words,
+    # so most lines are rejected by this one pass
+    shortest = [tuple(words[i:i + min_length]) for i in range(n - min_length + 1)]
+    if len(set(shortest)) == len(shortest):
+        return None
+
+    for length in range(min(n // 2, max_length), min_length - 1, -1):
+        if adjacent:
+            for start in range(n - 2 * length + 1):
+                if words[start:start + length] == words[start + length:start + 2 * length]:
+                    return start, start + length, length
+            continue
+
+        ngrams = [tuple(words[i:i + length]) for i in range(n - length + 1)]
+        positions: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        for i, ngram in enumerate(ngrams):
+            positions[ngram].append(i)
+
+        for start in range(n - 2 * length + 1):
+            occurrences = positions[ngrams[start]]
+            k = bisect_left(occurrences, start + length)
+            if k < len(occurrences):
+                return start, occurrences[k], length
+
+    return None
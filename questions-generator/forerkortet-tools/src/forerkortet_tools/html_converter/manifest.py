@@ -0,0 +1,131 @@
+"""Build manifest for incremental HTML to Markdown conversion."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MANIFEST_FILENAME = ".build-manifest.json"
+
+# Recorded outcomes of a conversion; failed conversions aren't recorded
+CONVERTED = "converted"
+INSUFFICIENT_CONTENT = "insufficient_content"
+
+
+def file_hash(path: Path) -> str:
+    """Get the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Records which source files produced which outputs, and from what input.
+
+    Entries are keyed by source filename and store the source hash, the
+    converter version, the outcome and the output filename (None if the
+    source had too little content to convert).
+    """
+
+    def __init__(self, output_dir: Path, converter_version: str):
+        """Initialize the manifest.
+
+        Args:
+            output_dir: Directory the manifest and the converted files live in
+            converter_version: Version of the conversion logic and the options
+                affecting its output; entries written by another version are
+                treated as stale
+        """
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_FILENAME
+        self.converter_version = converter_version
+        self.entries: Dict[str, Dict[str, Optional[str]]] = {}
+
+    def load(self) -> "BuildManifest":
+        """Load entries from disk, starting empty if the manifest is missing or unreadable."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = dict(data.get("files", {}))
+        except (OSError, ValueError):
+            self.entries = {}
+        return self
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        data = {"files": dict(sorted(self.entries.items()))}
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+
+    def is_current(self, source: Path, source_hash: str) -> bool:
+        """Check whether a source file's recorded output is still valid."""
+        entry = self.entries.get(source.name)
+        if not entry:
+            return False
+        if entry.get("source_hash") != source_hash:
+            return False
+        if entry.get("converter_version") != self.converter_version:
+            return False
+        outcome = entry.get("outcome")
+        if outcome == INSUFFICIENT_CONTENT:
+            return True
+        output = entry.get("output")
+        if outcome != CONVERTED or not output:
+            return False
+        return (self.output_dir / output).exists()
+
+    def output_for(self, source: Path) -> Optional[Path]:
+        """Get the recorded output path for a source file."""
+        entry = self.entries.get(source.name)
+        output = entry.get("output") if entry else None
+        if output:
+            return self.output_dir / output
+        return None
+
+    def record(self, source: Path, source_hash: str, output: Optional[Path]) -> None:
+        """Record a completed conversion of a source file.
+
+        Only conversions that ran to the end are recorded, so a file that
+        failed is converted again next time.
+
+        Args:
+            source: Source file that was converted
+            source_hash: Hash of the source file, see ``file_hash``
+            output: Output file written, or None if the source had too
+                little content; if the source previously produced a
+                different output file, the old one is deleted
+        """
+        previous = self.output_for(source)
+        if previous and (output is None or previous.name != output.name):
+            previous.unlink(missing_ok=True)
+
+        self.entries[source.name] = {
+            "source_hash": source_hash,
+            "converter_version": self.converter_version,
+            "outcome": CONVERTED if output else INSUFFICIENT_CONTENT,
+            "output": output.name if output else None,
+        }
+
+    def prune(self, sources: List[Path]) -> List[Path]:
+        """Drop entries whose source file no longer exists and delete their outputs.
+
+        Args:
+            sources: Source files that are still present
+
+        Returns:
+            List of deleted output files
+        """
+        present = {source.name for source in sources}
+        removed = []
+        for name in [name for name in self.entries if name not in present]:
+            output = self.entries.pop(name).get("output")
+            if output:
+                output_path = self.output_dir / output
+                if output_path.exists():
+                    output_path.unlink()
+                    removed.append(output_path)
+        return removed
@@ -0,0 +1,131 @@
+"""Streaming parser that keeps only the parts of a saved page the converter uses."""
+
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from lxml import etree
+
+# Elements removed before looking for the content container
+BOILERPLATE_TAGS = ["script", "style", "iframe", "noscript", "nav", "header", "footer"]
+
+# Elements removed by class/id before looking for the content container
+UNWANTED_ATTR_PATTERNS = [
+    re.compile(r"nav|menu|header|footer|sidebar|ads?|social|share|comment", re.I),
+    re.compile(r"cookie|gdpr|consent", re.I),
+]
+
+CONTENT_TAG = "main"
+
+# Elements that are written without an end tag in HTML
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+def _text(elem: etree._Element) -> str:
+    """Get an element's text the way BeautifulSoup's get_text(strip=True) does."""
+    parts = []
+    if elem.text:
+        parts.append(elem.text.strip())
+    for child in elem.iterdescendants():
+        if isinstance(child.tag, str) and child.text:
+            parts.append(child.text.strip())
+        if child.tail:
+            parts.append(child.tail.strip())
+    return "".join(parts)
+
+
+def _to_markup(elem: etree._Element) -> str:
+    """Serialize an element so that parsing it again gives the same tree.
+
+    lxml's HTML serializer percent-escapes non-ASCII characters in URL
+    attributes, which would change image paths in the output, so this writes
+    XML markup instead. Empty non-void elements get an explicit end tag, as an
+    HTML parser would otherwise leave ``<div/>`` open.
+    """
+    for child in elem.iter():
+        if (
+            isinstance(child.tag, str)
+            and child.tag not in VOID_TAGS
+            and child.text is None
+            and len(child) == 0
+        ):
+            child.text = ""
+    markup: str = etree.tostring(elem, method="xml", encoding="unicode", with_tail=False)
+    return markup
+
+
+def _is_unwanted(elem: etree._Element) -> bool:
+    """Check whether an element would be removed as boilerplate."""
+    if elem.tag in BOILERPLATE_TAGS:
+        return True
+    for attr in ("class", "id"):
+        value = elem.get(attr)
+        if value and any(pattern.search(value) for pattern in UNWANTED_ATTR_PATTERNS):
+            return True
+    return False
+
+
+def stream_main_content(html_file: Path) -> Optional[Tuple[str, str]]:
+    """Parse a saved page incrementally and return its title and content container.
+
+    The page is parsed with lxml's iterparse. Every element outside the
+    ``<main>`` container is emptied as soon as it has been parsed, and
+    boilerplate subtrees inside it (scripts, styles, navigation) are emptied
+    as they close, so neither is kept around for the rest of the parse.
+
+    The title is picked like ``HTMLToMarkdownConverter.extract_title``: the
+    first ``<title>``, else the first ``<h1>``, else the ``og:title`` meta tag.
+
+    Args:
+        html_file: Saved HTML page
+
+    Returns:
+        Tuple of (title, HTML of the first ``<main>`` element), or None when
+        the page has no usable ``<main>`` and needs the full-tree fallback
+    """
+    titles: List[Optional[str]] = [None, None, None]  # <title>, <h1>, og:title
+    content_html = None
+    content_elem = None
+    heading = None
+    excluded = False
+
+    with open(html_file, 'rb') as f:
+        for event, elem in etree.iterparse(f, events=("start", "end"), html=True, encoding="utf-8"):
+            if event == "start":
+                if elem.tag == CONTENT_TAG and content_elem is None and content_html is None:
+                    content_elem = elem
+                    # The full-tree path would remove this container along with
+                    # the boilerplate around it, so let it handle the page
+                    excluded = any(_is_unwanted(e) for e in [elem, *elem.iterancestors()])
+                elif elem.tag == "h1" and titles[1] is None and heading is None:
+                    heading = elem
+                elif elem.tag == "meta" and titles[2] is None and elem.get("property") == "og:title":
+                    titles[2] = elem.get("content", _text(elem))
+                continue
+
+            if elem.tag == "title" and titles[0] is None:
+                titles[0] = _text(elem)
+            elif elem is heading:
+                titles[1] = _text(elem)
+                heading = None
+
+            if content_elem is not None and elem is content_elem:
+                if excluded:
+                    return None
+                content_html = _to_markup(elem)
+                content_elem = None
+                elem.clear(keep_tail=True)
+            elif heading is None and (content_elem is None or elem.tag in BOILERPLATE_TAGS):
+                # Outside the container nothing else is needed; inside it,
+                # boilerplate is emptied now and removed by the converter later.
+                # Inside the first <h1> nothing is emptied until its text is read.
+                elem.clear(keep_tail=True)
+
+    if content_html is None:
+        return None
+
+    title = next((t for t in titles if t is not None), "Untitled")
+    return title, content_html
@@ -0,0 +1,218 @@
+"""Per-stage timing and memory tracing for chapter conversion."""
+
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from bs4 import Tag
+from rich.table import Table
+
+StageData = Union[str, bytes, int, Path, Tag, None]
+
+
+def _size(data: StageData) -> Optional[int]:
+    """Get the size in bytes of a stage's input or output."""
+    if data is None:
+        return None
+    if isinstance(data, int):
+        return data
+    if isinstance(data, Path):
+        return data.stat().st_size
+    if isinstance(data, Tag):
+        data = str(data)
+    if isinstance(data, str):
+        return len(data.encode('utf-8'))
+    return len(data)
+
+
+def _max_rss_kb() -> int:
+    """Get the peak resident set size of this process in kilobytes."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def current_rss_kb() -> int:
+    """Get the current resident set size of this process in kilobytes.
+
+    Falls back to the peak RSS where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm", 'rb') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return _max_rss_kb()
+    return resident_pages * resource.getpagesize() // 1024
+
+
+class _Stage:
+    """Context manager measuring one stage of a file's conversion."""
+
+    def __init__(self, tracer: "ConversionTracer", name: str, data_in: StageData):
+        self.tracer = tracer
+        self.record: Dict[str, Any] = {"stage": name, "bytes_in": _size(data_in), "bytes_out": None}
+
+    def set_output(self, data: StageData) -> None:
+        """Record what the stage produced."""
+        self.record["bytes_out"] = _size(data)
+
+    def __enter__(self) -> "_Stage":
+        if self.tracer.allocations:
+            self._allocated = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        seconds = time.perf_counter() - self._start
+        peak_alloc = None
+        if self.tracer.allocations:
+            peak_alloc = max(tracemalloc.get_traced_memory()[1] - self._allocated, 0)
+        self.record.update(seconds=seconds, peak_alloc_bytes=peak_alloc, max_rss_kb=_max_rss_kb())
+        self.tracer.stages.append(self.record)
+
+
+class _NullStage:
+    """Stand-in for _Stage when tracing is off."""
+
+    def set_output(self, data: StageData) -> None:
+        pass
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+# What a converter's stages are traced with
+Stage = Union[_Stage, _NullStage]
+
+
+class ConversionTracer:
+    """Collects a structured trace of each file's conversion stages.
+
+    For every stage this records the wall time, the process's peak RSS after
+    it, the size of its input and output in bytes and, optionally, the peak
+    of memory allocated by Python during the stage.
+    """
+
+    def __init__(self, allocations: bool = False):
+        """Initialize the tracer.
+
+        Args:
+            allocations: Also measure allocations with tracemalloc, which
+                slows conversion down several times and skews stage timings
+        """
+        self.allocations = allocations
+        self.stages: List[Dict[str, Any]] = []
+        self._file: Optional[Path] = None
+        self._start = 0.0
+        self._started_tracemalloc = False
+
+    def begin(self, html_file: Path) -> None:
+        """Start tracing the conversion of a file."""
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.stages = []
+        self._file = html_file
+        self._start = time.perf_counter()
+
+    def stage(self, name: str, data_in: StageData = None) -> _Stage:
+        """Measure a stage of the current file.
+
+        Args:
+            name: Stage name
+            data_in: The stage's input, or its size in bytes
+        """
+        return _Stage(self, name, data_in)
+
+    def end(self, output_file: Optional[Path]) -> Dict[str, Any]:
+        """Finish the current file and return its trace."""
+        trace = {
+            "file": self._file.name if self._file else None,
+            "seconds": time.perf_counter() - self._start,
+            "bytes_in": _size(self._file) if self._file else None,
+            "bytes_out": _size(output_file) if output_file else None,
+            "output": output_file.name if output_file else None,
+            "stages": self.stages,
+        }
+        self.stages = []
+        self._file = None
+        return trace
+
+    def close(self) -> None:
+        """Stop tracemalloc if this tracer started it."""
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+
+class TraceSummary:
+    """Totals per stage over the traces of many files."""
+
+    def __init__(self) -> None:
+        self.totals: Dict[str, Dict[str, Any]] = {}
+        self.files = 0
+        self.max_rss_kb = 0
+
+    def add(self, trace: Dict[str, Any]) -> None:
+        """Add a file's trace to the totals."""
+        self.files += 1
+        for record in trace["stages"]:
+            totals = self.totals.setdefault(
+                record["stage"],
+                {"calls": 0, "seconds": 0.0, "bytes_in": None, "bytes_out": None, "peak_alloc_bytes": None},
+            )
+            totals["calls"] += 1
+            totals["seconds"] += record["seconds"]
+            self.max_rss_kb = max(self.max_rss_kb, record["max_rss_kb"])
+            for key in ("bytes_in", "bytes_out"):
+                if record[key] is not None:
+                    totals[key] = (totals[key] or 0) + record[key]
+            if record["peak_alloc_bytes"] is not None:
+                totals["peak_alloc_bytes"] = max(totals["peak_alloc_bytes"] or 0, record["peak_alloc_bytes"])
+
+    def to_table(self, title: Optional[str] = None) -> Table:
+        """Render the totals as a table, in the order stages first ran."""
+        total_seconds = sum(totals["seconds"] for totals in self.totals.values())
+        table = Table(
+            title=title
+            or f"Conversion stages over {self.files} files (peak RSS {self.max_rss_kb / 1024:.0f} MB)"
+        )
+        table.add_column("Stage", style="cyan")
+        table.add_column("Calls", justify="right")
+        table.add_column("Total (s)", justify="right", style="green")
+        table.add_column("Share", justify="right")
+        table.add_column("In (MB)", justify="right")
+        table.add_column("Out (MB)", justify="right")
+        table.add_column("MB/s", justify="right", style="yellow")
+        show_allocations = any(t["peak_alloc_bytes"] is not None for t in self.totals.values())
+        if show_allocations:
+            table.add_column("Peak alloc (MB)", justify="right", style="magenta")
+
+        def megabytes(value: Optional[float]) -> str:
+            return f"{value / 1e6:.2f}" if value is not None else "-"
+
+        for name, totals in self.totals.items():
+            seconds = totals["seconds"]
+            bytes_in = totals["bytes_in"]
+            row = [
+                name,
+                str(totals["calls"]),
+                f"{seconds:.2f}",
+                f"{seconds / total_seconds:.1%}" if total_seconds else "-",
+                megabytes(bytes_in),
+                megabytes(totals["bytes_out"]),
+                f"{bytes_in / 1e6 / seconds:.2f}" if bytes_in is not None and seconds else "-",
+            ]
+            if show_allocations:
+                row.append(megabytes(totals["peak_alloc_bytes"]))
+            table.add_row(*row)
+        return table
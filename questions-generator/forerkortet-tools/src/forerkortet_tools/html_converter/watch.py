@@ -0,0 +1,249 @@
+"""Watch the theory book directory and reconvert chapters as they change."""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+from ..utils.scanner import ASSET_DIR_MARKER, DirectoryScanner
+
+if TYPE_CHECKING:
+    from .converter import HTMLToMarkdownConverter
+
+# inotify(7) constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event: int wd; uint32_t mask, cookie, len; char name[len]
+_EVENT_HEADER = struct.Struct("iIII")
+
+# A browser's "save page as" writes the page and then dozens of assets, so a
+# burst is only considered over once it has been quiet this long, but never
+# waited on for longer than the cap
+DEFAULT_DEBOUNCE = 0.5
+MAX_DEBOUNCE_WAIT = 10.0
+
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+class InotifyWatcher:
+    """Waits for HTML files in a directory to change, using Linux inotify."""
+
+    def __init__(self, directory: Union[str, Path], suffix: str = ".html"):
+        """Start watching a directory.
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+
+        self.suffix = suffix
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, os.strerror(errno), str(directory))
+
+    def _is_relevant(self, name: str) -> bool:
+        return name.endswith(self.suffix) and ASSET_DIR_MARKER not in name
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for a change to a watched file.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            True if any HTML file changed
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            readable, _, _ = select.select([self.fd], [], [], max(remaining, 0))
+            if not readable:
+                return False
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+
+            offset = 0
+            changed = False
+            while offset < len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+                offset += length
+                changed = changed or self._is_relevant(name)
+            if changed:
+                return True
+
+    def close(self) -> None:
+        """Stop watching."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Waits for HTML files to change by comparing directory snapshots."""
+
+    def __init__(self, scanner: DirectoryScanner, interval: float = 1.0):
+        """Initialize the watcher.
+
+        Args:
+            scanner: Scanner finding the watched files
+            interval: Seconds between snapshots
+        """
+        self.scanner = scanner
+        self.interval = interval
+        self._snapshot = scanner.snapshot()
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for a change to a watched file.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            True if any HTML file was added, changed or removed
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self.scanner.snapshot()
+            if snapshot != self._snapshot:
+                self._snapshot = snapshot
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        """Stop watching."""
+
+
+Watcher = Union[InotifyWatcher, PollingWatcher]
+
+
+def create_watcher(scanner: DirectoryScanner, poll: bool = False, interval: float = 1.0) -> Watcher:
+    """Create an inotify watcher, falling back to polling where unavailable.
+
+    Args:
+        scanner: Scanner finding the watched files
+        poll: Always poll instead of using inotify
+        interval: Seconds between snapshots when polling
+    """
+    if not poll:
+        try:
+            return InotifyWatcher(scanner.root, scanner.suffix)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(scanner, interval)
+
+
+def changed_files(before: Snapshot, after: Snapshot) -> Tuple[List[Path], List[Path]]:
+    """Compare two snapshots.
+
+    Returns:
+        Tuple of (added or modified files, removed files), sorted
+    """
+    changed = sorted(path for path, stat in after.items() if before.get(path) != stat)
+    removed = sorted(path for path in before if path not in after)
+    return changed, removed
+
+
+def watch(
+    converter: "HTMLToMarkdownConverter",
+    jobs: int = 1,
+    force: bool = False,
+    debounce: float = DEFAULT_DEBOUNCE,
+    poll: bool = False,
+    interval: float = 1.0,
+    stop_event: Optional[threading.Event] = None,
+    on_rebuild: Optional[Callable[[], None]] = None,
+    trace_file: Optional[Path] = None,
+    max_worker_rss_mb: Optional[int] = None,
+) -> None:
+    """Convert every chapter, then reconvert chapters whenever they change.
+
+    Changes are converted in this process, so the parser, the Markdown
+    backend and the compiled cleanup rules stay loaded between rebuilds, and
+    only the files whose modification time or size changed are reconverted.
+    Runs until interrupted or until ``stop_event`` is set.
+
+    Args:
+        converter: HTMLToMarkdownConverter to convert with
+        jobs: Worker processes for the initial full conversion
+        force: Reconvert every file in the initial conversion
+        debounce: Seconds without changes before a burst is converted
+        poll: Poll for changes instead of using inotify
+        interval: Seconds between snapshots when polling
+        stop_event: Stop watching once this event is set
+        on_rebuild: Called after the initial conversion and every rebuild
+        trace_file: Write the stage trace of the initial conversion to this
+            JSONL file, and append the trace of each rebuild, see ``convert_all``
+        max_worker_rss_mb: Replace the initial conversion's worker processes
+            once one has grown past this RSS, see ``convert_all``
+    """
+    console = converter.console
+    converter.convert_all(
+        jobs=jobs, force=force, trace_file=trace_file, max_worker_rss_mb=max_worker_rss_mb
+    )
+    if on_rebuild:
+        on_rebuild()
+
+    snapshot = converter.scanner.snapshot()
+    watcher = create_watcher(converter.scanner, poll=poll, interval=interval)
+    mode = "polling" if isinstance(watcher, PollingWatcher) else "inotify"
+    console.print(f"\n[bold blue]👀 Watching {converter.html_dir} ({mode}) - press Ctrl+C to stop[/bold blue]")
+
+    def stopped() -> bool:
+        return stop_event is not None and stop_event.is_set()
+
+    try:
+        while not stopped():
+            if not watcher.wait(0.5):
+                continue
+
+            burst_start = time.monotonic()
+            while watcher.wait(debounce) and time.monotonic() - burst_start < MAX_DEBOUNCE_WAIT:
+                pass
+
+            current = converter.scanner.snapshot()
+            changed, removed = changed_files(snapshot, current)
+            snapshot = current
+            if not changed and not removed:
+                continue
+
+            console.print(
+                f"\n[blue]🔄 {len(changed)} changed, {len(removed)} removed at {time.strftime('%H:%M:%S')}[/blue]"
+            )
+            converter.convert_all(files=changed, trace_file=trace_file, trace_append=True)
+            if on_rebuild:
+                on_rebuild()
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Stopped watching[/yellow]")
+    finally:
+        watcher.close()
@@ -0,0 +1,174 @@
+"""Submitting completion requests through the OpenAI/Azure Batch API.
+
+Batches are answered asynchronously, within 24 hours, at a lower price
+than interactive requests and outside the interactive rate limits.
+"""
+
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from rich.console import Console
+
+from ..utils.console import get_console
+
+# Chat completions endpoint of OpenAI's and of Azure OpenAI's Batch API
+OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+AZURE_BATCH_ENDPOINT = "/chat/completions"
+
+COMPLETION_WINDOW = "24h"
+DEFAULT_POLL_INTERVAL = 30.0
+
+# A batch's input file may hold at most this many requests and bytes; more
+# requests are split into several batches
+MAX_BATCH_REQUESTS = 50_000
+MAX_BATCH_BYTES = 190 * 1024 * 1024
+
+# Statuses after which a batch won't change anymore
+FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def batch_lines(requests: list[dict[str, Any]], endpoint: str) -> list[bytes]:
+    """Encode completion requests as lines of a batch input file.
+
+    Every request's ``custom_id`` is its index in ``requests``.
+    """
+    return [
+        json.dumps(
+            {"custom_id": str(i), "method": "POST", "url": endpoint, "body": request},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        + b"\n"
+        for i, request in enumerate(requests)
+    ]
+
+
+def split_batches(lines: list[bytes]) -> list[list[bytes]]:
+    """Split input file lines into batches within the Batch API's limits."""
+    batches: list[list[bytes]] = [[]]
+    size = 0
+    for line in lines:
+        if batches[-1] and (
+            len(batches[-1]) >= MAX_BATCH_REQUESTS or size + len(line) > MAX_BATCH_BYTES
+        ):
+            batches.append([])
+            size = 0
+        batches[-1].append(line)
+        size += len(line)
+    return [batch for batch in batches if batch]
+
+
+def parse_batch_output(text: str) -> dict[str, dict[str, Any]]:
+    """Get the completion choice of every successful request in a batch output file.
+
+    Returns:
+        Mapping of custom_id to the response's first choice, with its
+        message and finish reason
+    """
+    choices = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                continue
+            choices[result["custom_id"]] = dict(response["body"]["choices"][0])
+        except (ValueError, KeyError, IndexError, TypeError):
+            continue
+    return choices
+
+
+class BatchRunner:
+    """Runs completion requests as Batch API jobs and waits for their results."""
+
+    def __init__(
+        self,
+        client: Any,
+        endpoint: str = OPENAI_BATCH_ENDPOINT,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        console: Console | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialize the runner.
+
+        Args:
+            client: OpenAI or AzureOpenAI client
+            endpoint: Endpoint the requests are sent to within the batch
+            poll_interval: Seconds between checking on submitted batches
+            console: Optional Rich console for output
+            sleep: Function to wait between polls with
+        """
+        self.client = client
+        self.endpoint = endpoint
+        self.poll_interval = poll_interval
+        self.console = console or get_console()
+        self.sleep = sleep
+
+    def run(self, requests: list[dict[str, Any]]) -> list[dict[str, Any] | None]:
+        """Submit requests as batches and wait until every batch is done.
+
+        Args:
+            requests: Keyword arguments for the completions API
+
+        Returns:
+            Completion choice of every request, in order, see
+            ``parse_batch_output``, or None for requests that failed or that
+            the batch didn't get to before it expired
+        """
+        if not requests:
+            return []
+
+        batch_ids = [
+            self._submit(lines) for lines in split_batches(batch_lines(requests, self.endpoint))
+        ]
+
+        results: list[dict[str, Any] | None] = [None] * len(requests)
+        for batch_id in batch_ids:
+            batch = self._wait(batch_id)
+            if not batch.output_file_id:
+                self.console.print(
+                    f"[red]❌ Batch {batch_id} {batch.status} without results: "
+                    f"{batch.errors}[/red]"
+                )
+                continue
+            output = self.client.files.content(batch.output_file_id).text
+            for custom_id, choice in parse_batch_output(output).items():
+                results[int(custom_id)] = choice
+
+        failed = results.count(None)
+        if failed:
+            self.console.print(
+                f"[yellow]⚠️ {failed} of {len(requests)} batch requests failed[/yellow]"
+            )
+        return results
+
+    def _submit(self, lines: list[bytes]) -> str:
+        input_file = self.client.files.create(
+            file=("requests.jsonl", b"".join(lines)), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.endpoint,
+            completion_window=COMPLETION_WINDOW,
+        )
+        self.console.print(f"[blue]Submitted batch {batch.id} with {len(lines)} requests[/blue]")
+        batch_id: str = batch.id
+        return batch_id
+
+    def _wait(self, batch_id: str) -> Any:
+        last_progress = None
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            done = ""
+            if counts:
+                done = f" ({counts.completed}/{counts.total} done, {counts.failed} failed)"
+            if (batch.status, done) != last_progress:
+                last_progress = (batch.status, done)
+                self.console.print(f"[cyan]Batch {batch_id}: {batch.status}{done}[/cyan]")
+            if batch.status in FINAL_STATUSES:
+                return batch
+            self.sleep(self.poll_interval)
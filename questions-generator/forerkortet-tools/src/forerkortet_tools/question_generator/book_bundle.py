@@ -0,0 +1,93 @@
+"""Single-file book bundle with every parsed chapter of the theory book."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .markdown_reader import MarkdownReader, subsection_spans
+from .models import ChapterContent
+
+BUNDLE_FILENAME = "book.jsonl"
+
+
+def write_book_bundle(markdown_dir: Path, bundle_path: Path) -> int:
+    """Parse every chapter in a directory and write them to a bundle.
+
+    Each line of the bundle is a JSON object with the chapter's source file,
+    number, title, metadata, content and subsection offsets into the content.
+    Chapters are the ones ``MarkdownReader`` would use, parsed the same way.
+
+    Args:
+        markdown_dir: Directory of converted Markdown chapters
+        bundle_path: JSONL file to write
+
+    Returns:
+        Number of chapters written
+    """
+    reader = MarkdownReader(markdown_dir)
+    records = []
+    for file_path in reader.find_markdown_files():
+        chapter = reader.parse_file(file_path)
+        if not chapter:
+            continue
+        records.append({
+            "source": file_path.name,
+            "chapter_number": chapter.chapter_number,
+            "title": chapter.title,
+            "metadata": chapter.metadata,
+            "content": chapter.content,
+            "subsections": [
+                {"title": title, "start": start, "end": end}
+                for title, start, end in subsection_spans(chapter.content)
+            ],
+        })
+
+    bundle_path = Path(bundle_path)
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = bundle_path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    tmp_path.replace(bundle_path)
+
+    return len(records)
+
+
+def _chapter_from_record(record: Dict[str, Any]) -> ChapterContent:
+    content = record["content"]
+    return ChapterContent(
+        title=record["title"],
+        chapter_number=record["chapter_number"],
+        content=content,
+        metadata=record.get("metadata", {}),
+        subsections=[
+            {
+                'title': subsection["title"],
+                'content': content[subsection["start"]:subsection["end"]],
+                'start': subsection["start"],
+                'end': subsection["end"],
+            }
+            for subsection in record.get("subsections", [])
+        ],
+    )
+
+
+def load_book_bundle(bundle_path: Path) -> List[Tuple[str, ChapterContent]]:
+    """Load every chapter from a bundle with a single read.
+
+    Args:
+        bundle_path: Bundle written by ``write_book_bundle``
+
+    Returns:
+        List of (source filename, chapter) tuples in book order
+    """
+    with open(bundle_path, 'r', encoding='utf-8') as f:
+        data = f.read()
+
+    # JSON escapes newlines inside strings, so every line is one record
+    chapters = []
+    for line in data.split('\n'):
+        if line:
+            record = json.loads(line)
+            chapters.append((record["source"], _chapter_from_record(record)))
+    return chapters
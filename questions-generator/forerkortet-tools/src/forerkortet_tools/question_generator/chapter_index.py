@@ -0,0 +1,125 @@
+"""Persistent index of parsed chapters, keyed by file name, mtime and size."""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+INDEX_FILENAME = ".chapter-index.sqlite"
+
+# Bump whenever a change to MarkdownReader's parsing changes the chapters it
+# produces, so indexed chapters are parsed again.
+PARSER_VERSION = "2"
+
+
+class IndexEntry(NamedTuple):
+    mtime_ns: int
+    size: int
+    # Fields of the chapter as JSON, see MarkdownReader._read_fields, or None
+    # if the file has no usable chapter
+    chapter_json: Optional[str]
+
+
+class ChapterIndex:
+    """SQLite store of the chapters parsed from a directory's Markdown files.
+
+    The index is only a cache: if it can't be opened or written, e.g. on a
+    read-only directory, or is corrupt, it is rebuilt or simply not used.
+    Entries written by another parser version are ignored.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize the index.
+
+        Args:
+            path: SQLite file to store the index in
+        """
+        self.path = Path(path)
+        self._db: Optional[sqlite3.Connection] = None
+        self._entries: Optional[Dict[str, IndexEntry]] = None
+        self.enabled = True
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            try:
+                self._db = self._open()
+            except sqlite3.OperationalError:
+                raise
+            except sqlite3.DatabaseError:
+                # Corrupt or not a database; it only holds derived data
+                self.path.unlink(missing_ok=True)
+                self._db = self._open()
+        return self._db
+
+    def _open(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        try:
+            # Losing the last writes on a crash only means parsing those files again
+            db.execute("PRAGMA synchronous = OFF")
+            db.execute("PRAGMA journal_mode = MEMORY")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS chapters ("
+                "name TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, version TEXT, chapter TEXT)"
+            )
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db
+
+    def _load(self) -> Dict[str, IndexEntry]:
+        if self._entries is None:
+            self._entries = {}
+            if self.enabled:
+                try:
+                    rows = self._connect().execute(
+                        "SELECT name, mtime_ns, size, chapter FROM chapters WHERE version = ?",
+                        (PARSER_VERSION,),
+                    )
+                    self._entries = {name: IndexEntry(*entry) for name, *entry in rows}
+                except sqlite3.Error:
+                    self.enabled = False
+        return self._entries
+
+    def get(self, name: str, mtime_ns: int, size: int) -> Optional[IndexEntry]:
+        """Get a file's entry if it was indexed with this mtime and size."""
+        entry = self._load().get(name)
+        if entry is None or entry.mtime_ns != mtime_ns or entry.size != size:
+            return None
+        return entry
+
+    def put(self, name: str, mtime_ns: int, size: int, chapter_json: Optional[str]) -> None:
+        """Store the chapter parsed from a file."""
+        entries = self._load()
+        if not self.enabled:
+            return
+        try:
+            with self._connect() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO chapters VALUES (?, ?, ?, ?, ?)",
+                    (name, mtime_ns, size, PARSER_VERSION, chapter_json),
+                )
+        except sqlite3.Error:
+            self.enabled = False
+            return
+        entries[name] = IndexEntry(mtime_ns, size, chapter_json)
+
+    def prune(self, names: List[str]) -> None:
+        """Drop the entries of files that are no longer present."""
+        entries = self._load()
+        present = set(names)
+        stale = [name for name in entries if name not in present]
+        if not stale or not self.enabled:
+            return
+        try:
+            with self._connect() as db:
+                db.executemany("DELETE FROM chapters WHERE name = ?", [(name,) for name in stale])
+        except sqlite3.Error:
+            self.enabled = False
+            return
+        for name in stale:
+            del entries[name]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,167 @@
+"""Token-budgeted windows of chapter content for question generation."""
+
+import re
+from typing import NamedTuple
+
+from .markdown_reader import SUBSECTION_HEADING
+from .models import ChapterContent
+
+# Enough for the largest chapters of the book in a single window
+DEFAULT_CHUNK_TOKENS = 3000
+
+# Words and single punctuation characters, the units the estimate counts
+_TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+
+# The model never sees the images, and their hashed file paths cost more
+# tokens than most paragraphs
+IMAGE_LINK = re.compile(r"!\[[^\]\n]*\]\([^)\n]*\)")
+
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens a text is encoded as.
+
+    Every punctuation character counts as one token and every word as one
+    token per started four characters, which is close to what OpenAI's
+    tokenizers give for Norwegian prose and errs on the high side.
+    """
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PIECE.findall(text))
+
+
+class ContentChunk(NamedTuple):
+    """A window of chapter content sent to the model in one request."""
+
+    text: str
+    tokens: int
+    # Headings of the subsections the window starts or continues, in order
+    titles: list[str]
+
+
+def prompt_text(content: str) -> str:
+    """Strip what the model can't use, like image links, from chapter content."""
+    return _BLANK_LINES.sub("\n\n", IMAGE_LINK.sub("", content)).strip()
+
+
+def _sections(content: str) -> list[tuple[str | None, str]]:
+    """Split content at H2-H4 headings, keeping each heading with its text."""
+    headings = list(SUBSECTION_HEADING.finditer(content))
+    starts = [0] + [heading.start() for heading in headings]
+    titles = [None] + [heading.group(2).strip() for heading in headings]
+    ends = starts[1:] + [len(content)]
+    sections = []
+    for title, start, end in zip(titles, starts, ends, strict=True):
+        text = content[start:end].strip()
+        if text:
+            sections.append((title, text))
+    return sections
+
+
+def _split_text(text: str, max_tokens: int) -> list[str]:
+    """Split a text that is over budget at paragraph, line or word boundaries."""
+    for separator in ("\n\n", "\n", " "):
+        parts = text.split(separator)
+        if len(parts) > 1:
+            break
+    else:
+        # A single word over budget; cut it so every piece fits
+        size = max_tokens * 4
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    pieces: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for part in parts:
+        part_tokens = estimate_tokens(part)
+        if current and current_tokens + part_tokens > max_tokens:
+            pieces.append(separator.join(current))
+            current = []
+            current_tokens = 0
+        current.append(part)
+        current_tokens += part_tokens
+    if current:
+        pieces.append(separator.join(current))
+
+    split = []
+    for piece in pieces:
+        if estimate_tokens(piece) > max_tokens:
+            split.extend(_split_text(piece, max_tokens))
+        elif piece.strip():
+            split.append(piece.strip())
+    return split
+
+
+def chunk_chapter(
+    chapter: ChapterContent, max_tokens: int = DEFAULT_CHUNK_TOKENS
+) -> list[ContentChunk]:
+    """Split a chapter's content into windows along its headings.
+
+    Consecutive subsections are merged into one window while they fit the
+    budget, so short subsections share a request. A subsection that doesn't
+    fit on its own is split at paragraph boundaries, or at line and word
+    boundaries if a paragraph is over budget too. Together the windows hold
+    all of the chapter's text in order.
+
+    Args:
+        chapter: Chapter to split
+        max_tokens: Estimated tokens of content per window at most
+
+    Returns:
+        Windows in chapter order; empty if the chapter has no text
+    """
+    chunks: list[ContentChunk] = []
+    texts: list[str] = []
+    titles: list[str] = []
+    tokens = 0
+
+    def flush() -> None:
+        nonlocal texts, titles, tokens
+        if texts:
+            chunks.append(ContentChunk("\n\n".join(texts), tokens, titles))
+        texts, titles, tokens = [], [], 0
+
+    for title, text in _sections(prompt_text(chapter.content)):
+        section_tokens = estimate_tokens(text)
+        if section_tokens > max_tokens:
+            flush()
+            for piece in _split_text(text, max_tokens):
+                chunks.append(ContentChunk(piece, estimate_tokens(piece), [title] if title else []))
+            continue
+        if tokens + section_tokens > max_tokens:
+            flush()
+        texts.append(text)
+        if title:
+            titles.append(title)
+        tokens += section_tokens
+    flush()
+
+    return chunks
+
+
+def allocate_questions(chunks: list[ContentChunk], num_questions: int) -> list[int]:
+    """Divide a chapter's questions between its windows by amount of content.
+
+    Every window gets at least one question, so the whole chapter is covered
+    even when it has more windows than questions were asked for. The rest
+    are shared out in proportion to the windows' tokens, by largest
+    remainder.
+
+    Returns:
+        Number of questions for each window
+    """
+    if not chunks:
+        return []
+    counts = [1] * len(chunks)
+    remaining = num_questions - len(chunks)
+    if remaining <= 0:
+        return counts
+
+    total_tokens = sum(chunk.tokens for chunk in chunks) or len(chunks)
+    shares = [remaining * (chunk.tokens or 1) / total_tokens for chunk in chunks]
+    for i, share in enumerate(shares):
+        counts[i] += int(share)
+    leftover = num_questions - sum(counts)
+    by_remainder = sorted(range(len(chunks)), key=lambda i: shares[i] - int(shares[i]), reverse=True)
+    for i in by_remainder[:leftover]:
+        counts[i] += 1
+    return counts
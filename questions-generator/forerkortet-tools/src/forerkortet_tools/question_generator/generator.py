@@ -1,19 +1,29 @@
 """Main question generator orchestrating the process."""
 
+import asyncio
 import json
 import uuid
 from datetime import datetime
+from collections.abc import Callable, Iterable
 from pathlib import Path
 from typing import Any
 
 from rich.console import Console
-from rich.progress import track
+from rich.progress import Progress, track
 
 from ..utils.console import get_console
 from ..utils.file_utils import ensure_directory
+from .book_bundle import load_book_bundle
+from .chunking import DEFAULT_CHUNK_TOKENS
 from .markdown_reader import MarkdownReader
-from .models import Question, QuestionBank
-from .openai_client import QuestionGeneratorClient
+from .models import ChapterContent, Question, QuestionBank
+from .openai_client import AsyncQuestionGeneratorClient, QuestionGeneratorClient
+from .rate_limiter import AdaptiveScheduler
+from .response_cache import ResponseCache
+
+# Called with (source name, chapter, questions) as soon as a chapter's
+# questions are generated
+ChapterCallback = Callable[[str, ChapterContent, list[Question]], None]
 
 
 class QuestionGenerator:
@@ -27,6 +37,11 @@ class QuestionGenerator:
         questions_per_chapter: int = 5,
         incorrect_answers_per_question: int = 20,
         console: Console | None = None,
+        max_chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        concurrency: int = 1,
+        cache: ResponseCache | None = None,
+        batch_api: bool = False,
+        structured_output: bool = False,
     ):
         """Initialize the question generator.
 
@@ -37,10 +52,30 @@ class QuestionGenerator:
             questions_per_chapter: Number of questions to generate per chapter
             incorrect_answers_per_question: Number of incorrect answers per question
             console: Optional Rich console for output
+            max_chunk_tokens: Estimated tokens of chapter content per request;
+                longer chapters are split along their headings, with at least
+                one question per part
+            concurrency: Requests in flight at most; above 1, chapters are
+                generated concurrently with the asyncio client, with fewer
+                in flight while the deployment is rate limited
+            cache: Cache of responses to reuse for identical requests
+            batch_api: Submit all chapters as one Batch API job and wait for
+                it, instead of sending requests interactively
+            structured_output: Hold responses to the JSON schema of the
+                questions, for models that support structured output
         """
-        self.openai_client = QuestionGeneratorClient(
-            api_key=openai_api_key, api_base=openai_api_base, model=model
-        )
+        self._client_options: dict[str, Any] = {
+            "api_key": openai_api_key,
+            "api_base": openai_api_base,
+            "model": model,
+            "max_chunk_tokens": max_chunk_tokens,
+            "cache": cache,
+            "scheduler": AdaptiveScheduler(max_concurrency=concurrency),
+            "structured_output": structured_output,
+        }
+        self.openai_client = QuestionGeneratorClient(**self._client_options)
+        self.concurrency = concurrency
+        self.batch_api = batch_api
         self.questions_per_chapter = questions_per_chapter
         self.incorrect_answers_per_question = incorrect_answers_per_question
         self.console = console or get_console()
@@ -60,48 +95,10 @@ class QuestionGenerator:
 
         self.console.print(f"[blue]Found {len(markdown_files)} markdown files[/blue]")
 
-        question_bank = QuestionBank()
-        successful_chapters = 0
-        total_questions = 0
-
-        for file_path in track(
-            markdown_files, description="Processing chapters...", console=self.console
-        ):
-            try:
-                # Parse the chapter
-                chapter = reader.parse_file(file_path)
-                if not chapter:
-                    self.console.print(
-                        f"[yellow]⚠️  Skipping {file_path.name} - insufficient content[/yellow]"
-                    )
-                    continue
-
-                self.console.print(f"[cyan]Processing: {chapter.title}[/cyan]")
-
-                # Generate questions for this chapter
-                questions = self.openai_client.generate_questions(
-                    chapter=chapter,
-                    num_questions=self.questions_per_chapter,
-                    num_incorrect_answers=self.incorrect_answers_per_question,
-                )
-
-                if questions:
-                    for question in questions:
-                        question_bank.add_question(question)
-
-                    successful_chapters += 1
-                    total_questions += len(questions)
-                    self.console.print(
-                        f"[green]✓[/green] Generated {len(questions)} questions from {chapter.title}"
-                    )
-                else:
-                    self.console.print(
-                        f"[red]❌ Failed to generate questions from {chapter.title}[/red]"
-                    )
-
-            except Exception as e:
-                self.console.print(f"[red]❌ Error processing {file_path.name}: {e}[/red]")
-                continue
+        chapters = ((file_path.name, reader.parse_file(file_path)) for file_path in markdown_files)
+        question_bank, successful_chapters, total_questions = self._generate_for_chapters(
+            chapters, len(markdown_files)
+        )
 
         # Add metadata
         question_bank.metadata = {
@@ -123,38 +120,84 @@ class QuestionGenerator:
 
         return question_bank
 
-    def generate_from_directory_separate(
-        self, markdown_dir: Path, output_dir: Path
+    def generate_from_bundle(
+        self, bundle_path: Path, output_file: Path | None = None
     ) -> QuestionBank:
-        """Generate questions from all markdown files, creating one JSON file per chapter."""
-        self.console.print(f"[green]Reading markdown files from: {markdown_dir}[/green]")
+        """Generate questions from all chapters in a book bundle.
 
-        reader = MarkdownReader(markdown_dir)
-        markdown_files = reader.find_markdown_files()
+        The bundle is loaded with a single read, instead of opening and parsing
+        every chapter's markdown file.
+        """
+        self.console.print(f"[green]Reading book bundle: {bundle_path}[/green]")
 
-        if not markdown_files:
-            self.console.print("[red]No markdown files found![/red]")
+        chapters = load_book_bundle(bundle_path)
+
+        if not chapters:
+            self.console.print("[red]No chapters found in bundle![/red]")
             return QuestionBank()
 
-        self.console.print(f"[blue]Found {len(markdown_files)} markdown files[/blue]")
-        self.console.print(f"[blue]Output directory: {output_dir}[/blue]")
+        self.console.print(f"[blue]Found {len(chapters)} chapters[/blue]")
 
-        # Create output directory
-        ensure_directory(output_dir)
+        question_bank, successful_chapters, total_questions = self._generate_for_chapters(
+            chapters, len(chapters)
+        )
+
+        question_bank.metadata = {
+            "total_questions": total_questions,
+            "chapters_processed": successful_chapters,
+            "questions_per_chapter": self.questions_per_chapter,
+            "incorrect_answers_per_question": self.incorrect_answers_per_question,
+            "source_bundle": str(bundle_path),
+            "generated_at": datetime.now().isoformat(),
+        }
+
+        self.console.print("\n[bold green]Generation complete![/bold green]")
+        self.console.print(f"Successfully processed {successful_chapters} chapters")
+        self.console.print(f"Generated {total_questions} total questions")
+
+        if output_file:
+            self.save_question_bank(question_bank, output_file)
+
+        return question_bank
+
+    def _generate_for_chapters(
+        self,
+        chapters: Iterable[tuple[str, ChapterContent | None]],
+        total: int,
+        on_chapter: ChapterCallback | None = None,
+    ) -> tuple[QuestionBank, int, int]:
+        """Generate questions for each chapter into a single question bank.
+
+        With a concurrency above 1 the chapters are generated concurrently,
+        and reported as they finish; the question bank still lists them in
+        chapter order. With the Batch API they are all reported once the
+        batch is done.
+
+        Args:
+            chapters: (source name, parsed chapter or None if unusable) pairs
+            total: Number of chapters, for the progress bar
+            on_chapter: Called for every chapter that got questions, as soon
+                as they are generated
+
+        Returns:
+            Tuple of (question bank, chapters with questions, total questions)
+        """
+        if self.batch_api:
+            return self._batch_generate_for_chapters(chapters, on_chapter)
+        if self.concurrency > 1:
+            return asyncio.run(self._agenerate_for_chapters(chapters, total, on_chapter))
 
         question_bank = QuestionBank()
         successful_chapters = 0
         total_questions = 0
 
-        for file_path in track(
-            markdown_files, description="Processing chapters...", console=self.console
+        for source_name, chapter in track(
+            chapters, total=total, description="Processing chapters...", console=self.console
         ):
             try:
-                # Parse the chapter
-                chapter = reader.parse_file(file_path)
                 if not chapter:
                     self.console.print(
-                        f"[yellow]⚠️  Skipping {file_path.name} - insufficient content[/yellow]"
+                        f"[yellow]⚠️  Skipping {source_name} - insufficient content[/yellow]"
                     )
                     continue
 
@@ -167,50 +210,190 @@ class QuestionGenerator:
                     num_incorrect_answers=self.incorrect_answers_per_question,
                 )
 
-                if questions:
-                    # Create individual question bank for this chapter
-                    chapter_question_bank = QuestionBank(questions=questions)
-                    chapter_question_bank.metadata = {
-                        "chapter_number": chapter.chapter_number,
-                        "chapter_title": chapter.title,
-                        "total_questions": len(questions),
-                        "questions_per_chapter": self.questions_per_chapter,
-                        "incorrect_answers_per_question": self.incorrect_answers_per_question,
-                        "source_file": str(file_path),
-                        "generated_at": datetime.now().isoformat(),
-                    }
-
-                    # Generate filename based on chapter
-                    safe_chapter_name = chapter.chapter_number.replace(".", "_")
-                    safe_title = "".join(
-                        c for c in chapter.title if c.isalnum() or c in (" ", "-", "_")
-                    ).rstrip()
-                    safe_title = safe_title.replace(" ", "_")
-
-                    output_filename = f"{safe_chapter_name}_{safe_title}.json"
-                    output_file = output_dir / output_filename
-
-                    # Save individual file
-                    self.save_question_bank(chapter_question_bank, output_file)
-
-                    # Add to overall bank for statistics
+                if self._report_chapter(source_name, chapter, questions, on_chapter):
                     for question in questions:
                         question_bank.add_question(question)
 
                     successful_chapters += 1
                     total_questions += len(questions)
-                    self.console.print(
-                        f"[green]✓[/green] Generated {len(questions)} questions from {chapter.title}"
-                    )
-                else:
-                    self.console.print(
-                        f"[red]❌ Failed to generate questions from {chapter.title}[/red]"
-                    )
 
             except Exception as e:
-                self.console.print(f"[red]❌ Error processing {file_path.name}: {e}[/red]")
+                self.console.print(f"[red]❌ Error processing {source_name}: {e}[/red]")
                 continue
 
+        return question_bank, successful_chapters, total_questions
+
+    async def _agenerate_for_chapters(
+        self,
+        chapters: Iterable[tuple[str, ChapterContent | None]],
+        total: int,
+        on_chapter: ChapterCallback | None = None,
+    ) -> tuple[QuestionBank, int, int]:
+        """Generate questions for all chapters concurrently, see ``_generate_for_chapters``."""
+        async with AsyncQuestionGeneratorClient(
+            **self._client_options, max_concurrency=self.concurrency
+        ) as client:
+
+            async def generate(
+                index: int, source_name: str, chapter: ChapterContent
+            ) -> tuple[int, str, ChapterContent, list[Question], Exception | None]:
+                try:
+                    questions = await client.generate_questions(
+                        chapter=chapter,
+                        num_questions=self.questions_per_chapter,
+                        num_incorrect_answers=self.incorrect_answers_per_question,
+                    )
+                    return index, source_name, chapter, questions, None
+                except Exception as e:
+                    return index, source_name, chapter, [], e
+
+            with Progress(console=self.console) as progress:
+                task = progress.add_task("[cyan]Processing chapters...", total=total)
+
+                # Every chapter is scheduled at once; the client's semaphore
+                # bounds how many requests are actually in flight
+                pending = []
+                for index, (source_name, chapter) in enumerate(chapters):
+                    if not chapter:
+                        self.console.print(
+                            f"[yellow]⚠️  Skipping {source_name} - insufficient content[/yellow]"
+                        )
+                        progress.update(task, advance=1)
+                        continue
+                    pending.append(asyncio.create_task(generate(index, source_name, chapter)))
+
+                finished = {}
+                for next_finished in asyncio.as_completed(pending):
+                    index, source_name, chapter, questions, error = await next_finished
+                    progress.update(task, advance=1)
+                    if error:
+                        self.console.print(f"[red]❌ Error processing {source_name}: {error}[/red]")
+                        continue
+                    try:
+                        if self._report_chapter(source_name, chapter, questions, on_chapter):
+                            finished[index] = questions
+                    except Exception as e:
+                        self.console.print(f"[red]❌ Error processing {source_name}: {e}[/red]")
+
+        question_bank = QuestionBank()
+        for index in sorted(finished):
+            for question in finished[index]:
+                question_bank.add_question(question)
+        total_questions = len(question_bank.questions)
+        return question_bank, len(finished), total_questions
+
+    def _batch_generate_for_chapters(
+        self,
+        chapters: Iterable[tuple[str, ChapterContent | None]],
+        on_chapter: ChapterCallback | None = None,
+    ) -> tuple[QuestionBank, int, int]:
+        """Generate questions for all chapters in one Batch API job.
+
+        See ``_generate_for_chapters``.
+        """
+        usable = []
+        for source_name, chapter in chapters:
+            if not chapter:
+                self.console.print(
+                    f"[yellow]⚠️  Skipping {source_name} - insufficient content[/yellow]"
+                )
+                continue
+            usable.append((source_name, chapter))
+
+        self.console.print(f"[cyan]Submitting {len(usable)} chapters to the Batch API[/cyan]")
+        results = self.openai_client.generate_questions_batch(
+            [chapter for _, chapter in usable],
+            num_questions=self.questions_per_chapter,
+            num_incorrect_answers=self.incorrect_answers_per_question,
+        )
+
+        question_bank = QuestionBank()
+        successful_chapters = 0
+        for (source_name, chapter), questions in zip(usable, results, strict=True):
+            try:
+                if self._report_chapter(source_name, chapter, questions, on_chapter):
+                    for question in questions:
+                        question_bank.add_question(question)
+                    successful_chapters += 1
+            except Exception as e:
+                self.console.print(f"[red]❌ Error processing {source_name}: {e}[/red]")
+        return question_bank, successful_chapters, len(question_bank.questions)
+
+    def _report_chapter(
+        self,
+        source_name: str,
+        chapter: ChapterContent,
+        questions: list[Question],
+        on_chapter: ChapterCallback | None = None,
+    ) -> bool:
+        """Report a chapter's generated questions and pass them on.
+
+        Returns:
+            Whether the chapter got any questions
+        """
+        if not questions:
+            self.console.print(f"[red]❌ Failed to generate questions from {chapter.title}[/red]")
+            return False
+
+        if on_chapter:
+            on_chapter(source_name, chapter, questions)
+        self.console.print(
+            f"[green]✓[/green] Generated {len(questions)} questions from {chapter.title}"
+        )
+        return True
+
+    def generate_from_directory_separate(
+        self, markdown_dir: Path, output_dir: Path
+    ) -> QuestionBank:
+        """Generate questions from all markdown files, creating one JSON file per chapter."""
+        self.console.print(f"[green]Reading markdown files from: {markdown_dir}[/green]")
+
+        reader = MarkdownReader(markdown_dir)
+        markdown_files = reader.find_markdown_files()
+
+        if not markdown_files:
+            self.console.print("[red]No markdown files found![/red]")
+            return QuestionBank()
+
+        self.console.print(f"[blue]Found {len(markdown_files)} markdown files[/blue]")
+        self.console.print(f"[blue]Output directory: {output_dir}[/blue]")
+
+        # Create output directory
+        ensure_directory(output_dir)
+
+        def save_chapter(
+            source_name: str, chapter: ChapterContent, questions: list[Question]
+        ) -> None:
+            # Create individual question bank for this chapter
+            chapter_question_bank = QuestionBank(questions=questions)
+            chapter_question_bank.metadata = {
+                "chapter_number": chapter.chapter_number,
+                "chapter_title": chapter.title,
+                "total_questions": len(questions),
+                "questions_per_chapter": self.questions_per_chapter,
+                "incorrect_answers_per_question": self.incorrect_answers_per_question,
+                "source_file": str(Path(markdown_dir) / source_name),
+                "generated_at": datetime.now().isoformat(),
+            }
+
+            # Generate filename based on chapter
+            safe_chapter_name = chapter.chapter_number.replace(".", "_")
+            safe_title = "".join(
+                c for c in chapter.title if c.isalnum() or c in (" ", "-", "_")
+            ).rstrip()
+            safe_title = safe_title.replace(" ", "_")
+
+            output_filename = f"{safe_chapter_name}_{safe_title}.json"
+            output_file = output_dir / output_filename
+
+            # Save individual file
+            self.save_question_bank(chapter_question_bank, output_file)
+
+        chapters = ((file_path.name, reader.parse_file(file_path)) for file_path in markdown_files)
+        question_bank, successful_chapters, total_questions = self._generate_for_chapters(
+            chapters, len(markdown_files), on_chapter=save_chapter
+        )
+
         # Add metadata to overall bank
         question_bank.metadata = {
             "total_questions": total_questions,
@@ -1,72 +1,174 @@
 """Markdown file reader for theory content."""
 
+import json
 import re
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from ..utils.scanner import MTIME_GRACE_NS, DirectoryScanner
+from .chapter_index import INDEX_FILENAME, ChapterIndex
 from .models import ChapterContent
 
+# An H2-H4 heading line; the whitespace after the hashes can't span lines
+SUBSECTION_HEADING = re.compile(r'^(#{2,4})[^\S\n]+(.+)$', re.MULTILINE)
+
+# YAML frontmatter at the start of a file
+FRONTMATTER = re.compile(r'^---\n(.*?)\n---\n', re.DOTALL)
+
+
+def subsection_spans(content: str) -> List[Tuple[str, int, int]]:
+    """Find the H2-H4 subsections of a chapter's content.
+    
+    A subsection runs from its heading to the next one. Its span excludes the
+    heading line and leading/trailing whitespace, so ``content[start:end]``
+    is the subsection's text.
+    
+    Args:
+        content: Chapter content
+        
+    Returns:
+        List of (title, start, end) tuples
+    """
+    headings = list(SUBSECTION_HEADING.finditer(content))
+    spans = []
+    for i, heading_match in enumerate(headings):
+        start = heading_match.end() + 1
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(content)
+        while start < end and content[start].isspace():
+            start += 1
+        while end > start and content[end - 1].isspace():
+            end -= 1
+        spans.append((heading_match.group(2).strip(), start, end))
+    return spans
+
 
 class MarkdownReader:
     """Reader for markdown theory files."""
     
-    def __init__(self, markdown_dir: Path):
+    def __init__(self, markdown_dir: Path, use_index: bool = True):
         """Initialize the markdown reader.
         
         Args:
             markdown_dir: Directory containing markdown files
+            use_index: Keep parsed chapters in an index file in the directory,
+                so unchanged files aren't read and parsed again
         """
         self.markdown_dir = Path(markdown_dir)
+        self.scanner = DirectoryScanner(self.markdown_dir, ".md")
+        self.index = ChapterIndex(self.markdown_dir / INDEX_FILENAME) if use_index else None
         
     def find_markdown_files(self) -> List[Path]:
         """Find all markdown files in the directory."""
+        files = self.scanner.scan()
+        if self.index is not None:
+            self.index.prune([file.name for file in files])
+        
         markdown_files = []
-        for file in self.markdown_dir.glob("*.md"):
+        for file in files:
             # Skip summary/intro files that might not have substantial content
             if not any(skip in file.name.lower() for skip in ["nøkkelord", "fullført", "oppsummering"]):
                 markdown_files.append(file)
         return sorted(markdown_files)
     
     def parse_file(self, file_path: Path) -> Optional[ChapterContent]:
-        """Parse a single markdown file."""
+        """Parse a single markdown file, or load it from the index if unchanged."""
+        file_path = Path(file_path)
+        if self.index is None or file_path.parent != self.markdown_dir:
+            return self._parse_file(file_path)
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract metadata if present
-            metadata = self._extract_metadata(content)
-            
-            # Extract title and chapter number
-            title, chapter_number = self._extract_title_and_chapter(file_path.name, content)
-            
-            # Clean and extract main content
-            main_content = self._extract_main_content(content)
-            
-            # Extract subsections
-            subsections = self._extract_subsections(content)
-            
-            # Only return if we have substantial content
-            if len(main_content.strip()) < 100:
+            stat = file_path.stat()
+        except OSError:
+            return self._parse_file(file_path)
+        
+        entry = self.index.get(file_path.name, stat.st_mtime_ns, stat.st_size)
+        if entry is not None:
+            if entry.chapter_json is None:
                 return None
-                
-            return ChapterContent(
-                title=title,
-                chapter_number=chapter_number,
-                content=main_content,
-                metadata=metadata,
-                subsections=subsections
+            return self._chapter(json.loads(entry.chapter_json))
+        
+        try:
+            fields = self._read_fields(file_path)
+        except Exception as e:
+            print(f"Error parsing {file_path}: {e}")
+            return None
+        
+        # A file changed again within the same mtime tick would go unnoticed
+        if time.time_ns() - stat.st_mtime_ns > MTIME_GRACE_NS:
+            self.index.put(
+                file_path.name,
+                stat.st_mtime_ns,
+                stat.st_size,
+                json.dumps(fields, ensure_ascii=False) if fields else None,
             )
-            
+        return self._chapter(fields) if fields else None
+    
+    def _parse_file(self, file_path: Path) -> Optional[ChapterContent]:
+        """Parse a single markdown file, reporting errors."""
+        try:
+            return self._parse(file_path)
         except Exception as e:
             print(f"Error parsing {file_path}: {e}")
             return None
     
+    def _parse(self, file_path: Path) -> Optional[ChapterContent]:
+        """Parse a single markdown file."""
+        fields = self._read_fields(file_path)
+        return self._chapter(fields) if fields else None
+    
+    def _read_fields(self, file_path: Path) -> Optional[Dict[str, str]]:
+        """Read the fields a chapter is built from, see ``_chapter``.
+        
+        Returns:
+            Title, chapter number, main content and the raw frontmatter, or
+            None if the file has no substantial content
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Extract title and chapter number
+        title, chapter_number = self._extract_title_and_chapter(file_path.name, content)
+        
+        # Clean and extract main content
+        main_content = self._extract_main_content(content)
+        
+        # Only return if we have substantial content
+        if len(main_content.strip()) < 100:
+            return None
+        
+        frontmatter = FRONTMATTER.match(content)
+        return {
+            'title': title,
+            'chapter_number': chapter_number,
+            'content': main_content,
+            'frontmatter': frontmatter.group(0) if frontmatter else '',
+        }
+    
+    def _chapter(self, fields: Dict[str, str]) -> ChapterContent:
+        """Create a chapter whose metadata and subsections are only worked out if used.
+        
+        The loaders only hold the frontmatter and the chapter's own content,
+        not the file's text.
+        """
+        frontmatter = fields['frontmatter']
+        content = fields['content']
+        return ChapterContent.lazy(
+            {
+                'metadata': lambda: self._extract_metadata(frontmatter),
+                'subsections': lambda: self._extract_subsections(content),
+            },
+            title=fields['title'],
+            chapter_number=fields['chapter_number'],
+            content=content,
+        )
+    
     def _extract_metadata(self, content: str) -> Dict[str, Any]:
         """Extract YAML frontmatter metadata."""
         metadata = {}
         
         # Look for YAML frontmatter
-        yaml_match = re.match(r'^---\n(.*?)\n---\n', content, re.DOTALL)
+        yaml_match = FRONTMATTER.match(content)
         if yaml_match:
             yaml_content = yaml_match.group(1)
             for line in yaml_content.split('\n'):
@@ -97,7 +199,7 @@ class MarkdownReader:
     def _extract_main_content(self, content: str) -> str:
         """Extract and clean main content."""
         # Remove YAML frontmatter
-        content = re.sub(r'^---\n.*?\n---\n', '', content, flags=re.DOTALL)
+        content = FRONTMATTER.sub('', content, count=1)
         
         # Remove the main title (first H1)
         content = re.sub(r'^#\s+.+\n', '', content, flags=re.MULTILINE)
@@ -112,40 +214,10 @@ class MarkdownReader:
     
     def _extract_subsections(self, content: str) -> List[Dict[str, str]]:
         """Extract subsections from content."""
-        subsections = []
-        
-        # Find all headings (H2, H3, H4)
-        heading_pattern = r'^(#{2,4})\s+(.+)$'
-        
-        lines = content.split('\n')
-        current_section = None
-        current_content = []
-        
-        for line in lines:
-            heading_match = re.match(heading_pattern, line)
-            if heading_match:
-                # Save previous section if exists
-                if current_section:
-                    subsections.append({
-                        'title': current_section,
-                        'content': '\n'.join(current_content).strip()
-                    })
-                
-                # Start new section
-                current_section = heading_match.group(2).strip()
-                current_content = []
-            else:
-                if current_section:
-                    current_content.append(line)
-        
-        # Add the last section
-        if current_section:
-            subsections.append({
-                'title': current_section,
-                'content': '\n'.join(current_content).strip()
-            })
-        
-        return subsections
+        return [
+            {'title': title, 'content': content[start:end]}
+            for title, start, end in subsection_spans(content)
+        ]
     
     def get_content_summary(self, chapter: ChapterContent) -> str:
         """Get a summary of chapter content for question generation."""
@@ -1,8 +1,15 @@
 """Data models for question generation."""
 
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Literal, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PrivateAttr,
+    SerializerFunctionWrapHandler,
+    model_serializer,
+)
 
 
 class Answer(BaseModel):
@@ -60,6 +67,32 @@ class Question(BaseModel):
         }
 
 
+class GeneratedQuestion(BaseModel):
+    """A question as the model writes it, before it becomes a ``Question``.
+
+    Its JSON schema is what structured output holds responses to.
+    """
+    
+    model_config = ConfigDict(extra="forbid")
+    
+    question: str = Field(..., description=Question.model_fields["question"].description)
+    correct_answer: str = Field(..., description="The correct answer text")
+    incorrect_answers: List[str] = Field(..., description="Incorrect but plausible answers")
+    explanation: str = Field(..., description=Question.model_fields["explanation"].description)
+    category: str = Field(..., description=Question.model_fields["category"].description)
+    difficulty: Literal["easy", "medium", "hard"] = Field(
+        ..., description=Question.model_fields["difficulty"].description
+    )
+
+
+class GeneratedQuestions(BaseModel):
+    """A structured output response: the questions asked for."""
+    
+    model_config = ConfigDict(extra="forbid")
+    
+    questions: List[GeneratedQuestion] = Field(..., description="The generated questions")
+
+
 class QuestionBank(BaseModel):
     """Collection of questions."""
     
@@ -84,10 +117,72 @@ class QuestionBank(BaseModel):
 
 
 class ChapterContent(BaseModel):
-    """Parsed chapter content from markdown."""
+    """Parsed chapter content from markdown.
+    
+    A chapter created with ``lazy`` computes some of its fields only when they
+    are first accessed, and keeps them from then on. Dumping, comparing or
+    pickling a chapter computes every field first.
+    """
     
     title: str = Field(..., description="Chapter title")
     chapter_number: str = Field(..., description="Chapter number/ID")
     content: str = Field(..., description="Main content text")
     metadata: Dict = Field(default_factory=dict)
-    subsections: List[Dict] = Field(default_factory=list)
\ No newline at end of file
+    subsections: List[Dict] = Field(default_factory=list)
+    
+    _loaders: Dict[str, Callable[[], Any]] = PrivateAttr(default_factory=dict)
+    
+    @classmethod
+    def lazy(cls, loaders: Dict[str, Callable[[], Any]], **values: Any) -> "ChapterContent":
+        """Create a chapter whose other fields are computed on first access.
+        
+        Args:
+            loaders: Function computing the value of each lazy field
+            **values: Values of the remaining fields
+        """
+        chapter = cls(**values)
+        for name in loaders:
+            chapter.__dict__.pop(name, None)
+        chapter._loaders = dict(loaders)
+        return chapter
+    
+    # Hidden from type checkers like BaseModel's own __getattr__, so unknown
+    # attributes are still reported
+    if not TYPE_CHECKING:
+        
+        def __getattr__(self, name: str) -> Any:
+            # Only called for attributes missing from __dict__, i.e. lazy
+            # fields that haven't been computed yet
+            if name in type(self).model_fields:
+                loader = self._loaders.get(name)
+                if loader is not None:
+                    value = loader()
+                    self.__dict__[name] = value
+                    return value
+            return super().__getattr__(name)
+    
+    def _load_all(self) -> None:
+        """Compute every lazy field that hasn't been yet."""
+        for name in self._loaders:
+            if name not in self.__dict__:
+                getattr(self, name)
+    
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler: SerializerFunctionWrapHandler) -> Any:
+        self._load_all()
+        return handler(self)
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ChapterContent):
+            return NotImplemented
+        return type(self) is type(other) and self.model_dump() == other.model_dump()
+    
+    def __getstate__(self) -> Dict[Any, Any]:
+        self._load_all()
+        state = super().__getstate__()
+        state['__pydantic_private__'] = {**state['__pydantic_private__'], '_loaders': {}}
+        return state
+    
+    def __repr_args__(self) -> Iterable[Tuple[Optional[str], Any]]:
+        self._load_all()
+        return super().__repr_args__()
\ No newline at end of file
@@ -1,12 +1,29 @@
 """OpenAI client for question generation."""
 
-import json
+import asyncio
 import os
 import uuid
-
-from openai import AzureOpenAI, OpenAI
-
+from typing import Any
+
+from openai import AsyncAzureOpenAI, AsyncOpenAI, AzureOpenAI, OpenAI
+
+from .batch_api import (
+    AZURE_BATCH_ENDPOINT,
+    DEFAULT_POLL_INTERVAL,
+    OPENAI_BATCH_ENDPOINT,
+    BatchRunner,
+)
+from .chunking import (
+    DEFAULT_CHUNK_TOKENS,
+    ContentChunk,
+    allocate_questions,
+    chunk_chapter,
+    prompt_text,
+)
 from .models import Answer, ChapterContent, Question
+from .rate_limiter import AdaptiveScheduler, request_tokens
+from .response_cache import ResponseCache
+from .structured_output import QUESTIONS_RESPONSE_FORMAT, parse_questions
 
 EXAMPLES = """
 <examples>
@@ -182,8 +199,27 @@ EXAMPLES = """
 """
 
 
-class QuestionGeneratorClient:
-    """OpenAI client for generating quiz questions."""
+CHAPTER_SYSTEM_PROMPT = (
+    "You are an expert in Norwegian driving theory and test creation. Generate realistic, "
+    "challenging quiz questions that would appear on the official Norwegian driving license "
+    "theory test."
+)
+
+ROAD_SIGN_SYSTEM_PROMPT = (
+    "You are an expert in Norwegian traffic signs and road safety. Generate realistic quiz "
+    "questions about road signs that would appear on the official Norwegian driving license test."
+)
+
+
+class BaseQuestionGeneratorClient:
+    """Prompt building and response parsing shared by the OpenAI clients.
+
+    Subclasses send the completion requests built here, blocking or async.
+    """
+
+    # Client classes used to connect to Azure OpenAI and to OpenAI
+    azure_client_class: type = AzureOpenAI
+    openai_client_class: type = OpenAI
 
     def __init__(
         self,
@@ -194,6 +230,10 @@ class QuestionGeneratorClient:
         azure_endpoint: str | None = None,
         azure_deployment: str | None = None,
         api_version: str = "2024-12-01-preview",
+        max_chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        cache: ResponseCache | None = None,
+        scheduler: AdaptiveScheduler | None = None,
+        structured_output: bool = False,
     ):
         """Initialize the OpenAI client.
 
@@ -205,115 +245,130 @@ class QuestionGeneratorClient:
             azure_endpoint: Azure OpenAI endpoint
             azure_deployment: Azure deployment name
             api_version: Azure API version
+            max_chunk_tokens: Estimated tokens of chapter content per request;
+                longer chapters are split into several requests
+            cache: Cache of responses to reuse for identical requests
+            scheduler: Paces and retries the requests; share one between
+                clients of the same deployment
+            structured_output: Hold responses to the JSON schema of the
+                questions, for models that support structured output
         """
+        self.use_azure = use_azure
         if use_azure:
-            self.client = AzureOpenAI(
+            self.client = self.azure_client_class(
                 api_version=api_version,
                 azure_endpoint=azure_endpoint or os.getenv("AZURE_OPENAI_ENDPOINT"),
                 api_key=api_key or os.getenv("AZURE_OPENAI_KEY"),
+                # Retries are left to the scheduler, which learns from them
+                max_retries=0,
             )
             self.model = azure_deployment or model
         else:
-            self.client = OpenAI(
+            self.client = self.openai_client_class(
                 api_key=api_key or os.getenv("OPENAI_API_KEY"),
                 base_url=api_base,
+                max_retries=0,
             )
             self.model = model
+        self.max_chunk_tokens = max_chunk_tokens
+        self.cache = cache
+        self.scheduler = scheduler or AdaptiveScheduler()
+        self.structured_output = structured_output
 
-    def generate_questions(
-        self,
-        chapter: ChapterContent,
-        num_questions: int = 5,
-        num_incorrect_answers: int = 20,
-    ) -> list[Question]:
-        """Generate multiple questions from a chapter."""
-        prompt = self._build_prompt(chapter, num_questions, num_incorrect_answers)
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert in Norwegian driving theory and test creation. Generate realistic, challenging quiz questions that would appear on the official Norwegian driving license theory test.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                max_tokens=4000,
-            )
-
-            content = response.choices[0].message.content
-            return self._parse_response(content, chapter)
+    def _chapter_requests(
+        self, chapter: ChapterContent, num_questions: int, num_incorrect_answers: int
+    ) -> list[dict[str, Any]]:
+        """Build the completion requests for a chapter's questions.
 
-        except Exception as e:
-            print(f"Error generating questions: {e}")
-            return []
+        The chapter is split into windows of at most ``max_chunk_tokens`` along
+        its headings, and the questions are divided between the windows by
+        their amount of content, with at least one question per window. The
+        whole chapter is covered, so a long chapter can get more questions
+        than ``num_questions``.
 
-    def generate_road_sign_questions(
+        Returns:
+            One request per window, as keyword arguments for the completions API
+        """
+        chunks = chunk_chapter(chapter, self.max_chunk_tokens)
+        requests = []
+        for i, (chunk, chunk_questions) in enumerate(
+            zip(chunks, allocate_questions(chunks, num_questions), strict=True), 1
+        ):
+            part = (i, len(chunks)) if len(chunks) > 1 else None
+            prompt = self._build_prompt(chapter, chunk_questions, num_incorrect_answers, chunk, part)
+            requests.append(self._completion_request(CHAPTER_SYSTEM_PROMPT, prompt))
+        return requests
+
+    def _road_sign_request(
         self,
         sign_id: str,
         sign_name: str,
         sign_description: str,
         image_base64: str,
-        num_questions: int = 3,
-        num_incorrect_answers: int = 20,
-        question_id_prefix: str | None = None,
-    ) -> list[Question]:
-        """Generate questions about a road sign using vision capabilities."""
+        num_questions: int,
+        num_incorrect_answers: int,
+    ) -> dict[str, Any]:
+        """Build the completion request for a road sign's questions."""
         prompt = self._build_road_sign_prompt(
             sign_id, sign_name, sign_description, num_questions, num_incorrect_answers
         )
+        return self._completion_request(
+            ROAD_SIGN_SYSTEM_PROMPT,
+            [
+                {"type": "text", "text": prompt},
+                {
+                    "type": "image_url",
+                    "image_url": {"url": f"data:image/png;base64,{image_base64}"},
+                },
+            ],
+        )
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert in Norwegian traffic signs and road safety. Generate realistic quiz questions about road signs that would appear on the official Norwegian driving license test.",
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": f"data:image/png;base64,{image_base64}"},
-                            },
-                        ],
-                    },
-                ],
-                temperature=0.7,
-                max_tokens=4000,
-            )
-
-            content = response.choices[0].message.content
-            questions = self._parse_response(content, None, question_id_prefix)
-
-            # Add road sign specific metadata
-            for question in questions:
-                question.sign_id = sign_id
-                question.category = "Trafikkskilt"
-
-            return questions
-
-        except Exception as e:
-            print(f"Error generating road sign questions: {e}")
-            return []
+    def _completion_request(self, system_prompt: str, user_content: Any) -> dict[str, Any]:
+        """Build the keyword arguments of a chat completion request."""
+        request = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content},
+            ],
+            "temperature": 0.7,
+            "max_tokens": 4000,
+        }
+        if self.structured_output:
+            # The schema wraps the questions in an object, which the
+            # parser reads as well as the array the prompt asks for
+            request["response_format"] = QUESTIONS_RESPONSE_FORMAT
+        return request
 
     def _build_prompt(
-        self, chapter: ChapterContent, num_questions: int, num_incorrect_answers: int
+        self,
+        chapter: ChapterContent,
+        num_questions: int,
+        num_incorrect_answers: int,
+        chunk: ContentChunk | None = None,
+        part: tuple[int, int] | None = None,
     ) -> str:
-        """Build the prompt for question generation."""
+        """Build the prompt for question generation.
+
+        Args:
+            chapter: Chapter the questions are about
+            num_questions: Number of questions to ask for
+            num_incorrect_answers: Number of distractors per question
+            chunk: Window of the chapter's content to use; the whole chapter
+                in one window if not given
+            part: (window number, number of windows) when the chapter is
+                split over several requests
+        """
+        content = chunk.text if chunk else prompt_text(chapter.content)
+        chapter_line = f"{chapter.title} (part {part[0]} of {part[1]})" if part else chapter.title
         prompt = f"""
 Based on the following Norwegian driving theory content, generate {
             num_questions
         } realistic quiz questions that would be suitable for the official Norwegian driving license theory test.
 
-Chapter: {chapter.title}
+Chapter: {chapter_line}
 Content:
-{chapter.content[:10000]}{"..." if len(chapter.content) > 10000 else ""}
+{content}
 
 For each question, provide:
 1. A clear, unambiguous question in Norwegian
@@ -412,17 +467,15 @@ Return the response as a JSON array with this exact structure:
     def _parse_response(
         self, response: str, chapter: ChapterContent | None, question_id_prefix: str | None = None
     ) -> list[Question]:
-        """Parse the OpenAI response into Question objects."""
-        try:
-            # Extract JSON from response (sometimes wrapped in markdown)
-            json_start = response.find("[")
-            json_end = response.rfind("]") + 1
-            json_str = response[json_start:json_end]
-
-            questions_data = json.loads(json_str)
-            questions = []
+        """Parse the OpenAI response into Question objects.
 
-            for i, q_data in enumerate(questions_data):
+        Every complete question in the response is kept, even if the response
+        was cut off or has text around the JSON; a malformed question only
+        loses itself.
+        """
+        questions = []
+        for i, q_data in enumerate(parse_questions(response)):
+            try:
                 # Create Answer objects
                 answers = [Answer(text=q_data["correct_answer"], is_correct=True)]
 
@@ -454,9 +507,340 @@ Return the response as a JSON array with this exact structure:
 
                 questions.append(question)
 
+            except Exception as e:
+                print(f"Error parsing question {i + 1}: {e}")
+
+        if not questions:
+            print(f"No questions in response: {response[:500]}...")
+        return questions
+
+    def _accept_response(
+        self,
+        request: dict[str, Any],
+        content: str | None,
+        finish_reason: str | None,
+        refusal: str | None = None,
+    ) -> str | None:
+        """Check a completion's response text, caching it if it is whole.
+
+        A response cut off by ``max_tokens`` is still used, but isn't cached,
+        so it's requested in full next time.
+
+        Returns:
+            The response text, or None if the model refused or sent no text
+        """
+        if refusal or content is None:
+            print(f"No response content: {refusal or finish_reason}")
+            return None
+        if self.cache and finish_reason != "length":
+            self.cache.put(request, content)
+        return content
+
+    def _discard_cached(self, request: dict[str, Any]) -> None:
+        """Drop a cached response that turned out unusable, so it's requested again."""
+        if self.cache:
+            self.cache.discard(request)
+
+    def _parse_road_sign_response(
+        self, response: str, sign_id: str, question_id_prefix: str | None = None
+    ) -> list[Question]:
+        """Parse a road sign response, adding the sign's metadata to the questions."""
+        questions = self._parse_response(response, None, question_id_prefix)
+        for question in questions:
+            question.sign_id = sign_id
+            question.category = "Trafikkskilt"
+        return questions
+
+
+class QuestionGeneratorClient(BaseQuestionGeneratorClient):
+    """OpenAI client for generating quiz questions."""
+
+    def generate_questions(
+        self,
+        chapter: ChapterContent,
+        num_questions: int = 5,
+        num_incorrect_answers: int = 20,
+    ) -> list[Question]:
+        """Generate multiple questions from a chapter, one request per window.
+
+        Raises:
+            openai.APIError: If a request still fails after being retried
+        """
+        questions = []
+        for request in self._chapter_requests(chapter, num_questions, num_incorrect_answers):
+            content = self._complete(request)
+            parsed = self._parse_response(content, chapter)
+            if not parsed:
+                self._discard_cached(request)
+            questions.extend(parsed)
+        return questions
+
+    def generate_road_sign_questions(
+        self,
+        sign_id: str,
+        sign_name: str,
+        sign_description: str,
+        image_base64: str,
+        num_questions: int = 3,
+        num_incorrect_answers: int = 20,
+        question_id_prefix: str | None = None,
+    ) -> list[Question]:
+        """Generate questions about a road sign using vision capabilities.
+
+        Raises:
+            openai.APIError: If the request still fails after being retried
+        """
+        request = self._road_sign_request(
+            sign_id, sign_name, sign_description, image_base64, num_questions, num_incorrect_answers
+        )
+
+        content = self._complete(request)
+        questions = self._parse_road_sign_response(content, sign_id, question_id_prefix)
+        if not questions:
+            self._discard_cached(request)
+        return questions
+
+    def generate_questions_batch(
+        self,
+        chapters: list[ChapterContent],
+        num_questions: int = 5,
+        num_incorrect_answers: int = 20,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> list[list[Question]]:
+        """Generate questions for many chapters at once through the Batch API.
+
+        Blocks until the batch is done, which can take up to 24 hours.
+
+        Returns:
+            Questions of every chapter, in order; empty for chapters whose
+            requests failed
+        """
+        requests = []
+        owners = []
+        for index, chapter in enumerate(chapters):
+            for request in self._chapter_requests(chapter, num_questions, num_incorrect_answers):
+                requests.append(request)
+                owners.append(index)
+
+        questions: list[list[Question]] = [[] for _ in chapters]
+        contents = self._complete_batch(requests, poll_interval)
+        for index, request, content in zip(owners, requests, contents, strict=True):
+            if content is None:
+                continue
+            parsed = self._parse_response(content, chapters[index])
+            if not parsed:
+                self._discard_cached(request)
+            questions[index].extend(parsed)
+        return questions
+
+    def generate_road_sign_questions_batch(
+        self,
+        signs: list[dict[str, Any]],
+        num_questions: int = 3,
+        num_incorrect_answers: int = 20,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> list[list[Question]]:
+        """Generate questions about many road signs at once through the Batch API.
+
+        Args:
+            signs: Keyword arguments of ``generate_road_sign_questions`` for
+                every sign: sign_id, sign_name, sign_description, image_base64
+                and optionally question_id_prefix
+            num_questions: Number of questions per sign
+            num_incorrect_answers: Number of incorrect answers per question
+            poll_interval: Seconds between checking on the batch
+
+        Returns:
+            Questions of every sign, in order; empty for failed requests
+        """
+        requests = [
+            self._road_sign_request(
+                sign["sign_id"],
+                sign["sign_name"],
+                sign["sign_description"],
+                sign["image_base64"],
+                num_questions,
+                num_incorrect_answers,
+            )
+            for sign in signs
+        ]
+
+        questions = []
+        contents = self._complete_batch(requests, poll_interval)
+        for sign, request, content in zip(signs, requests, contents, strict=True):
+            parsed = []
+            if content is not None:
+                parsed = self._parse_road_sign_response(
+                    content, sign["sign_id"], sign.get("question_id_prefix")
+                )
+                if not parsed:
+                    self._discard_cached(request)
+            questions.append(parsed)
+        return questions
+
+    def _complete(self, request: dict[str, Any]) -> str:
+        """Send a completion request and return the response text.
+
+        Identical requests are answered from the cache, if there is one.
+        """
+        content = self.cache.get(request) if self.cache else None
+        if content is None:
+            raw_response = self.scheduler.run(
+                lambda: self.client.chat.completions.with_raw_response.create(**request),
+                request_tokens(request),
+            )
+            choice = raw_response.parse().choices[0]
+            content = self._accept_response(
+                request,
+                choice.message.content,
+                getattr(choice, "finish_reason", None),
+                getattr(choice.message, "refusal", None),
+            )
+        return content or ""
+
+    def _complete_batch(
+        self, requests: list[dict[str, Any]], poll_interval: float = DEFAULT_POLL_INTERVAL
+    ) -> list[str | None]:
+        """Send completion requests as a batch and return their response texts.
+
+        Requests answered from the cache aren't submitted at all.
+
+        Returns:
+            Response text of every request, in order, or None if it failed
+        """
+        contents = [self.cache.get(request) if self.cache else None for request in requests]
+        missing = [i for i, content in enumerate(contents) if content is None]
+        if not missing:
+            return contents
+
+        runner = BatchRunner(
+            self.client,
+            endpoint=AZURE_BATCH_ENDPOINT if self.use_azure else OPENAI_BATCH_ENDPOINT,
+            poll_interval=poll_interval,
+        )
+        choices = runner.run([requests[i] for i in missing])
+        for i, choice in zip(missing, choices, strict=True):
+            if choice is not None:
+                message = choice.get("message") or {}
+                contents[i] = self._accept_response(
+                    requests[i],
+                    message.get("content"),
+                    choice.get("finish_reason"),
+                    message.get("refusal"),
+                )
+        return contents
+
+
+class AsyncQuestionGeneratorClient(BaseQuestionGeneratorClient):
+    """Asyncio OpenAI client for generating many chapters' questions at once.
+
+    At most ``max_concurrency`` requests are in flight at a time, however
+    many chapters are being generated concurrently, and fewer while the
+    scheduler backs off from the deployment's rate limits; the rest wait
+    their turn. Use it as an async context manager, so its connections are
+    closed before the event loop is.
+    """
+
+    azure_client_class = AsyncAzureOpenAI
+    openai_client_class = AsyncOpenAI
+
+    def __init__(
+        self,
+        *args: Any,
+        max_concurrency: int = 16,
+        scheduler: AdaptiveScheduler | None = None,
+        **kwargs: Any,
+    ):
+        """Initialize the client.
+
+        Args:
+            *args: Arguments of ``QuestionGeneratorClient``
+            max_concurrency: Requests in flight at most
+            scheduler: Paces and retries the requests, by default up to
+                ``max_concurrency`` at a time
+            **kwargs: Keyword arguments of ``QuestionGeneratorClient``
+        """
+        kwargs["scheduler"] = scheduler or AdaptiveScheduler(max_concurrency)
+        super().__init__(*args, **kwargs)
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self) -> "AsyncQuestionGeneratorClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the client's connections."""
+        await self.client.close()
+
+    async def generate_questions(
+        self,
+        chapter: ChapterContent,
+        num_questions: int = 5,
+        num_incorrect_answers: int = 20,
+    ) -> list[Question]:
+        """Generate multiple questions from a chapter, requesting all windows at once.
+
+        Raises:
+            openai.APIError: If a request still fails after being retried
+        """
+
+        async def generate(request: dict[str, Any]) -> list[Question]:
+            content = await self._complete(request)
+            questions = self._parse_response(content, chapter)
+            if not questions:
+                self._discard_cached(request)
             return questions
 
-        except Exception as e:
-            print(f"Error parsing response: {e}")
-            print(f"Response was: {response[:500]}...")
-            return []
+        requests = self._chapter_requests(chapter, num_questions, num_incorrect_answers)
+        results = await asyncio.gather(*(generate(request) for request in requests))
+        return [question for questions in results for question in questions]
+
+    async def generate_road_sign_questions(
+        self,
+        sign_id: str,
+        sign_name: str,
+        sign_description: str,
+        image_base64: str,
+        num_questions: int = 3,
+        num_incorrect_answers: int = 20,
+        question_id_prefix: str | None = None,
+    ) -> list[Question]:
+        """Generate questions about a road sign using vision capabilities.
+
+        Raises:
+            openai.APIError: If the request still fails after being retried
+        """
+        request = self._road_sign_request(
+            sign_id, sign_name, sign_description, image_base64, num_questions, num_incorrect_answers
+        )
+
+        content = await self._complete(request)
+        questions = self._parse_road_sign_response(content, sign_id, question_id_prefix)
+        if not questions:
+            self._discard_cached(request)
+        return questions
+
+    async def _complete(self, request: dict[str, Any]) -> str:
+        """Send a completion request once a slot is free and return the response text.
+
+        Identical requests are answered from the cache, if there is one,
+        without waiting for a slot.
+        """
+        content = self.cache.get(request) if self.cache else None
+        if content is None:
+            async with self._semaphore:
+                raw_response = await self.scheduler.arun(
+                    lambda: self.client.chat.completions.with_raw_response.create(**request),
+                    request_tokens(request),
+                )
+            choice = raw_response.parse().choices[0]
+            content = self._accept_response(
+                request,
+                choice.message.content,
+                getattr(choice, "finish_reason", None),
+                getattr(choice.message, "refusal", None),
+            )
+        return content or ""
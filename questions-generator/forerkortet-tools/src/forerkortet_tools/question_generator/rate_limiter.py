@@ -0,0 +1,330 @@
+"""Adaptive scheduling of completion requests within a deployment's rate limits."""
+
+import asyncio
+import random
+import re
+import threading
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from typing import Any, Protocol, TypeVar
+
+from openai import APIConnectionError, APIStatusError
+
+from .chunking import estimate_tokens
+
+
+class _Response(Protocol):
+    """A raw response, whose headers report the rate limits."""
+
+    @property
+    def headers(self) -> Mapping[str, str]: ...
+
+
+T = TypeVar("T", bound=_Response)
+
+# Statuses worth retrying: rate limited, timed out or a server error
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+DEFAULT_MAX_RETRIES = 6
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+DEFAULT_MAX_CONCURRENCY = 16
+INITIAL_CONCURRENCY = 4
+
+# Budget an image is counted as; a high detail image costs up to this many
+IMAGE_TOKENS = 765
+
+# How long a request waits before checking again for a free slot
+SLOT_POLL_INTERVAL = 0.05
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Parse a reset duration like "1s", "6m0s" or "250ms" into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after(headers: Mapping[str, str] | None) -> float | None:
+    """Get how long the server asks to wait before retrying, in seconds."""
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    return parse_duration(headers.get("retry-after"))
+
+
+def request_tokens(request: dict[str, Any]) -> int:
+    """Estimate the tokens a completion request counts against the token budget.
+
+    Deployments count a request's prompt and its ``max_tokens`` when it
+    arrives, so both are included.
+    """
+    tokens = request.get("max_tokens") or 0
+    for message in request.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += estimate_tokens(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                tokens += estimate_tokens(part.get("text", ""))
+            else:
+                tokens += IMAGE_TOKENS
+    return tokens
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> int | None:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously up to its limit.
+
+    The limit is unknown until a response reports it; until then the
+    bucket never holds a request back.
+    """
+
+    def __init__(self, per_minute: float | None = None):
+        """Initialize the bucket.
+
+        Args:
+            per_minute: Budget per minute, or None if unknown
+        """
+        self.limit = per_minute
+        self.level = per_minute if per_minute is not None else 0.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.limit is not None:
+            self.level = min(self.limit, self.level + (now - self.updated) * self.limit / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until the bucket holds ``amount``, or 0 if it does now."""
+        self._refill(now)
+        if self.limit is None:
+            return 0.0
+        # A request over the whole limit goes through once the bucket is full
+        missing = min(amount, self.limit) - self.level
+        return max(0.0, missing * 60 / self.limit)
+
+    def take(self, amount: float, now: float) -> None:
+        """Spend budget; it may run into debt, which is paid back first."""
+        self._refill(now)
+        if self.limit is not None:
+            self.level -= amount
+
+    def update(self, limit: int | None, remaining: int | None, now: float) -> None:
+        """Correct the budget with what the server reported."""
+        self._refill(now)
+        if limit:
+            if self.limit is None:
+                self.level = limit
+            self.limit = limit
+        if remaining is not None and self.limit is not None:
+            self.level = min(self.level, remaining)
+
+
+class AdaptiveScheduler:
+    """Paces completion requests to a deployment's rate limits.
+
+    Every request reserves one request and its estimated tokens from
+    requests-per-minute and tokens-per-minute budgets, which are learned
+    from the ``x-ratelimit-*`` response headers. The number of requests in
+    flight starts low and grows by one for every window of successful
+    requests, and is halved when the deployment answers 429, so long runs
+    settle just under the quota. Rate limited, timed out and failed
+    requests are retried with jittered exponential backoff, honouring
+    ``retry-after``.
+
+    The scheduler is thread-safe and can be shared by threads and by
+    asyncio tasks, e.g. by the blocking and the async client of one run.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        initial_concurrency: int = INITIAL_CONCURRENCY,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Requests in flight at most
+            max_retries: Times a failed request is retried before giving up
+            initial_concurrency: Requests in flight at most to begin with
+        """
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.concurrency = float(min(initial_concurrency, max_concurrency))
+        self.requests = TokenBucket()
+        self.tokens = TokenBucket()
+        self.in_flight = 0
+        self.completed = 0
+        self.retried = 0
+        self.rate_limited = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, tokens: int) -> float:
+        """Reserve a slot and budget for a request, if there is room.
+
+        Returns:
+            0 if reserved, otherwise seconds to wait before trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self._paused_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(tokens, now),
+            )
+            if wait <= 0 and self.in_flight >= int(self.concurrency):
+                wait = SLOT_POLL_INTERVAL
+            if wait > 0:
+                return wait
+            self.in_flight += 1
+            self.requests.take(1, now)
+            self.tokens.take(tokens, now)
+            return 0.0
+
+    def release(self, headers: Mapping[str, str] | None, status: int | None) -> None:
+        """Free a request's slot, learning from its response.
+
+        Args:
+            headers: Response headers, if there was a response
+            status: Response status, or None if the request didn't get one
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if headers:
+                self.requests.update(
+                    _int_header(headers, "x-ratelimit-limit-requests"),
+                    _int_header(headers, "x-ratelimit-remaining-requests"),
+                    now,
+                )
+                self.tokens.update(
+                    _int_header(headers, "x-ratelimit-limit-tokens"),
+                    _int_header(headers, "x-ratelimit-remaining-tokens"),
+                    now,
+                )
+
+            if status == 429:
+                self.rate_limited += 1
+                self.concurrency = max(1.0, self.concurrency / 2)
+                pause = retry_after(headers)
+                if pause:
+                    self._paused_until = max(self._paused_until, now + pause)
+            elif status is not None and status < 400:
+                self.completed += 1
+                self.concurrency = min(
+                    float(self.max_concurrency), self.concurrency + 1 / self.concurrency
+                )
+
+    def backoff(self, attempt: int, error: Exception) -> float | None:
+        """Get how long to wait before retrying a failed request.
+
+        Returns:
+            Seconds to wait, or None if the request shouldn't be retried
+        """
+        if attempt >= self.max_retries:
+            return None
+        if isinstance(error, APIStatusError):
+            if error.status_code not in RETRY_STATUSES:
+                return None
+            requested = retry_after(error.response.headers)
+        elif isinstance(error, APIConnectionError):
+            requested = None
+        else:
+            return None
+        # Full jitter, so requests that failed together don't retry together
+        delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+        return max(delay, requested or 0.0)
+
+    def _failed(self, error: Exception) -> None:
+        if isinstance(error, APIStatusError):
+            self.release(error.response.headers, error.status_code)
+        else:
+            self.release(None, None)
+
+    def run(self, send: Callable[[], T], tokens: int) -> T:
+        """Send a request once there is room for it, retrying it if it fails.
+
+        Args:
+            send: Sends the request and returns the raw response, with headers
+            tokens: Estimated tokens of the request, see ``request_tokens``
+
+        Raises:
+            Exception: The request's last error, if it can't be retried
+        """
+        attempt = 0
+        while True:
+            while (wait := self.try_acquire(tokens)) > 0:
+                time.sleep(wait)
+            try:
+                response = send()
+            except Exception as e:
+                self._failed(e)
+                delay = self.backoff(attempt, e)
+                if delay is None:
+                    raise
+                with self._lock:
+                    self.retried += 1
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self.release(response.headers, 200)
+            return response
+
+    async def arun(self, send: Callable[[], Awaitable[T]], tokens: int) -> T:
+        """Send a request from asyncio, see ``run``."""
+        attempt = 0
+        while True:
+            while (wait := self.try_acquire(tokens)) > 0:
+                await asyncio.sleep(wait)
+            try:
+                response = await send()
+            except Exception as e:
+                self._failed(e)
+                delay = self.backoff(attempt, e)
+                if delay is None:
+                    raise
+                with self._lock:
+                    self.retried += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.release(response.headers, 200)
+            return response
+
+    def summary(self) -> str:
+        """Describe how requests went, for the end of a run."""
+        limits = []
+        if self.requests.limit:
+            limits.append(f"{self.requests.limit} RPM")
+        if self.tokens.limit:
+            limits.append(f"{self.tokens.limit} TPM")
+        quota = f", quota {' / '.join(limits)}" if limits else ""
+        return (
+            f"{self.completed} completed, {self.retried} retried "
+            f"({self.rate_limited} rate limited), settled at {int(self.concurrency)} in flight"
+            f"{quota}"
+        )
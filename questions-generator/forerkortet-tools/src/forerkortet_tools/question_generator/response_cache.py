@@ -0,0 +1,160 @@
+"""Disk cache of model responses, keyed by a hash of the request."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+DEFAULT_CACHE_DIR = ".llm-cache"
+
+# What the cache is used for:
+#   read     use cached responses, but don't store new ones
+#   write    use cached responses and store new ones
+#   refresh  ignore cached responses, and store new ones in their place
+#   off      don't use the cache at all
+CACHE_MODES = ("read", "write", "refresh", "off")
+DEFAULT_CACHE_MODE = "write"
+
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_SIZE_MB = 500
+
+
+def request_key(request: dict[str, Any]) -> str:
+    """Hash a completion request.
+
+    The hash covers every argument of the request, i.e. the model, the
+    messages, including any images as their base64 data, the temperature
+    and max_tokens, so two requests share a key only if they are identical.
+    """
+    data = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Content-addressed store of response texts, one file per request.
+
+    Entries are written atomically, so the cache can be shared by threads
+    and by runs that are interrupted. Entries older than ``max_age_days``
+    are evicted, and once the cache grows past ``max_size_mb`` the least
+    recently used entries are too; reading an entry counts as using it.
+    """
+
+    def __init__(
+        self,
+        directory: Path = Path(DEFAULT_CACHE_DIR),
+        mode: str = DEFAULT_CACHE_MODE,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+        max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+    ):
+        """Initialize the cache.
+
+        Args:
+            directory: Directory to keep the entries in
+            mode: One of ``CACHE_MODES``
+            max_age_days: Evict entries last used longer ago than this
+            max_size_mb: Evict least recently used entries beyond this size
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(
+                f"Unknown cache mode {mode!r}, expected one of {', '.join(CACHE_MODES)}"
+            )
+        self.directory = Path(directory)
+        self.mode = mode
+        self.max_age_days = max_age_days
+        self.max_size_mb = max_size_mb
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._evicted = False
+
+    @property
+    def reads(self) -> bool:
+        """Whether cached responses are used."""
+        return self.mode in ("read", "write")
+
+    @property
+    def writes(self) -> bool:
+        """Whether new responses are stored."""
+        return self.mode in ("write", "refresh")
+
+    def _path(self, key: str) -> Path:
+        # Two-level fan-out keeps directories small for large caches
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, request: dict[str, Any]) -> str | None:
+        """Get the cached response text of a request, or None on a miss."""
+        if not self.reads:
+            self.misses += 1
+            return None
+        self._evict_once()
+        path = self._path(request_key(request))
+        try:
+            with open(path, encoding="utf-8") as f:
+                content: str = json.load(f)["content"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return content
+
+    def put(self, request: dict[str, Any], content: str) -> None:
+        """Store the response text of a request."""
+        if not self.writes or content is None:
+            return
+        self._evict_once()
+        path = self._path(request_key(request))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per writer, so concurrent writes of one entry don't collide
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": request.get("model"), "content": content}, f, ensure_ascii=False)
+        tmp_path.replace(path)
+        self.stores += 1
+
+    def discard(self, request: dict[str, Any]) -> None:
+        """Remove a request's entry, e.g. when its response turned out unusable."""
+        if not self.writes:
+            return
+        self._path(request_key(request)).unlink(missing_ok=True)
+
+    def _evict_once(self) -> None:
+        if not self._evicted:
+            self._evicted = True
+            self.evict()
+
+    def evict(self) -> int:
+        """Remove expired entries, then the least recently used beyond the size limit.
+
+        Returns:
+            Number of entries removed
+        """
+        try:
+            entries = []
+            for path in self.directory.glob("*/*.json"):
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            return 0
+
+        removed = 0
+        oldest_allowed = time.time() - self.max_age_days * 86400
+        max_size = self.max_size_mb * 1024 * 1024
+        total_size = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if mtime >= oldest_allowed and total_size <= max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+            removed += 1
+        return removed
+
+    def summary(self) -> str:
+        """Describe how the cache was used, for the end of a run."""
+        return f"{self.hits} cached, {self.misses} requested, {self.stores} stored ({self.mode})"
@@ -16,6 +16,8 @@ from ..utils.console import get_console
 from ..utils.file_utils import ensure_directory
 from .models import Question, QuestionBank
 from .openai_client import QuestionGeneratorClient
+from .rate_limiter import DEFAULT_MAX_CONCURRENCY, AdaptiveScheduler
+from .response_cache import ResponseCache
 
 
 class RoadSignsQuestionGenerator:
@@ -28,6 +30,9 @@ class RoadSignsQuestionGenerator:
         model: str = "espen-gpt-4.1",
         incorrect_answers_per_question: int = 20,
         console: Console | None = None,
+        cache: ResponseCache | None = None,
+        structured_output: bool = False,
+        concurrency: int = DEFAULT_MAX_CONCURRENCY,
     ):
         """Initialize the road signs question generator.
 
@@ -37,10 +42,21 @@ class RoadSignsQuestionGenerator:
             model: Model to use for vision tasks
             incorrect_answers_per_question: Number of incorrect answers per question
             console: Optional Rich console for output
+            cache: Cache of responses to reuse for identical requests
+            structured_output: Hold responses to the JSON schema of the
+                questions, for models that support structured output
+            concurrency: Maximum number of requests in flight; fewer are
+                sent while the deployment is rate limited
         """
         self.openai_client = QuestionGeneratorClient(
-            api_key=openai_api_key, api_base=openai_api_base, model=model
+            api_key=openai_api_key,
+            api_base=openai_api_base,
+            model=model,
+            cache=cache,
+            scheduler=AdaptiveScheduler(max_concurrency=concurrency),
+            structured_output=structured_output,
         )
+        self.concurrency = concurrency
         self.incorrect_answers_per_question = incorrect_answers_per_question
         self.console = console or get_console()
 
@@ -154,9 +170,18 @@ class RoadSignsQuestionGenerator:
         categories: list[str] | None = None,
         require_descriptions: bool = True,
         skip_existing: bool = False,
-        concurrency: int = 3,
+        concurrency: int | None = None,
+        batch_api: bool = False,
     ) -> QuestionBank:
-        """Generate questions from road signs JSON data, creating separate files for each sign."""
+        """Generate questions from road signs JSON data, creating separate files for each sign.
+
+        Up to ``concurrency`` signs, by default the generator's, are
+        generated in parallel; the client's scheduler sends fewer requests
+        at a time while the deployment is rate limited. With ``batch_api``
+        every sign is submitted in one Batch API job instead, and the files
+        are written once it is done.
+        """
+        concurrency = concurrency or self.concurrency
         self.console.print(f"[green]📖 Reading road signs data from: {signs_file}[/green]")
 
         # Load signs data
@@ -259,10 +284,9 @@ class RoadSignsQuestionGenerator:
         # Use thread-safe lock for shared resources
         lock = Lock()
 
-        def process_sign(sign_data: dict[str, Any]) -> dict[str, Any] | None:
-            """Process a single sign - this function will run in parallel."""
+        def save_sign(sign_data: dict[str, Any], question: Question | None) -> dict[str, Any]:
+            """Save a sign's question to its own file, and describe the outcome."""
             try:
-                question = self._generate_question_for_sign(sign_data, require_descriptions)
                 if question:
                     # Create individual question bank for this sign
                     individual_bank = QuestionBank()
@@ -307,33 +331,49 @@ class RoadSignsQuestionGenerator:
                     "error": str(e),
                 }
 
-        # Process signs in parallel
-        with Progress(console=self.console) as progress:
-            task = progress.add_task("[cyan]Generating questions...", total=len(signs))
-
-            with ThreadPoolExecutor(max_workers=concurrency) as executor:
-                # Submit all tasks
-                future_to_sign = {
-                    executor.submit(process_sign, sign_data): sign_data for sign_data in signs
-                }
-
-                # Process completed tasks
-                for future in as_completed(future_to_sign):
-                    result = future.result()
+        def process_sign(sign_data: dict[str, Any]) -> dict[str, Any]:
+            """Process a single sign - this function will run in parallel."""
+            try:
+                question = self._generate_question_for_sign(sign_data, require_descriptions)
+            except Exception as e:
+                return {"success": False, "sign_id": sign_data.get("id", "unknown"), "error": str(e)}
+            return save_sign(sign_data, question)
+
+        def report(result: dict[str, Any]) -> None:
+            nonlocal successful_questions
+            if result["success"]:
+                with lock:
+                    question_bank.add_question(result["question"])
+                    successful_questions += 1
+                self.console.print(
+                    f"[green]✓[/green] Generated question for sign {result['sign_id']} → {result['filename']}"
+                )
+            else:
+                self.console.print(
+                    f"[red]❌[/red] Failed to generate question for sign {result['sign_id']}: {result['error']}"
+                )
 
-                    if result["success"]:
-                        with lock:
-                            question_bank.add_question(result["question"])
-                            successful_questions += 1
-                        self.console.print(
-                            f"[green]✓[/green] Generated question for sign {result['sign_id']} → {result['filename']}"
-                        )
-                    else:
-                        self.console.print(
-                            f"[red]❌[/red] Failed to generate question for sign {result['sign_id']}: {result['error']}"
-                        )
+        if batch_api:
+            questions = self._batch_generate_questions_for_signs(
+                signs, require_descriptions, concurrency
+            )
+            for sign_data, question in zip(signs, questions, strict=True):
+                report(save_sign(sign_data, question))
+        else:
+            # Process signs in parallel
+            with Progress(console=self.console) as progress:
+                task = progress.add_task("[cyan]Generating questions...", total=len(signs))
+
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    # Submit all tasks
+                    future_to_sign = {
+                        executor.submit(process_sign, sign_data): sign_data for sign_data in signs
+                    }
 
-                    progress.update(task, advance=1)
+                    # Process completed tasks
+                    for future in as_completed(future_to_sign):
+                        report(future.result())
+                        progress.update(task, advance=1)
 
         # Add metadata for combined result
         question_bank.metadata = {
@@ -396,14 +436,84 @@ class RoadSignsQuestionGenerator:
     def _generate_question_for_sign(
         self, sign_data: dict[str, Any], require_descriptions: bool = True
     ) -> Question | None:
-        """Generate a single question for a road sign."""
+        """Generate a single question for a road sign.
+
+        Returns:
+            The question, or None if the sign is skipped or the response had
+            no usable question
+
+        Raises:
+            openai.APIError: If the request still fails after being retried
+        """
+        sign_request = self._prepare_sign_request(sign_data, require_descriptions)
+        if not sign_request:
+            return None
+
+        # Generate question using OpenAI Vision
+        questions = self.openai_client.generate_road_sign_questions(
+            **sign_request,
+            num_questions=1,
+            num_incorrect_answers=self.incorrect_answers_per_question,
+        )
+
+        if not questions:
+            return None
+
+        return self._add_sign_metadata(questions[0], sign_data)
+
+    def _batch_generate_questions_for_signs(
+        self,
+        signs: list[dict[str, Any]],
+        require_descriptions: bool = True,
+        concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> list[Question | None]:
+        """Generate a question for every road sign in one Batch API job.
+
+        The signs' images are fetched in parallel first.
+
+        Returns:
+            Question of every sign, in order, or None where it failed
+        """
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            sign_requests = list(
+                track(
+                    executor.map(
+                        lambda sign_data: self._prepare_sign_request(sign_data, require_descriptions),
+                        signs,
+                    ),
+                    total=len(signs),
+                    description="Fetching sign images...",
+                    console=self.console,
+                )
+            )
+
+        prepared = [(i, request) for i, request in enumerate(sign_requests) if request]
+        self.console.print(f"[cyan]Submitting {len(prepared)} signs to the Batch API[/cyan]")
+        results = self.openai_client.generate_road_sign_questions_batch(
+            [request for _, request in prepared],
+            num_questions=1,
+            num_incorrect_answers=self.incorrect_answers_per_question,
+        )
+
+        questions: list[Question | None] = [None] * len(signs)
+        for (i, _), sign_questions in zip(prepared, results, strict=True):
+            if sign_questions:
+                questions[i] = self._add_sign_metadata(sign_questions[0], signs[i])
+        return questions
+
+    def _prepare_sign_request(
+        self, sign_data: dict[str, Any], require_descriptions: bool = True
+    ) -> dict[str, Any] | None:
+        """Check that a sign can get a question, and fetch its image.
+
+        Returns:
+            Keyword arguments for ``generate_road_sign_questions``, or None if
+            the sign is skipped
+        """
         sign_id = sign_data.get("id", "unknown")
         sign_name = sign_data.get("name", "Unknown sign")
-        sign_category = sign_data.get("category", "Road signs")
-        sign_description = sign_data.get("description", "")
         image_url = sign_data.get("image_url")
         image_file = sign_data.get("image_file")
-        lovdata_reference = sign_data.get("lovdata_reference", "")
 
         # Get the actual description (improved scraper should have separated this properly)
         actual_description = self._get_actual_description(sign_data)
@@ -421,41 +531,32 @@ class RoadSignsQuestionGenerator:
             )
             return None
 
-        try:
-            # Get image data
-            image_data = self._get_image_data(image_url, image_file)
-            if not image_data:
-                return None
-
-            # Generate question using OpenAI Vision
-            questions = self.openai_client.generate_road_sign_questions(
-                sign_id=sign_id,
-                sign_name=sign_name,
-                sign_description=actual_description,
-                image_base64=image_data,
-                num_questions=1,
-                num_incorrect_answers=self.incorrect_answers_per_question,
-                question_id_prefix=f"sign_{sign_id}",
-            )
-
-            if not questions:
-                return None
+        # Get image data
+        image_data = self._get_image_data(image_url, image_file)
+        if not image_data:
+            return None
 
-            question = questions[0]
+        return {
+            "sign_id": sign_id,
+            "sign_name": sign_name,
+            "sign_description": actual_description,
+            "image_base64": image_data,
+            "question_id_prefix": f"sign_{sign_id}",
+        }
 
-            # Add additional metadata
-            question.category = sign_category
-            question.chapter = f"road_signs_{sign_category.lower()}"
-            question.source_text = f"Road sign {sign_id}: {sign_name} - {actual_description[:100] if actual_description else 'No description'}"
-            question.image_url = image_url
+    def _add_sign_metadata(self, question: Question, sign_data: dict[str, Any]) -> Question:
+        """Add a sign's category, source text and image to its generated question."""
+        sign_id = sign_data.get("id", "unknown")
+        sign_name = sign_data.get("name", "Unknown sign")
+        sign_category = sign_data.get("category", "Road signs")
+        actual_description = self._get_actual_description(sign_data)
 
-            return question
+        question.category = sign_category
+        question.chapter = f"road_signs_{sign_category.lower()}"
+        question.source_text = f"Road sign {sign_id}: {sign_name} - {actual_description[:100] if actual_description else 'No description'}"
+        question.image_url = sign_data.get("image_url")
 
-        except Exception as e:
-            self.console.print(
-                f"[yellow]⚠️ Error generating question for sign {sign_id}: {e}[/yellow]"
-            )
-            return None
+        return question
 
     def _get_image_data(self, image_url: str | None, image_file: str | None) -> str | None:
         """Get base64 encoded image data from URL or file."""
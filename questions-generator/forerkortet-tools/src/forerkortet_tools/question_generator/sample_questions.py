@@ -0,0 +1,190 @@
+"""Extraction of real exam questions from saved sample-question pages."""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from bs4 import BeautifulSoup, Tag
+from lxml import etree
+
+from .models import Answer, Question
+
+# The exam app renders from a single element carrying the whole exam as JSON
+EXAM_TAG = "v-exam"
+EXAM_ATTRIBUTE = "exam"
+
+# Explanations wrap every paragraph in a read-aloud button whose text holds
+# the paragraph as Markdown, followed by the same paragraph as HTML
+SPOKEN_TEXT_SELECTOR = "span.sm2-sound-text"
+
+WHITESPACE_RUN = re.compile(r"\s+")
+
+
+def stream_exam(html_file: Path) -> dict[str, Any] | None:
+    """Read the exam data of a saved page, stopping as soon as it is found.
+
+    Args:
+        html_file: Saved sample-question page
+
+    Returns:
+        The exam's JSON data, or None if the page has no exam element
+    """
+    with open(html_file, "rb") as f:
+        for _, elem in etree.iterparse(f, events=("start",), html=True, encoding="utf-8", huge_tree=True):
+            if elem.tag == EXAM_TAG and elem.get(EXAM_ATTRIBUTE):
+                exam: dict[str, Any] = json.loads(elem.get(EXAM_ATTRIBUTE))
+                return exam
+    return None
+
+
+def _block_text(block: Tag) -> str:
+    spoken = block.select(SPOKEN_TEXT_SELECTOR)
+    if spoken:
+        return " ".join(span.get_text(strip=True) for span in spoken)
+    return WHITESPACE_RUN.sub(" ", block.get_text(" ", strip=True))
+
+
+def explanation_to_markdown(explanation_html: str | None) -> str | None:
+    """Convert an explanation to Markdown.
+
+    Paragraphs and list items use the Markdown of their read-aloud text, so
+    emphasis matches the official explanations; images are left out.
+    """
+    if not explanation_html:
+        return None
+
+    soup = BeautifulSoup(explanation_html, "html.parser")
+    blocks = []
+    for element in soup.find_all(["p", "ul", "ol"], recursive=False):
+        if element.name == "p":
+            text = _block_text(element)
+            if text:
+                blocks.append(text)
+        else:
+            items = element.find_all("li", recursive=False)
+            blocks.append("\n".join(
+                f"{f'{i}.' if element.name == 'ol' else '-'} {_block_text(item)}"
+                for i, item in enumerate(items, 1)
+            ))
+    return "\n\n".join(blocks) or None
+
+
+def question_from_exam(record: dict[str, Any]) -> Question:
+    """Build a Question from one question of an exam's JSON data."""
+    correct_values = set(record.get("correct_answer_array") or [record.get("correct_answer")])
+    image = record.get("image") or {}
+    return Question(
+        id=f"sample-{record['id']}",
+        question=record["question"].strip(),
+        answers=[
+            Answer(text=answer["answer"].strip(), is_correct=answer["value"] in correct_values)
+            for answer in record["answers"]
+        ],
+        chapter=None,
+        category=record.get("chapter_name"),
+        difficulty="medium",
+        source_text=None,
+        explanation=explanation_to_markdown(record.get("explanation")),
+        image_url=image.get("normal"),
+        sign_id=None,
+    )
+
+
+def extract_questions(html_file: Path) -> list[Question]:
+    """Extract every question of a saved sample-question page.
+
+    Args:
+        html_file: Saved sample-question page
+
+    Returns:
+        Questions in exam order; empty if the page has no exam
+    """
+    exam = stream_exam(html_file)
+    if not exam:
+        return []
+    return [question_from_exam(record) for record in exam.get("questions", [])]
+
+
+def question_key(question: Question) -> str:
+    """Get a key that is equal for the same question with shuffled answers."""
+    answers = sorted(
+        (WHITESPACE_RUN.sub(" ", answer.text).lower(), answer.is_correct) for answer in question.answers
+    )
+    return json.dumps([WHITESPACE_RUN.sub(" ", question.question).lower(), answers], ensure_ascii=False)
+
+
+def extract_sample_questions(
+    html_files: list[Path], output_file: Path, jobs: int = 1
+) -> tuple[int, int]:
+    """Extract the questions of many pages into a deduplicated JSONL corpus.
+
+    Pages are parsed in worker processes when jobs > 1. Questions are kept
+    in page order, and a question already seen (by ID, or by its text and
+    answers in any order) is dropped.
+
+    Args:
+        html_files: Saved sample-question pages
+        output_file: JSONL file to write, one question per line
+        jobs: Number of worker processes, 0 for one per CPU core
+
+    Returns:
+        Tuple of (questions written, duplicates dropped)
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(html_files)) or 1
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # map() yields results in submission order, so the corpus is deterministic
+            pages = list(executor.map(extract_questions, html_files))
+    else:
+        pages = [extract_questions(html_file) for html_file in html_files]
+
+    seen_ids = set()
+    seen_keys = set()
+    questions = []
+    duplicates = 0
+    for page in pages:
+        for question in page:
+            key = question_key(question)
+            if question.id in seen_ids or key in seen_keys:
+                duplicates += 1
+                continue
+            seen_ids.add(question.id)
+            seen_keys.add(key)
+            questions.append(question)
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_file.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for question in questions:
+            f.write(question.model_dump_json(exclude_none=True) + "\n")
+    tmp_path.replace(output_file)
+
+    return len(questions), duplicates
+
+
+def load_sample_questions(corpus_file: Path) -> list[Question]:
+    """Load the questions of a corpus written by ``extract_sample_questions``."""
+    with open(corpus_file, "r", encoding="utf-8") as f:
+        return [Question.model_validate_json(line) for line in f if line.strip()]
+
+
+def format_examples(questions: list[Question]) -> str:
+    """Render questions in the structure of the prompt's ``EXAMPLES`` block."""
+    examples = []
+    for question in questions:
+        correct = next((i for i, answer in enumerate(question.answers) if answer.is_correct), None)
+        example = {
+            "question": question.question,
+            "answers": [answer.text for answer in question.answers],
+            "correct_answer": correct,
+            "explanation": question.explanation or "",
+        }
+        examples.append(f"    <example>\n    {json.dumps(example, ensure_ascii=False)}\n    </example>")
+    return "\n<examples>\n" + "\n".join(examples) + "\n</examples>\n"
@@ -0,0 +1,253 @@
+"""Full-text search over the chapters and subsections of the theory book."""
+
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from ..utils.scanner import MTIME_GRACE_NS
+from .markdown_reader import SUBSECTION_HEADING, MarkdownReader
+from .models import ChapterContent, Question
+
+SEARCH_INDEX_FILENAME = ".search-index.sqlite"
+
+# Bump whenever the passages indexed for a chapter change, so every chapter
+# is indexed again
+INDEX_VERSION = "1"
+
+# Column weights for bm25(): a match in a chapter or section title says more
+# about a passage than one in its text
+TITLE_WEIGHT = 5.0
+SECTION_WEIGHT = 3.0
+TEXT_WEIGHT = 1.0
+
+# Marks matched terms in snippets; control characters never occur in the book
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+_QUERY_TERM = re.compile(r"(\w+)(\*?)")
+
+
+class Passage(NamedTuple):
+    """A chapter or subsection matching a search."""
+
+    source: str
+    chapter_number: str
+    chapter_title: str
+    # Subsection title, or None for the chapter's text before its first heading
+    section: str | None
+    text: str
+    # Matched text around the hits, with hits between the highlight marks
+    snippet: str
+    # BM25 relevance; higher is better
+    score: float
+
+
+def chapter_passages(chapter: ChapterContent) -> list[tuple[str | None, str]]:
+    """Get the passages a chapter is indexed as.
+
+    Returns:
+        List of (section title or None, text): the chapter's text before its
+        first subsection heading, then every non-empty subsection
+    """
+    first_heading = SUBSECTION_HEADING.search(chapter.content)
+    intro = chapter.content[:first_heading.start() if first_heading else None].strip()
+    passages: list[tuple[str | None, str]] = [(None, intro)] if intro else []
+    passages.extend(
+        (subsection["title"], subsection["content"])
+        for subsection in chapter.subsections
+        if subsection["content"].strip()
+    )
+    return passages
+
+
+def build_match_query(query: str, match_all: bool = False) -> str | None:
+    """Turn free text into an FTS5 query.
+
+    Every word is matched as a term, and a trailing ``*`` makes it a prefix.
+    Anything else, like FTS5 operators and punctuation, is ignored.
+
+    Args:
+        query: Text to search for
+        match_all: Only match passages containing every word, instead of
+            ranking passages by how many and how rare the matched words are
+
+    Returns:
+        FTS5 query, or None if the text has no words
+    """
+    terms = [f'"{word}"{star}' for word, star in _QUERY_TERM.findall(query.lower())]
+    if not terms:
+        return None
+    return (" AND " if match_all else " OR ").join(terms)
+
+
+class TheorySearchIndex:
+    """SQLite FTS5 index of the passages of a directory's Markdown chapters.
+
+    The index is stored in the directory and kept up to date incrementally:
+    ``update`` only reindexes chapters whose file was added, changed or
+    removed since the last update. Where the directory isn't writable the
+    index is built in memory instead.
+    """
+
+    def __init__(self, markdown_dir: Path, path: Path | None = None):
+        """Open the index of a directory.
+
+        Args:
+            markdown_dir: Directory of converted Markdown chapters
+            path: SQLite file to keep the index in, by default in the directory
+        """
+        self.markdown_dir = Path(markdown_dir)
+        self.path = Path(path) if path else self.markdown_dir / SEARCH_INDEX_FILENAME
+        self.reader = MarkdownReader(self.markdown_dir)
+        self._db: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            try:
+                self._db = self._open(self.path)
+            except sqlite3.OperationalError:
+                # Can't be created here, e.g. a read-only directory
+                self._db = self._open(":memory:")
+            except sqlite3.DatabaseError:
+                # Corrupt or not a database; it only holds derived data
+                self.path.unlink(missing_ok=True)
+                self._db = self._open(self.path)
+        return self._db
+
+    def _open(self, path: Path | str) -> sqlite3.Connection:
+        db = sqlite3.connect(path)
+        try:
+            db.execute("PRAGMA synchronous = OFF")
+            db.execute("PRAGMA journal_mode = MEMORY")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != INDEX_VERSION:
+                with db:
+                    db.execute("DROP TABLE IF EXISTS files")
+                    db.execute("DROP TABLE IF EXISTS passages")
+                    db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (INDEX_VERSION,))
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER)"
+            )
+            # Norwegian letters are kept apart, so "år" and "ar" don't match
+            db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5("
+                "source UNINDEXED, chapter_number UNINDEXED, chapter_title, section, text, "
+                "tokenize = 'unicode61 remove_diacritics 0')"
+            )
+        except sqlite3.DatabaseError:
+            db.close()
+            raise
+        return db
+
+    def update(self) -> tuple[int, int]:
+        """Bring the index up to date with the directory.
+
+        Returns:
+            Tuple of (chapters indexed again, chapters removed)
+        """
+        db = self._connect()
+        indexed = {name: (mtime_ns, size) for name, mtime_ns, size in db.execute("SELECT * FROM files")}
+        files = self.reader.find_markdown_files()
+        present = {file.name for file in files}
+        removed = [name for name in indexed if name not in present]
+
+        changed = []
+        for file in files:
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            if indexed.get(file.name) != (stat.st_mtime_ns, stat.st_size):
+                changed.append((file, stat))
+
+        if not changed and not removed:
+            return 0, 0
+
+        now = time.time_ns()
+        with db:
+            for name in removed:
+                db.execute("DELETE FROM passages WHERE source = ?", (name,))
+                db.execute("DELETE FROM files WHERE name = ?", (name,))
+            for file, stat in changed:
+                db.execute("DELETE FROM passages WHERE source = ?", (file.name,))
+                chapter = self.reader.parse_file(file)
+                if chapter:
+                    db.executemany(
+                        "INSERT INTO passages VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (file.name, chapter.chapter_number, chapter.title, section, text)
+                            for section, text in chapter_passages(chapter)
+                        ],
+                    )
+                # A file changed again within the same mtime tick would go
+                # unnoticed, so recent files are indexed again next time
+                mtime_ns = stat.st_mtime_ns if now - stat.st_mtime_ns > MTIME_GRACE_NS else -1
+                db.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?)", (file.name, mtime_ns, stat.st_size)
+                )
+        return len(changed), len(removed)
+
+    def search(self, query: str, limit: int = 10, match_all: bool = False) -> list[Passage]:
+        """Find the passages best matching a query, ranked by BM25.
+
+        The index is searched as it is; call ``update`` first to pick up
+        changed chapters.
+
+        Args:
+            query: Text to search for
+            limit: Number of passages to return at most
+            match_all: Only return passages containing every word of the query
+
+        Returns:
+            Passages, best match first
+        """
+        match = build_match_query(query, match_all)
+        if match is None:
+            return []
+        rows = self._connect().execute(
+            "SELECT source, chapter_number, chapter_title, section, text, "
+            "snippet(passages, 4, ?, ?, '…', 24), "
+            "bm25(passages, 0, 0, ?, ?, ?) AS rank "
+            "FROM passages WHERE passages MATCH ? ORDER BY rank LIMIT ?",
+            (HIGHLIGHT_START, HIGHLIGHT_END, TITLE_WEIGHT, SECTION_WEIGHT, TEXT_WEIGHT, match, limit),
+        )
+        # SQLite's bm25() is negated so that ascending order is best first
+        return [Passage._make((*row[:6], -row[6])) for row in rows]
+
+    def passages_for_question(self, question: Question, limit: int = 3) -> list[Passage]:
+        """Find the passages a question is most likely grounded in.
+
+        Searches for the question together with its correct answer, so a
+        generated question can be checked against the text it came from.
+        """
+        correct = question.get_correct_answer()
+        return self.search(f"{question.question} {correct.text if correct else ''}", limit=limit)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def search_theory(markdown_dir: Path, query: str, limit: int = 10, match_all: bool = False) -> list[Passage]:
+    """Update a directory's search index and search it.
+
+    Args:
+        markdown_dir: Directory of converted Markdown chapters
+        query: Text to search for
+        limit: Number of passages to return at most
+        match_all: Only return passages containing every word of the query
+
+    Returns:
+        Passages, best match first
+    """
+    index = TheorySearchIndex(markdown_dir)
+    try:
+        index.update()
+        return index.search(query, limit=limit, match_all=match_all)
+    finally:
+        index.close()
@@ -0,0 +1,91 @@
+"""JSON schema for question responses, and incremental parsing of them."""
+
+import json
+from typing import Any
+
+from .models import GeneratedQuestions
+
+# response_format of a completion request that holds the model to the
+# schema of GeneratedQuestions
+QUESTIONS_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "questions",
+        "strict": True,
+        "schema": GeneratedQuestions.model_json_schema(),
+    },
+}
+
+
+class QuestionStreamParser:
+    """Pulls complete question objects out of a JSON response as it arrives.
+
+    Works on both the structured output object, ``{"questions": [...]}``,
+    and the bare array asked for in the prompt, with or without text around
+    it: the objects in the first array of the response are the questions,
+    and anything after that array is ignored. An object is returned as soon as its closing brace is fed, so a
+    response that is cut off, e.g. by ``max_tokens``, still yields every
+    question before the cut.
+    """
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._scanned = 0
+        # Open brackets, and how many were open inside the questions array
+        self._stack: list[str] = []
+        self._array_depth: int | None = None
+        self._in_string = False
+        self._escaped = False
+        self._item_start: int | None = None
+        self._done = False
+
+    def feed(self, text: str) -> list[dict[str, Any]]:
+        """Add the next part of the response.
+
+        Returns:
+            The question objects completed by this part
+        """
+        if self._done:
+            return []
+        self._text += text
+        items = []
+        for i in range(self._scanned, len(self._text)):
+            char = self._text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                if char == "[" and self._array_depth is None:
+                    self._array_depth = len(self._stack) + 1
+                elif char == "{" and len(self._stack) == self._array_depth:
+                    self._item_start = i
+                self._stack.append(char)
+            elif char in "]}" and self._stack:
+                self._stack.pop()
+                if char == "}" and self._item_start is not None and (
+                    len(self._stack) == self._array_depth
+                ):
+                    try:
+                        item = json.loads(self._text[self._item_start : i + 1])
+                    except ValueError:
+                        item = None
+                    if isinstance(item, dict):
+                        items.append(item)
+                    self._item_start = None
+                elif self._array_depth is not None and len(self._stack) < self._array_depth:
+                    # The questions array is closed
+                    self._done = True
+                    break
+        self._scanned = len(self._text)
+        return items
+
+
+def parse_questions(response: str) -> list[dict[str, Any]]:
+    """Get every complete question object of a response, see ``QuestionStreamParser``."""
+    return QuestionStreamParser().feed(response)
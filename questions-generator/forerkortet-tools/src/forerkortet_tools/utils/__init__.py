@@ -2,5 +2,6 @@
 
 from .console import get_console
 from .file_utils import ensure_directory, find_files_by_pattern
+from .scanner import DirectoryScanner
 
-__all__ = ["get_console", "ensure_directory", "find_files_by_pattern"]
\ No newline at end of file
+__all__ = ["get_console", "ensure_directory", "find_files_by_pattern", "DirectoryScanner"]
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""Directory scanning that skips the asset folders of saved web pages."""
+
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+
+# Browsers save a page's scripts, styles and images in a "<page>_files" folder
+ASSET_DIR_MARKER = "_files"
+
+# Listings of directories modified this recently are not cached, since a
+# change made within the same mtime tick would go unnoticed
+MTIME_GRACE_NS = 2_000_000_000
+
+
+class _DirListing(NamedTuple):
+    mtime_ns: int
+    files: Tuple[str, ...]
+    subdirs: Tuple[str, ...]
+
+
+# Directory listings shared by every scanner in the process, keyed by path
+_listing_cache: Dict[str, _DirListing] = {}
+
+
+def _list_directory(path: str) -> _DirListing:
+    """List a directory's files and non-asset subdirectories, reusing the cache
+    while the directory's mtime is unchanged."""
+    mtime_ns = os.stat(path).st_mtime_ns
+    cached = _listing_cache.get(path)
+    if cached and cached.mtime_ns == mtime_ns:
+        return cached
+
+    files = []
+    subdirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                # Asset folders are never entered, which is what keeps a
+                # walk of the theory book cheap
+                if ASSET_DIR_MARKER not in entry.name:
+                    subdirs.append(entry.name)
+            else:
+                files.append(entry.name)
+
+    listing = _DirListing(mtime_ns, tuple(files), tuple(subdirs))
+    if time.time_ns() - mtime_ns > MTIME_GRACE_NS:
+        _listing_cache[path] = listing
+    return listing
+
+
+class DirectoryScanner:
+    """Finds files with a given suffix, skipping ``*_files`` asset folders.
+
+    Directory listings are cached per process and keyed by the directory's
+    mtime, which changes whenever an entry is added, removed or renamed, so
+    repeated scans only stat the directories instead of listing them.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        suffix: str,
+        recursive: bool = False,
+        exclude: Sequence[str] = (),
+    ):
+        """Initialize the scanner.
+
+        Args:
+            root: Directory to scan
+            suffix: Suffix of the files to find, e.g. ``".html"``
+            recursive: Also scan subdirectories (asset folders are never entered)
+            exclude: Skip files whose name contains any of these strings
+        """
+        self.root = Path(root)
+        self.suffix = suffix
+        self.recursive = recursive
+        self.exclude = tuple(exclude)
+
+    def scan(self) -> List[Path]:
+        """Find the matching files.
+
+        Returns:
+            Sorted list of file paths
+        """
+        found = []
+        pending = [str(self.root)]
+        while pending:
+            directory = pending.pop()
+            try:
+                listing = _list_directory(directory)
+            except (FileNotFoundError, NotADirectoryError):
+                # Like glob, a missing directory just has no matches
+                continue
+            for name in listing.files:
+                if name.endswith(self.suffix) and not any(skip in name for skip in self.exclude):
+                    found.append(Path(directory, name))
+            if self.recursive:
+                pending.extend(os.path.join(directory, subdir) for subdir in listing.subdirs)
+        return sorted(found)
+
+    def snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """Get the modification time and size of every matching file.
+
+        Returns:
+            Dictionary mapping file paths to (mtime in nanoseconds, size in bytes)
+        """
+        snapshot = {}
+        for path in self.scan():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
@@ -1,7 +1,9 @@
 """Pytest configuration and fixtures."""
 
 import json
+import os
 import shutil
+import time
 from pathlib import Path
 
 import pytest
@@ -13,6 +15,16 @@ def temp_dir(tmp_path):
     return tmp_path
 
 
+@pytest.fixture
+def age():
+    """Backdate files so listing caches and indexes don't treat them as possibly still changing."""
+    def backdate(*paths, seconds=60):
+        timestamp = time.time() - seconds
+        for path in paths:
+            os.utime(path, (timestamp, timestamp))
+    return backdate
+
+
 @pytest.fixture
 def sample_html_file(temp_dir):
     """Create a sample HTML file for testing."""
@@ -0,0 +1,97 @@
+"""Unit tests for concurrent question generation with the asyncio client."""
+
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from forerkortet_tools.question_generator.generator import QuestionGenerator
+from forerkortet_tools.question_generator.models import ChapterContent
+from forerkortet_tools.question_generator.openai_client import AsyncQuestionGeneratorClient
+
+
+class FakeAsyncOpenAI:
+    """Stands in for AsyncOpenAI, answering after a random delay."""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.closed = False
+        raw = SimpleNamespace(create=self.create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw))
+        FakeAsyncOpenAI.instances.append(self)
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(random.uniform(0, 0.01))
+        self.in_flight -= 1
+        title = kwargs["messages"][1]["content"].split("Chapter: ", 1)[1].split("\n", 1)[0]
+        content = json.dumps([{
+            "question": f"Spørsmål om {title}?",
+            "correct_answer": "Riktig",
+            "incorrect_answers": ["Feil"],
+        }])
+        message = SimpleNamespace(content=content)
+        response = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+    async def close(self):
+        self.closed = True
+
+
+def _chapter(number):
+    return ChapterContent(
+        title=f"Kapittel {number}",
+        chapter_number=str(number),
+        content=f"Tekst om kapittel {number}. " * 10,
+    )
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    FakeAsyncOpenAI.instances = []
+    monkeypatch.setattr(AsyncQuestionGeneratorClient, "azure_client_class", FakeAsyncOpenAI)
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+    return FakeAsyncOpenAI
+
+
+@pytest.mark.asyncio
+async def test_async_client_bounds_requests_in_flight(fake_openai):
+    """Test that no more than max_concurrency requests run at once."""
+    async with AsyncQuestionGeneratorClient(max_concurrency=3) as client:
+        results = await asyncio.gather(
+            *(client.generate_questions(_chapter(i), num_questions=1) for i in range(20))
+        )
+
+    [fake] = fake_openai.instances
+    assert fake.calls == 20
+    assert fake.max_in_flight == 3
+    assert fake.closed
+    assert [questions[0].question for questions in results] == [
+        f"Spørsmål om Kapittel {i}?" for i in range(20)
+    ]
+    assert all(questions[0].chapter == str(i) for i, questions in enumerate(results))
+
+
+def test_generator_streams_chapters_concurrently(fake_openai):
+    """Test that chapters are reported as they finish and banked in chapter order."""
+    generator = QuestionGenerator(questions_per_chapter=1, concurrency=4)
+    chapters = [(f"{i}.md", _chapter(i)) for i in range(12)] + [("tom.md", None)]
+    reported = []
+
+    question_bank, successful, total = generator._generate_for_chapters(
+        chapters, len(chapters), on_chapter=lambda source, chapter, questions: reported.append(source)
+    )
+
+    assert successful == total == 12
+    assert sorted(reported) == sorted(f"{i}.md" for i in range(12))
+    assert [question.chapter for question in question_bank.questions] == [str(i) for i in range(12)]
+    assert fake_openai.instances[-1].max_in_flight <= 4
@@ -0,0 +1,177 @@
+"""Unit tests for generating questions through the Batch API."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from forerkortet_tools.question_generator import batch_api
+from forerkortet_tools.question_generator.batch_api import (
+    AZURE_BATCH_ENDPOINT,
+    BatchRunner,
+    parse_batch_output,
+)
+from forerkortet_tools.question_generator.generator import QuestionGenerator
+from forerkortet_tools.question_generator.openai_client import QuestionGeneratorClient
+from forerkortet_tools.question_generator.response_cache import ResponseCache
+from forerkortet_tools.question_generator.road_signs_generator import RoadSignsQuestionGenerator
+
+
+def _answer(body):
+    """Answer a completion request with a question about what it asked for."""
+    content = body["messages"][1]["content"]
+    text = content if isinstance(content, str) else content[0]["text"]
+    if "Chapter: " in text:
+        subject = text.split("Chapter: ", 1)[1].split("\n", 1)[0]
+    else:
+        subject = text.split("Sign ID: ", 1)[1].split("\n", 1)[0]
+    return json.dumps([{
+        "question": f"Spørsmål om {subject}?",
+        "correct_answer": "Riktig",
+        "incorrect_answers": ["Feil"],
+    }])
+
+
+class FakeBatchOpenAI:
+    """Stands in for OpenAI's files and batches APIs, answering batches once polled."""
+
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.uploads = {}
+        self.batches_created = []
+        self.polls = 0
+        # Custom IDs of requests that fail, and whether batches take two polls
+        self.fail = set()
+        self.slow = False
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+        raw = SimpleNamespace(create=self._interactive)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw))
+        FakeBatchOpenAI.instances.append(self)
+
+    def _interactive(self, **kwargs):
+        raise AssertionError("Batch mode made an interactive request")
+
+    def _create_file(self, file, purpose):
+        assert purpose == "batch"
+        file_id = f"file-{len(self.uploads)}"
+        self.uploads[file_id] = file[1].decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def _file_content(self, file_id):
+        return SimpleNamespace(text=self.uploads[file_id])
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        lines = [json.loads(line) for line in self.uploads[input_file_id].splitlines()]
+        assert all(line["url"] == endpoint for line in lines)
+        self.batches_created.append(lines)
+        return SimpleNamespace(id=f"batch-{len(self.batches_created) - 1}")
+
+    def _retrieve_batch(self, batch_id):
+        self.polls += 1
+        lines = self.batches_created[int(batch_id.split("-")[1])]
+        counts = SimpleNamespace(total=len(lines), completed=0, failed=0)
+        if self.slow and self.polls % 2:
+            return SimpleNamespace(
+                status="in_progress", request_counts=counts, output_file_id=None
+            )
+
+        output = []
+        for line in lines:
+            if line["custom_id"] in self.fail:
+                error = {"code": "server_error"}
+                output.append({"custom_id": line["custom_id"], "response": None, "error": error})
+            else:
+                body = {"choices": [{"message": {"content": _answer(line["body"])}}]}
+                output.append({
+                    "custom_id": line["custom_id"],
+                    "response": {"status_code": 200, "body": body},
+                    "error": None,
+                })
+        output_id = f"file-{len(self.uploads)}"
+        self.uploads[output_id] = "\n".join(json.dumps(line) for line in output)
+        counts.completed = len(lines)
+        return SimpleNamespace(status="completed", request_counts=counts, output_file_id=output_id)
+
+
+@pytest.fixture
+def fake_batch_openai(monkeypatch):
+    FakeBatchOpenAI.instances = []
+    monkeypatch.setattr(QuestionGeneratorClient, "azure_client_class", FakeBatchOpenAI)
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+    return FakeBatchOpenAI
+
+
+def test_runner_splits_batches_and_keeps_order(monkeypatch):
+    """Test that results map back to their requests across several batches."""
+    monkeypatch.setattr(batch_api, "MAX_BATCH_REQUESTS", 2)
+    client = FakeBatchOpenAI()
+    client.fail = {"3"}
+    client.slow = True
+    requests = [
+        {"model": "m", "messages": [{}, {"role": "user", "content": f"Chapter: {i}\n"}]}
+        for i in range(5)
+    ]
+
+    results = BatchRunner(client, AZURE_BATCH_ENDPOINT, poll_interval=0).run(requests)
+
+    assert [len(lines) for lines in client.batches_created] == [2, 2, 1]
+    assert client.polls == 6
+    questions = [json.loads(r["message"]["content"])[0]["question"] if r else None for r in results]
+    assert questions == [
+        "Spørsmål om 0?", "Spørsmål om 1?", "Spørsmål om 2?", None, "Spørsmål om 4?"
+    ]
+    assert parse_batch_output('{"custom_id": "0", "response": {"status_code": 500}}\n') == {}
+
+
+def test_generator_batch_api_writes_chapter_files(
+    fake_batch_openai, sample_markdown_file, temp_dir
+):
+    """Test that batch mode writes the same per-chapter files, and reuses cached responses."""
+    output_dir = temp_dir / "out"
+    cache = ResponseCache(temp_dir / "cache")
+    generator = QuestionGenerator(questions_per_chapter=2, batch_api=True, cache=cache)
+
+    question_bank = generator.generate_from_directory_separate(temp_dir, output_dir)
+
+    assert [q.question for q in question_bank.questions] == ["Spørsmål om Test Chapter?"]
+    [chapter_file] = output_dir.glob("*.json")
+    saved = json.loads(chapter_file.read_text(encoding="utf-8"))
+    assert saved["questions"][0]["question"] == "Spørsmål om Test Chapter?"
+
+    generator = QuestionGenerator(questions_per_chapter=2, batch_api=True, cache=cache)
+    assert len(generator.generate_from_directory(temp_dir).questions) == 1
+    assert fake_batch_openai.instances[-1].batches_created == []
+
+
+def test_road_signs_batch_api_writes_sign_files(fake_batch_openai, temp_dir):
+    """Test that batch mode maps sign responses back to their own files."""
+    image_file = temp_dir / "sign.png"
+    image_file.write_bytes(b"png")
+    description = "Skiltet varsler om farlig sving i veien."
+    signs = [
+        {"id": "100", "name": "100 Farlig sving", "image_file": str(image_file)},
+        {"id": "102", "name": "102 Farlige svinger"},
+        {"id": "104", "name": "104 Smalere veg", "image_file": str(image_file)},
+    ]
+    for sign in signs:
+        sign["description"] = description
+    signs_file = temp_dir / "signs.json"
+    signs_file.write_text(json.dumps({"signs": signs}), encoding="utf-8")
+
+    generator = RoadSignsQuestionGenerator()
+    question_bank = generator.generate_from_signs_data_separate(
+        signs_file, temp_dir / "out", batch_api=True
+    )
+
+    assert sorted(q.question for q in question_bank.questions) == [
+        "Spørsmål om 100?", "Spørsmål om 104?"
+    ]
+    [batch] = fake_batch_openai.instances[0].batches_created
+    assert len(batch) == 2
+    files = sorted(path.name for path in (temp_dir / "out").glob("*.json"))
+    assert files == ["sign_100_100_Farlig_sving.json", "sign_104_104_Smalere_veg.json"]
+    saved = json.loads((temp_dir / "out" / files[1]).read_text(encoding="utf-8"))
+    assert saved["questions"][0]["question"] == "Spørsmål om 104?"
@@ -0,0 +1,45 @@
+"""Unit tests for the single-file book bundle."""
+
+from forerkortet_tools.question_generator.book_bundle import (
+    load_book_bundle,
+    subsection_spans,
+    write_book_bundle,
+)
+from forerkortet_tools.question_generator.markdown_reader import MarkdownReader
+
+
+def test_bundle_round_trips_parsed_chapters(sample_markdown_file, temp_dir):
+    """Test that loading a bundle gives the chapters MarkdownReader parses."""
+    (temp_dir / "Nøkkelord.md").write_text("# Nøkkelord\n\n" + "ord " * 50, encoding="utf-8")
+    bundle_path = temp_dir / "bundle" / "book.jsonl"
+
+    assert write_book_bundle(temp_dir, bundle_path) == 1
+
+    [(source, chapter)] = load_book_bundle(bundle_path)
+    expected = MarkdownReader(temp_dir).parse_file(sample_markdown_file)
+
+    assert source == sample_markdown_file.name
+    assert chapter.title == expected.title == "Test Chapter"
+    assert chapter.chapter_number == expected.chapter_number == "1.1.1"
+    assert chapter.content == expected.content
+    assert chapter.metadata == expected.metadata
+    assert [(s["title"], s["content"]) for s in chapter.subsections] == [
+        (s["title"], s["content"]) for s in expected.subsections
+    ]
+
+
+def test_subsection_spans_match_reader(temp_dir):
+    """Test that span slices equal the reader's subsection texts."""
+    content = (
+        "Intro text\n\n"
+        "## Første del  \n\n  Tekst én\nmed to linjer\n\n\n"
+        "### Tom\n"
+        "#### Siste del\nSlutt\n\n"
+    )
+    expected = MarkdownReader(temp_dir)._extract_subsections(content)
+
+    spans = subsection_spans(content)
+
+    assert [(title, content[start:end]) for title, start, end in spans] == [
+        (s["title"], s["content"]) for s in expected
+    ]
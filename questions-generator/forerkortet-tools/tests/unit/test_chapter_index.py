@@ -0,0 +1,73 @@
+"""Unit tests for the persistent chapter index."""
+
+from forerkortet_tools.question_generator.chapter_index import INDEX_FILENAME
+from forerkortet_tools.question_generator.markdown_reader import MarkdownReader
+
+
+def test_unchanged_files_load_from_index(sample_markdown_file, temp_dir, monkeypatch, age):
+    """Test that a new reader loads unchanged chapters without parsing them."""
+    age(sample_markdown_file)
+    expected = MarkdownReader(temp_dir, use_index=False).parse_file(sample_markdown_file)
+
+    assert MarkdownReader(temp_dir).parse_file(sample_markdown_file) == expected
+    assert (temp_dir / INDEX_FILENAME).exists()
+
+    reader = MarkdownReader(temp_dir)
+    monkeypatch.setattr(reader, "_parse", _fail_if_parsed)
+    assert reader.parse_file(sample_markdown_file) == expected
+
+
+def test_index_keeps_chapters_lazy(sample_markdown_file, temp_dir, age):
+    """Test that indexing and loading a chapter don't work out its lazy fields."""
+    age(sample_markdown_file)
+    expected = MarkdownReader(temp_dir, use_index=False).parse_file(sample_markdown_file)
+
+    for reader in (MarkdownReader(temp_dir), MarkdownReader(temp_dir)):
+        chapter = reader.parse_file(sample_markdown_file)
+        assert "metadata" not in chapter.__dict__
+        assert "subsections" not in chapter.__dict__
+        assert chapter.metadata == expected.metadata
+        assert chapter.subsections == expected.subsections
+
+
+def _fail_if_parsed(file_path):
+    raise AssertionError(f"{file_path} was parsed again")
+
+
+def test_changed_files_are_parsed_again(sample_markdown_file, temp_dir, age):
+    """Test that an edited file is parsed again and removed files are pruned."""
+    age(sample_markdown_file, seconds=120)
+    MarkdownReader(temp_dir).parse_file(sample_markdown_file)
+
+    sample_markdown_file.write_text(
+        sample_markdown_file.read_text(encoding="utf-8").replace("Subsection 2", "Subsection Two"),
+        encoding="utf-8",
+    )
+    age(sample_markdown_file)
+    reader = MarkdownReader(temp_dir)
+    chapter = reader.parse_file(sample_markdown_file)
+    assert [s["title"] for s in chapter.subsections] == ["Subsection 1", "Subsection Two"]
+
+    sample_markdown_file.unlink()
+    assert reader.find_markdown_files() == []
+    assert MarkdownReader(temp_dir).index.get(sample_markdown_file.name, 0, 0) is None
+
+
+def test_recently_modified_files_are_not_indexed(sample_markdown_file, temp_dir):
+    """Test that files modified within the mtime grace period are always parsed."""
+    reader = MarkdownReader(temp_dir)
+    assert reader.parse_file(sample_markdown_file) is not None
+    assert reader.index._load() == {}
+
+
+def test_corrupt_index_is_rebuilt(sample_markdown_file, temp_dir, age):
+    """Test that an unreadable index file is replaced instead of breaking parsing."""
+    age(sample_markdown_file)
+    (temp_dir / INDEX_FILENAME).write_bytes(b"not a database" * 100)
+
+    chapter = MarkdownReader(temp_dir).parse_file(sample_markdown_file)
+
+    assert chapter is not None
+    assert MarkdownReader(temp_dir).parse_file(sample_markdown_file) == chapter
+    stat = sample_markdown_file.stat()
+    assert MarkdownReader(temp_dir).index.get(sample_markdown_file.name, stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,88 @@
+"""Unit tests for token-budgeted chapter chunking."""
+
+import re
+from types import SimpleNamespace
+
+from forerkortet_tools.question_generator.chunking import (
+    ContentChunk,
+    allocate_questions,
+    chunk_chapter,
+    estimate_tokens,
+)
+from forerkortet_tools.question_generator.models import ChapterContent
+from forerkortet_tools.question_generator.openai_client import QuestionGeneratorClient
+
+
+def _chapter(sections):
+    content = "Innledning til kapittelet.\n\n" + "\n\n".join(
+        f"## {title}\n\n{body}" for title, body in sections
+    )
+    return ChapterContent(title="Kjøring", chapter_number="1.1", content=content)
+
+
+def _words(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def test_chunks_follow_headings_within_budget():
+    """Test that short subsections are merged, long ones split, and nothing is lost."""
+    long_body = "\n\n".join(f"Avsnitt {i} om forbikjøring på landevei." for i in range(40))
+    chapter = _chapter([
+        ("Fart", "Hold fartsgrensen."),
+        ("Avstand", "Hold god avstand.\n\n![Illustrasjon](./1.1 - Kjøring_files/abc123.png)"),
+        ("Forbikjøring", long_body),
+    ])
+
+    chunks = chunk_chapter(chapter, max_tokens=100)
+
+    assert len(chunks) > 2
+    assert all(chunk.tokens <= 100 for chunk in chunks)
+    assert chunks[0].titles == ["Fart", "Avstand"]
+    assert chunks[0].text.startswith("Innledning")
+    assert "## Forbikjøring" not in chunks[0].text
+    assert all(chunk.titles == ["Forbikjøring"] for chunk in chunks[1:])
+    assert "_files" not in " ".join(chunk.text for chunk in chunks)
+    assert _words(" ".join(chunk.text for chunk in chunks)) == _words(
+        chapter.content.replace("![Illustrasjon](./1.1 - Kjøring_files/abc123.png)", "")
+    )
+    assert estimate_tokens("Forbikjøring, fart.") == 6
+
+
+def test_allocate_questions_covers_every_window():
+    """Test that questions follow content size and every window gets one."""
+    chunks = [
+        ContentChunk("kort", 50, ["Kort"]),
+        ContentChunk("lang", 400, ["Lang"]),
+        ContentChunk("middels", 150, ["Middels"]),
+    ]
+
+    counts = allocate_questions(chunks, 10)
+
+    assert counts == [1, 6, 3]
+    assert allocate_questions(chunks, 1) == [1] * len(chunks)
+    assert allocate_questions([], 5) == []
+
+
+def test_client_requests_each_window(mock_openai_response):
+    """Test that a long chapter is sent in windows instead of being truncated."""
+    long_body = "\n\n".join(f"Avsnitt {i} om vikeplikt i kryss." for i in range(200))
+    chapter = _chapter([("Vikeplikt", long_body), ("Rundkjøring", "Kjør til høyre.")])
+    client = QuestionGeneratorClient(api_key="test", use_azure=False, max_chunk_tokens=500)
+    prompts = []
+
+    def create(**kwargs):
+        prompts.append(kwargs["messages"][1]["content"])
+        content = mock_openai_response["choices"][0]["message"]["content"]
+        message = SimpleNamespace(content=content)
+        response = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+    completions = SimpleNamespace(with_raw_response=SimpleNamespace(create=create))
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    questions = client.generate_questions(chapter, num_questions=5, num_incorrect_answers=3)
+
+    assert len(prompts) == len(chunk_chapter(chapter, 500)) > 1
+    assert len(questions) == len(prompts)
+    assert any("Avsnitt 199 om vikeplikt" in prompt for prompt in prompts)
+    assert f"(part 1 of {len(prompts)})" in prompts[0]
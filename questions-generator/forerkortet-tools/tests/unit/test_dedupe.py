@@ -0,0 +1,153 @@
+"""Unit tests for converter duplicate detection."""
+
+import inspect
+import random
+import sys
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from forerkortet_tools.html_converter import HTMLToMarkdownConverter
+from forerkortet_tools.html_converter import cleanup as cleanup_module
+from forerkortet_tools.html_converter.dedupe import NearDuplicateIndex, find_repeated_phrase
+
+THEORY_BOOK_DIR = Path(__file__).parents[2] / "data" / "input" / "theory-book-html"
+
+# Long chapters where the near-duplicate filter does the most work
+BUNDLED_CHAPTERS = [
+    "Nøkkelord.html",
+    "2.2.1 - Bremser.html",
+    "6.1.2 - Se-reglene.html",
+    "7.1.3 - Vikeplikt.html",
+    "7.6.1 - Stans og parkering.html",
+]
+
+
+class PairwiseIndex:
+    """Reference implementation comparing against every indexed set."""
+
+    def __init__(self, threshold=0.8, min_words=5, word_frequencies=None):
+        self.threshold = threshold
+        self.min_words = min_words
+        self.sets = []
+
+    def is_duplicate(self, words):
+        return any(
+            len(words) > self.min_words
+            and len(seen) > self.min_words
+            and len(words & seen) / len(words | seen) > self.threshold
+            for seen in self.sets
+        )
+
+    def add(self, words):
+        self.sets.append(words)
+
+
+class TestNearDuplicateIndex:
+    """Test the prefix-filtered near-duplicate index."""
+
+    def test_detects_near_duplicate(self):
+        """Test that a line differing by one word out of many is a duplicate."""
+        index = NearDuplicateIndex()
+        index.add({
+            "du", "skal", "alltid", "stoppe", "helt", "opp", "ved", "rødt", "lys", "i", "krysset",
+            "foran", "deg",
+        })
+
+        assert index.is_duplicate({
+            "du", "skal", "alltid", "stoppe", "helt", "opp", "ved", "rødt", "lys", "i", "kryss",
+            "foran", "deg",
+        })
+        assert not index.is_duplicate(
+            {"parkering", "er", "forbudt", "på", "fortauet", "langs", "veien"}
+        )
+
+    def test_small_sets_are_never_duplicates(self):
+        """Test that sets at or below min_words are ignored."""
+        index = NearDuplicateIndex()
+        words = {"en", "to", "tre", "fire", "fem"}
+        index.add(words)
+
+        assert not index.is_duplicate(words)
+
+    def test_matches_pairwise_scan(self):
+        """Test that results match comparing against every earlier set."""
+        rng = random.Random(1234)
+        vocabulary = [f"w{i}" for i in range(40)]
+        frequencies = {word: rng.randint(0, 50) for word in vocabulary[:30]}
+
+        fast = NearDuplicateIndex(word_frequencies=frequencies)
+        reference = PairwiseIndex()
+
+        base_sets = [set(rng.sample(vocabulary, rng.randint(3, 20))) for _ in range(50)]
+        for _ in range(2000):
+            words = set(rng.choice(base_sets))
+            # Mutate a known set slightly so near-duplicates are common
+            for _ in range(rng.randint(0, 3)):
+                if words and rng.random() < 0.5:
+                    words.discard(rng.choice(sorted(words)))
+                else:
+                    words.add(rng.choice(vocabulary))
+
+            expected = reference.is_duplicate(words)
+            assert fast.is_duplicate(words) == expected
+            if not expected:
+                fast.add(words)
+                reference.add(words)
+
+
+class TestFindRepeatedPhrase:
+    """Test repeated word n-gram detection."""
+
+    def test_prefers_longest_then_earliest(self):
+        """Test that the longest phrase wins, then the earliest start."""
+        words = ["a", "b", "c", "x", "a", "b", "c", "y", "a", "b"]
+        assert find_repeated_phrase(words, min_length=2, max_length=8) == (0, 4, 3)
+
+        words = ["p", "q", "r", "p", "q", "r", "s", "t", "u", "s", "t", "u"]
+        assert find_repeated_phrase(words, min_length=3, max_length=8) == (0, 3, 3)
+
+    def test_repeats_do_not_overlap(self):
+        """Test that a repeat must start after the phrase ends."""
+        words = ["a", "a", "a", "a"]
+        assert find_repeated_phrase(words, min_length=3, max_length=8) is None
+        assert find_repeated_phrase(words, min_length=2, max_length=8) == (0, 2, 2)
+
+    def test_adjacent_only(self):
+        """Test that adjacent mode ignores repeats further away."""
+        words = ["a", "b", "x", "a", "b"]
+        assert find_repeated_phrase(words, min_length=2, max_length=10, adjacent=True) is None
+        assert find_repeated_phrase(words, min_length=2, max_length=10) == (0, 3, 2)
+
+
+def test_remove_line_duplicates_does_not_recurse(temp_dir):
+    """Test that removing many repeats doesn't grow the call stack."""
+    converter = HTMLToMarkdownConverter(temp_dir, temp_dir)
+    line = "Husk å bruke blinklys i god tid " * 200
+
+    # Leave room for only a few frames beyond the current stack depth
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack()) + 20)
+    try:
+        result = converter._remove_line_duplicates(line)
+    finally:
+        sys.setrecursionlimit(old_limit)
+
+    assert result == "Husk å bruke blinklys i god tid"
+
+
+@pytest.mark.skipif(not THEORY_BOOK_DIR.exists(), reason="theory book HTML not available")
+@pytest.mark.parametrize("chapter", BUNDLED_CHAPTERS)
+def test_clean_markdown_matches_pairwise_scan(chapter, temp_dir, monkeypatch):
+    """Test identical output to the pairwise scan on the bundled chapters."""
+    html = (THEORY_BOOK_DIR / chapter).read_text(encoding="utf-8")
+    converter = HTMLToMarkdownConverter(THEORY_BOOK_DIR, temp_dir)
+
+    fast_output = converter.extract_main_content(BeautifulSoup(html, "lxml"))
+
+    monkeypatch.setattr(cleanup_module, "NearDuplicateIndex", PairwiseIndex)
+    reference_output = converter.extract_main_content(BeautifulSoup(html, "lxml"))
+
+    assert fast_output
+    assert fast_output == reference_output
@@ -2,6 +2,7 @@
 
 import pytest
 from pathlib import Path
+from bs4 import BeautifulSoup
 
 from forerkortet_tools.html_converter import HTMLToMarkdownConverter
 
@@ -108,4 +109,367 @@ class TestHTMLToMarkdownConverter:
         md = "Content\nForrige\nNeste\nMore content"
         cleaned = converter.clean_markdown(md)
         assert "Forrige" not in cleaned
-        assert "Neste" not in cleaned
\ No newline at end of file
+        assert "Neste" not in cleaned
+    
+    def test_convert_all_parallel_matches_sequential(self, sample_html_file, temp_dir):
+        """Test that parallel conversion produces the same files as sequential."""
+        html = sample_html_file.read_text(encoding="utf-8")
+        (temp_dir / "1.1.2 - Test Chapter.html").write_text(
+            html.replace("1.1.1", "1.1.2"), encoding="utf-8"
+        )
+        
+        sequential = HTMLToMarkdownConverter(temp_dir, temp_dir / "sequential")
+        parallel = HTMLToMarkdownConverter(temp_dir, temp_dir / "parallel")
+        
+        assert sequential.convert_all() == (2, 2)
+        assert parallel.convert_all(jobs=2) == (2, 2)
+        
+        for output_file in sorted((temp_dir / "sequential").glob("*.md")):
+            parallel_file = temp_dir / "parallel" / output_file.name
+            assert parallel_file.read_text(encoding="utf-8") == output_file.read_text(encoding="utf-8")
+    
+    def test_low_memory_recycles_workers(self, sample_html_file, temp_dir):
+        """Test that low-memory conversion with recycled workers gives the same files."""
+        html = sample_html_file.read_text(encoding="utf-8")
+        for number in ("1.1.2", "1.1.3", "1.1.4"):
+            (temp_dir / f"{number} - Test Chapter.html").write_text(
+                html.replace("1.1.1", number), encoding="utf-8"
+            )
+        
+        sequential = HTMLToMarkdownConverter(temp_dir, temp_dir / "sequential")
+        low_memory = HTMLToMarkdownConverter(temp_dir, temp_dir / "low-memory", low_memory=True)
+        
+        assert sequential.convert_all() == (4, 4)
+        # Every worker is over a 1 MB ceiling, so each pool is replaced
+        assert low_memory.convert_all(max_worker_rss_mb=1) == (4, 4)
+        
+        for output_file in sorted((temp_dir / "sequential").glob("*.md")):
+            low_memory_file = temp_dir / "low-memory" / output_file.name
+            assert low_memory_file.read_text(encoding="utf-8") == output_file.read_text(encoding="utf-8")
+    
+    def test_convert_all_is_incremental(self, sample_html_file, temp_dir):
+        """Test that unchanged files are skipped and stale outputs are removed."""
+        output_dir = temp_dir / "output"
+        second_file = temp_dir / "1.1.2 - Test Chapter.html"
+        second_file.write_text(
+            sample_html_file.read_text(encoding="utf-8").replace("1.1.1", "1.1.2"),
+            encoding="utf-8",
+        )
+        
+        converter = HTMLToMarkdownConverter(temp_dir, output_dir)
+        assert converter.convert_all() == (2, 2)
+        
+        converted = []
+        original_convert_file = converter.convert_file
+        
+        def spy(html_file):
+            converted.append(html_file.name)
+            return original_convert_file(html_file)
+        
+        converter.convert_file = spy
+        
+        # Nothing changed
+        assert converter.convert_all() == (2, 2)
+        assert converted == []
+        
+        # One source edited
+        second_file.write_text(
+            second_file.read_text(encoding="utf-8").replace("Subsection 2", "Subsection Two"),
+            encoding="utf-8",
+        )
+        assert converter.convert_all() == (2, 2)
+        assert converted == [second_file.name]
+        
+        # One source removed
+        second_output = next(output_dir.glob("1.1.2*.md"))
+        second_file.unlink()
+        assert converter.convert_all() == (1, 1)
+        assert not second_output.exists()
+        assert len(list(output_dir.glob("*.md"))) == 1
+        
+        # Forced rebuild converts everything again
+        converted.clear()
+        converter.convert_all(force=True)
+        assert converted == [sample_html_file.name]
+    
+    def test_convert_all_retries_failures_and_option_changes(self, sample_html_file, temp_dir):
+        """Test that failed files aren't recorded and changed options reconvert."""
+        from forerkortet_tools.html_converter.cleanup import CleanupPipeline, DOCUMENT_RULES
+        
+        output_dir = temp_dir / "output"
+        short_file = temp_dir / "1.1.2 - Short.html"
+        short_file.write_text("<html><body><main><p>Kort.</p></main></body></html>", encoding="utf-8")
+        
+        converter = HTMLToMarkdownConverter(temp_dir, output_dir)
+        
+        def broken(*args):
+            raise RuntimeError("disk full")
+        
+        converter.create_chapter_structure = broken
+        assert converter.convert_all() == (0, 2)
+        del converter.create_chapter_structure
+        
+        converted = []
+        
+        def spy_on(target):
+            original_convert_file = target.convert_file
+            
+            def spy(html_file):
+                converted.append(html_file.name)
+                return original_convert_file(html_file)
+            
+            target.convert_file = spy
+        
+        spy_on(converter)
+        
+        # The failed file is retried; too little content is remembered
+        assert converter.convert_all() == (1, 2)
+        assert converted == [sample_html_file.name]
+        converted.clear()
+        assert converter.convert_all() == (1, 2)
+        assert converted == []
+        
+        # Other options write other Markdown, so everything is reconverted
+        for options in (
+            {"markdown_backend": "markdownify"},
+            {"cleanup": CleanupPipeline(document_rules=list(DOCUMENT_RULES)[:2])},
+        ):
+            other = HTMLToMarkdownConverter(temp_dir, output_dir, **options)
+            assert other.output_version() != converter.output_version()
+            converter.convert_all()
+            converted.clear()
+            spy_on(other)
+            other.convert_all()
+            assert sorted(converted) == sorted([short_file.name, sample_html_file.name])
+    
+    def test_streaming_matches_full_parse(self, sample_html_file, temp_dir):
+        """Test that the streaming parser gives the same Markdown as the full tree."""
+        streaming = HTMLToMarkdownConverter(temp_dir, temp_dir / "streaming")
+        full = HTMLToMarkdownConverter(temp_dir, temp_dir / "full", streaming=False)
+        
+        assert streaming._extract_streaming(sample_html_file) is not None
+        
+        streamed_file = streaming.convert_file(sample_html_file)
+        full_file = full.convert_file(sample_html_file)
+        assert streamed_file.read_text(encoding="utf-8") == full_file.read_text(encoding="utf-8")
+    
+    def test_streaming_falls_back_without_usable_main(self, temp_dir):
+        """Test that pages without a usable <main> take the full-tree path."""
+        converter = HTMLToMarkdownConverter(temp_dir, temp_dir / "output")
+        body = (
+            "<p>Dette kapittelet handler om vikeplikt og forkjørsregler i kryss.</p>"
+            "<p>Du har vikeplikt for trafikk som kommer fra høyre når ikke annet er skiltet.</p>"
+        )
+        
+        no_main = temp_dir / "1.1.1 - No main.html"
+        no_main.write_text(f"<html><body><div class='content'>{body}</div></body></html>", encoding="utf-8")
+        
+        # The container would be removed with the navigation around it
+        in_nav = temp_dir / "1.1.2 - Main in nav.html"
+        in_nav.write_text(
+            f"<html><body><div class='sidebar'><main>{body}</main></div>"
+            f"<article>{body}</article></body></html>",
+            encoding="utf-8",
+        )
+        
+        for html_file in (no_main, in_nav):
+            assert converter._extract_streaming(html_file) is None
+            output_file = converter.convert_file(html_file)
+            assert output_file is not None
+            assert "vikeplikt" in output_file.read_text(encoding="utf-8")
+    
+    def test_streaming_title_falls_back_to_heading_with_markup(self, temp_dir):
+        """Test that the <h1> title keeps the text of its child elements."""
+        converter = HTMLToMarkdownConverter(temp_dir, temp_dir / "output")
+        body = "<p>Dette kapittelet handler om vikeplikt og forkjørsregler i kryss.</p>" * 3
+        html = f"<html><body><h1><span>1.1</span><em>Vikeplikt</em></h1><main>{body}</main></body></html>"
+        html_file = temp_dir / "1.1 - Vikeplikt.html"
+        html_file.write_text(html, encoding="utf-8")
+        
+        title, _ = converter._extract_streaming(html_file)
+        assert "Vikeplikt" in title
+        assert title == converter.extract_title(BeautifulSoup(html, "lxml"))
+    
+    def test_text_length_index_matches_get_text(self):
+        """Test that indexed text lengths equal len(get_text(strip=True))."""
+        from bs4 import BeautifulSoup
+        
+        from forerkortet_tools.html_converter.converter import TextLengthIndex
+        
+        html = """
+        <html><body>
+          <div id="outer"> Intro
+            <div><p> Første  avsnitt </p><!-- kommentar --><script>var x = 1;</script></div>
+            <div><ul><li>Én</li><li> To </li></ul><style>p { color: red; }</style></div>
+            <template><p>Mal</p></template>
+          </div>
+          <div>Kort</div>
+        </body></html>
+        """
+        soup = BeautifulSoup(html, "lxml")
+        index = TextLengthIndex(soup)
+        
+        for tag in [soup, *soup.find_all(True)]:
+            assert index.length(tag) == len(tag.get_text(strip=True)), tag.name
+    
+    def test_cleanup_pipeline_rules_can_be_selected(self, temp_dir):
+        """Test that the cleanup pipeline only runs the configured rules."""
+        from forerkortet_tools.html_converter.cleanup import CleanupPipeline, LINE_RULES
+        
+        md = "Content\nForrige\n42\nMore content"
+        default = HTMLToMarkdownConverter(temp_dir, temp_dir)
+        assert default.clean_markdown(md) == "Content\nMore content"
+        
+        line_rules = [name for name in LINE_RULES if name != "drop_navigation"]
+        custom = HTMLToMarkdownConverter(
+            temp_dir, temp_dir, cleanup=CleanupPipeline(line_rules=line_rules)
+        )
+        assert custom.clean_markdown(md) == "Content\nForrige\nMore content"
+        
+        with pytest.raises(ValueError, match="no_such_rule"):
+            CleanupPipeline(final_rules=["no_such_rule"])
+    
+    def test_convert_all_profiles_cleanup_rules(self, sample_html_file, temp_dir):
+        """Test that profiling records every rule across the converted files."""
+        from forerkortet_tools.html_converter.cleanup import (
+            CleanupPipeline,
+            DOCUMENT_RULES,
+            FINAL_RULES,
+        )
+        
+        converter = HTMLToMarkdownConverter(
+            temp_dir, temp_dir / "output", cleanup=CleanupPipeline(profile=True)
+        )
+        assert converter.convert_all() == (1, 1)
+        
+        profile = converter.cleanup.profile
+        for name in [*DOCUMENT_RULES, *FINAL_RULES]:
+            assert profile.calls[name] == 1
+        assert profile.calls["drop_numbers_only"] > 0
+        assert all(seconds >= 0 for seconds in profile.seconds.values())
+    
+    def test_convert_all_writes_stage_trace(self, sample_html_file, temp_dir):
+        """Test that tracing records every stage of each file to the trace file."""
+        import json
+        
+        trace_file = temp_dir / "trace.jsonl"
+        converter = HTMLToMarkdownConverter(
+            temp_dir, temp_dir / "output", trace=True, trace_allocations=True
+        )
+        assert converter.convert_all(trace_file=trace_file) == (1, 1)
+        
+        [trace] = [json.loads(line) for line in trace_file.read_text(encoding="utf-8").splitlines()]
+        assert trace["file"] == sample_html_file.name
+        assert trace["bytes_in"] == sample_html_file.stat().st_size
+        
+        stages = {record["stage"]: record for record in trace["stages"]}
+        assert list(stages) == [
+            "stream", "parse", "boilerplate", "strip_nested", "markdown", "clean_markdown", "write"
+        ]
+        assert stages["stream"]["bytes_in"] == trace["bytes_in"]
+        assert stages["markdown"]["bytes_out"] == stages["clean_markdown"]["bytes_in"]
+        assert all(record["seconds"] >= 0 for record in trace["stages"])
+        assert all(record["peak_alloc_bytes"] is not None for record in trace["stages"])
+        assert all(record["max_rss_kb"] > 0 for record in trace["stages"])
+
+
+THEORY_BOOK_DIR = Path(__file__).parents[2] / "data" / "input" / "theory-book-html"
+
+
+@pytest.mark.parametrize(
+    "html_name",
+    [None, "1 - Introduksjon.html", "2.2.1 - Bremser.html", "10.1.1 - Fareskilt.html"],
+)
+def test_tree_backend_matches_markdownify(html_name, sample_html_file):
+    """Test that walking the parsed tree gives markdownify's exact output."""
+    from bs4 import BeautifulSoup
+    
+    from forerkortet_tools.html_converter.backends import MarkdownifyBackend, TreeBackend
+    
+    html_file = sample_html_file if html_name is None else THEORY_BOOK_DIR / html_name
+    if not html_file.exists():
+        pytest.skip("theory book HTML not available")
+    
+    soup = BeautifulSoup(html_file.read_text(encoding="utf-8"), "lxml")
+    HTMLToMarkdownConverter(html_file.parent, sample_html_file.parent).remove_boilerplate(soup)
+    content = soup.find("main")
+    
+    expected = MarkdownifyBackend().convert(content)
+    assert expected
+    assert TreeBackend().convert(content) == expected
+
+
+def test_unknown_markdown_backend(temp_dir):
+    """Test that an unknown backend name is rejected."""
+    with pytest.raises(ValueError, match="Unknown markdown backend"):
+        HTMLToMarkdownConverter(temp_dir, temp_dir, markdown_backend="pandoc")
+
+
+@pytest.mark.parametrize("poll", [True, False])
+def test_watch_reconverts_changed_files(poll, sample_html_file, temp_dir):
+    """Test that watch mode reconverts only the chapters that change, tracing each run."""
+    import json
+    import threading
+    
+    from forerkortet_tools.html_converter.watch import watch
+    
+    output_dir = temp_dir / "output"
+    trace_file = temp_dir / "trace.jsonl"
+    converter = HTMLToMarkdownConverter(temp_dir, output_dir, trace=True)
+    
+    def traced_files():
+        lines = trace_file.read_text(encoding="utf-8").splitlines()
+        return [json.loads(line)["file"] for line in lines]
+    converted = []
+    original_convert_file = converter.convert_file
+    
+    def spy(html_file):
+        converted.append(html_file.name)
+        return original_convert_file(html_file)
+    
+    converter.convert_file = spy
+    
+    rebuilds = []
+    rebuilt = threading.Event()
+    stop = threading.Event()
+    
+    def on_rebuild():
+        rebuilds.append(list(converted))
+        rebuilt.set()
+    
+    thread = threading.Thread(
+        target=watch,
+        args=(converter,),
+        kwargs={
+            "debounce": 0.1,
+            "poll": poll,
+            "interval": 0.05,
+            "stop_event": stop,
+            "on_rebuild": on_rebuild,
+            "trace_file": trace_file,
+        },
+    )
+    thread.start()
+    try:
+        assert rebuilt.wait(10)
+        assert rebuilds == [[sample_html_file.name]]
+        assert traced_files() == [sample_html_file.name]
+        rebuilt.clear()
+        converted.clear()
+        
+        # Give the watcher time to start before saving a new chapter
+        threading.Event().wait(0.3)
+        second_file = temp_dir / "1.1.2 - Test Chapter.html"
+        second_file.write_text(
+            sample_html_file.read_text(encoding="utf-8").replace("1.1.1", "1.1.2"),
+            encoding="utf-8",
+        )
+        
+        assert rebuilt.wait(10)
+        assert rebuilds[-1] == [second_file.name]
+        assert traced_files() == [sample_html_file.name, second_file.name]
+        assert len(list(output_dir.glob("*.md"))) == 2
+    finally:
+        stop.set()
+        thread.join(10)
+    assert not thread.is_alive()
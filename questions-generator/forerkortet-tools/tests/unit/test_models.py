@@ -102,6 +102,37 @@ class TestQuestionModels:
         assert chapter.title == "Test Chapter"
         assert chapter.chapter_number == "1.1"
         assert len(chapter.subsections) == 1
+    
+    def test_lazy_chapter_content(self):
+        """Test that lazy ChapterContent fields are computed once, on first access."""
+        calls = []
+        
+        def load_subsections():
+            calls.append("subsections")
+            return [{"title": "Sub1", "content": "Content1"}]
+        
+        chapter = ChapterContent.lazy(
+            {"metadata": lambda: {"key": "value"}, "subsections": load_subsections},
+            title="Test Chapter",
+            chapter_number="1.1",
+            content="Test content",
+        )
+        
+        assert chapter.content == "Test content"
+        assert calls == []
+        assert chapter.subsections[0]["title"] == "Sub1"
+        assert chapter.subsections[0]["content"] == "Content1"
+        assert calls == ["subsections"]
+        
+        eager = ChapterContent(
+            title="Test Chapter",
+            chapter_number="1.1",
+            content="Test content",
+            metadata={"key": "value"},
+            subsections=[{"title": "Sub1", "content": "Content1"}]
+        )
+        assert chapter == eager
+        assert ChapterContent.model_validate_json(chapter.model_dump_json()) == eager
 
 
 class TestRoadSignModels:
@@ -0,0 +1,141 @@
+"""Unit tests for the adaptive request scheduler."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from forerkortet_tools.question_generator import rate_limiter
+from forerkortet_tools.question_generator.rate_limiter import (
+    AdaptiveScheduler,
+    parse_duration,
+    request_tokens,
+)
+
+
+def _error(status, headers=None):
+    response = httpx.Response(
+        status, headers=headers or {}, request=httpx.Request("POST", "https://example.invalid")
+    )
+    error_class = openai.RateLimitError if status == 429 else openai.APIStatusError
+    return error_class(f"status {status}", response=response, body=None)
+
+
+def _ok(headers=None):
+    return SimpleNamespace(headers=headers or {})
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "BACKOFF_BASE", 0.001)
+
+
+def test_run_retries_rate_limits_and_adapts_concurrency():
+    """Test that 429s are retried after backing off, halving the requests in flight."""
+    scheduler = AdaptiveScheduler(max_concurrency=8, initial_concurrency=4)
+    outcomes = [_error(429, {"retry-after-ms": "5"}), _error(503), _ok()]
+
+    def send():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert scheduler.run(send, tokens=10) is not None
+    assert (scheduler.retried, scheduler.rate_limited, scheduler.completed) == (2, 1, 1)
+    assert scheduler.concurrency == 2.5
+    assert scheduler.in_flight == 0
+
+    for _ in range(60):
+        scheduler.run(_ok, tokens=10)
+    assert scheduler.concurrency == 8
+
+
+def test_run_gives_up_on_errors_that_wont_go_away():
+    """Test that client errors aren't retried, and retries are bounded."""
+    scheduler = AdaptiveScheduler(max_retries=2)
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise _error(400)
+
+    with pytest.raises(openai.APIStatusError):
+        scheduler.run(bad_request, tokens=1)
+    assert len(calls) == 1
+
+    async def unavailable():
+        calls.append(1)
+        raise _error(500)
+
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(scheduler.arun(unavailable, tokens=1))
+    assert len(calls) == 1 + 3
+    assert scheduler.in_flight == 0
+
+
+def test_budgets_follow_rate_limit_headers():
+    """Test that requests wait for the budgets the deployment reports."""
+    scheduler = AdaptiveScheduler()
+    assert scheduler.try_acquire(500) == 0
+    scheduler.release(
+        {
+            "x-ratelimit-limit-requests": "60",
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-limit-tokens": "6000",
+            "x-ratelimit-remaining-tokens": "100",
+        },
+        200,
+    )
+
+    # 6000 tokens per minute refill 100 tokens a second
+    assert scheduler.try_acquire(100) == 0
+    assert 0.9 < scheduler.try_acquire(100) <= 1.0
+    assert "60 RPM / 6000 TPM" in scheduler.summary()
+
+
+def test_request_estimates():
+    """Test the parsing of reset durations and the token estimate of requests."""
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("250ms") == 0.25
+    assert parse_duration("2") == 2
+    assert parse_duration("soon") is None
+
+    request = {
+        "messages": [
+            {"role": "system", "content": "Du er en lærer."},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "Hva betyr skiltet?"},
+                    {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}},
+                ],
+            },
+        ],
+        "max_tokens": 4000,
+    }
+    assert request_tokens(request) == 4000 + 6 + 6 + rate_limiter.IMAGE_TOKENS
+
+
+def test_road_signs_share_the_concurrency_limit(monkeypatch, temp_dir):
+    """Test that road sign runs are paced to --concurrency and report failed requests."""
+    from forerkortet_tools.question_generator.road_signs_generator import (
+        RoadSignsQuestionGenerator,
+    )
+
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+    generator = RoadSignsQuestionGenerator(concurrency=3)
+    assert generator.openai_client.scheduler.max_concurrency == 3
+
+    def bad_request(**kwargs):
+        raise _error(400)
+
+    generator.openai_client.generate_road_sign_questions = bad_request
+    image_file = temp_dir / "sign.png"
+    image_file.write_bytes(b"png")
+    sign = {"id": "100", "name": "100 Farlig sving", "image_file": str(image_file)}
+    with pytest.raises(openai.APIStatusError):
+        generator._generate_question_for_sign(sign, require_descriptions=False)
@@ -0,0 +1,116 @@
+"""Unit tests for the response cache."""
+
+import json
+import os
+import time
+from types import SimpleNamespace
+
+from forerkortet_tools.question_generator.models import ChapterContent
+from forerkortet_tools.question_generator.openai_client import QuestionGeneratorClient
+from forerkortet_tools.question_generator.response_cache import ResponseCache, request_key
+
+
+class FakeOpenAI:
+    """Stands in for OpenAI, counting requests."""
+
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+        raw = SimpleNamespace(create=self.create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.content)
+        response = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+
+def _request(image="aGVp", temperature=0.7):
+    return {
+        "model": "gpt-4",
+        "messages": [
+            {"role": "user", "content": [{"type": "image_url", "image_url": {"url": image}}]}
+        ],
+        "temperature": temperature,
+        "max_tokens": 4000,
+    }
+
+
+def _client(monkeypatch, cache, content):
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+    fake = FakeOpenAI(content)
+    monkeypatch.setattr(
+        QuestionGeneratorClient, "azure_client_class", staticmethod(lambda **kwargs: fake)
+    )
+    return QuestionGeneratorClient(cache=cache), fake
+
+
+def test_cache_modes(temp_dir):
+    """Test that each mode reads and stores responses as documented."""
+    request = _request()
+    assert request_key(request) == request_key(_request())
+    assert request_key(request) != request_key(_request(image="aGVq"))
+    assert request_key(request) != request_key(_request(temperature=0.2))
+
+    ResponseCache(temp_dir, mode="read").put(request, "svar")
+    assert ResponseCache(temp_dir, mode="write").get(request) is None
+
+    ResponseCache(temp_dir, mode="write").put(request, "svar")
+    assert ResponseCache(temp_dir, mode="read").get(request) == "svar"
+    assert ResponseCache(temp_dir, mode="refresh").get(request) is None
+    assert ResponseCache(temp_dir, mode="off").get(request) is None
+
+    ResponseCache(temp_dir, mode="refresh").put(request, "nytt svar")
+    cache = ResponseCache(temp_dir, mode="write")
+    assert cache.get(request) == "nytt svar"
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    ResponseCache(temp_dir, mode="read").discard(request)
+    assert cache.get(request) == "nytt svar"
+    cache.discard(request)
+    assert cache.get(request) is None
+
+
+def test_eviction_by_age_and_size(temp_dir):
+    """Test that expired entries go first, then the least recently used."""
+    cache = ResponseCache(temp_dir)
+    for i in range(4):
+        cache.put(_request(image=str(i)), "x" * 1000)
+    paths = [cache._path(request_key(_request(image=str(i)))) for i in range(4)]
+    now = time.time()
+    for i, path in enumerate(paths):
+        os.utime(path, (now - 3600 * (4 - i), now - 3600 * (4 - i)))
+    os.utime(paths[0], (now - 40 * 86400, now - 40 * 86400))
+
+    assert ResponseCache(temp_dir, max_size_mb=2500 / 1024 / 1024).evict() == 2
+    assert [path.exists() for path in paths] == [False, False, True, True]
+
+
+def test_rerun_makes_no_api_calls(monkeypatch, temp_dir):
+    """Test that an identical run is answered entirely from the cache."""
+    chapter = ChapterContent(
+        title="Vikeplikt", chapter_number="1.1", content="Tekst om vikeplikt."
+    )
+    content = json.dumps([
+        {"question": "Hva er vikeplikt?", "correct_answer": "Slipp frem", "incorrect_answers": ["Kjør"]}
+    ])
+
+    client, fake = _client(monkeypatch, ResponseCache(temp_dir), content)
+    first = client.generate_questions(chapter, num_questions=1)
+    assert fake.calls == 1
+
+    cache = ResponseCache(temp_dir, mode="read")
+    client, fake = _client(monkeypatch, cache, content)
+    second = client.generate_questions(chapter, num_questions=1)
+    assert fake.calls == 0
+    assert cache.hits == 1
+    assert [q.question for q in second] == [q.question for q in first] == ["Hva er vikeplikt?"]
+
+    # Unusable responses aren't kept
+    client, fake = _client(monkeypatch, ResponseCache(temp_dir, mode="refresh"), "Beklager")
+    assert client.generate_questions(chapter, num_questions=1) == []
+    client, fake = _client(monkeypatch, ResponseCache(temp_dir), content)
+    client.generate_questions(chapter, num_questions=1)
+    assert fake.calls == 1
@@ -0,0 +1,88 @@
+"""Unit tests for sample-question extraction."""
+
+import html
+import json
+
+from forerkortet_tools.question_generator.sample_questions import (
+    explanation_to_markdown,
+    extract_questions,
+    extract_sample_questions,
+    load_sample_questions,
+)
+
+EXPLANATION = (
+    '<p><a href="#" class="howl-button"><span class="sm2-sound-text notranslate">'
+    "**Du må avstå fra alkohol i 6 timer.**</span></a> <b>Du må avstå fra alkohol i 6 timer.</b></p>"
+    '<a class="card fancybox" href="#"><img src="sign.webp"></a>'
+    '<ul><li><a href="#" class="howl-button"><span class="sm2-sound-text">Skilt A</span></a> Skilt A</li>'
+    '<li><a href="#" class="howl-button"><span class="sm2-sound-text">Skilt B</span></a> Skilt B</li></ul>'
+)
+
+
+def _question(question_id, answers, correct=1):
+    return {
+        "id": question_id,
+        "question": f"Spørsmål {question_id}?",
+        "explanation": EXPLANATION,
+        "chapter_name": "Offentlige reaksjoner",
+        "answers": [{"answer": text, "value": value} for text, value in answers],
+        "correct_answer": correct,
+        "correct_answer_array": [correct],
+        "image": {"normal": "https://example.com/image.webp"},
+    }
+
+
+def _write_page(path, questions):
+    exam = json.dumps({"id": 1, "questions": questions})
+    path.write_text(
+        f"<v-exam :exam-id=\"1\"\n    exam='{html.escape(exam, quote=True)}'></v-exam>",
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_extract_questions(temp_dir):
+    """Test that a page's exam is parsed into Question models."""
+    page = _write_page(temp_dir / "1.html", [_question(10, [("6 timer", 1), ("12 timer", 2)])])
+
+    [question] = extract_questions(page)
+
+    assert question.id == "sample-10"
+    assert question.question == "Spørsmål 10?"
+    assert [(a.text, a.is_correct) for a in question.answers] == [("6 timer", True), ("12 timer", False)]
+    assert question.category == "Offentlige reaksjoner"
+    assert question.image_url == "https://example.com/image.webp"
+    assert question.explanation == "**Du må avstå fra alkohol i 6 timer.**\n\n- Skilt A\n- Skilt B"
+
+
+def test_page_without_exam(temp_dir):
+    """Test that pages without an exam give no questions."""
+    page = temp_dir / "empty.html"
+    page.write_text("<html><body><p>Ingen prøve</p></body></html>", encoding="utf-8")
+
+    assert extract_questions(page) == []
+    assert explanation_to_markdown(None) is None
+
+
+def test_extract_sample_questions_deduplicates(temp_dir):
+    """Test that repeated and reshuffled questions are written once, in page order."""
+    first = _write_page(temp_dir / "1.html", [
+        _question(10, [("6 timer", 1), ("12 timer", 2)]),
+        _question(11, [("Ja", 1), ("Nei", 2)]),
+    ])
+    second = _write_page(temp_dir / "2.html", [
+        # Same question, answers in another order
+        _question(10, [("12 timer", 2), ("6 timer", 1)]),
+        _question(12, [("Høyre", 1), ("Venstre", 2)], correct=2),
+    ])
+    corpus = temp_dir / "corpus" / "sample.jsonl"
+
+    assert extract_sample_questions([first, second], corpus) == (3, 1)
+
+    questions = load_sample_questions(corpus)
+    assert [q.id for q in questions] == ["sample-10", "sample-11", "sample-12"]
+    assert questions[2].get_correct_answer().text == "Venstre"
+
+    parallel_corpus = temp_dir / "parallel.jsonl"
+    assert extract_sample_questions([first, second], parallel_corpus, jobs=2) == (3, 1)
+    assert parallel_corpus.read_text(encoding="utf-8") == corpus.read_text(encoding="utf-8")
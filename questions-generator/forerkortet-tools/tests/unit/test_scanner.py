@@ -0,0 +1,91 @@
+"""Unit tests for the asset-skipping directory scanner."""
+
+import os
+
+from forerkortet_tools.utils import scanner as scanner_module
+from forerkortet_tools.utils.scanner import DirectoryScanner
+
+
+def _make_book(root):
+    """Create a small saved theory book with asset folders."""
+    (root / "1.1 - Intro.html").write_text("<html></html>", encoding="utf-8")
+    (root / "1.2 - Regler.html").write_text("<html></html>", encoding="utf-8")
+    (root / "saved_resource.html").write_text("", encoding="utf-8")
+    (root / "1.1 - Intro_files").mkdir()
+    (root / "1.1 - Intro_files" / "frame.html").write_text("", encoding="utf-8")
+    (root / "1.1 - Intro_files" / "app.js").write_text("", encoding="utf-8")
+    (root / "bok2").mkdir()
+    (root / "bok2" / "2.1 - Skilt.html").write_text("<html></html>", encoding="utf-8")
+    (root / "bok2" / "2.1 - Skilt_files").mkdir()
+
+
+class TestDirectoryScanner:
+    """Test directory scanning and listing cache."""
+
+    def test_finds_top_level_files(self, temp_dir):
+        """Test that only top-level matches outside asset folders are found."""
+        _make_book(temp_dir)
+        scanner = DirectoryScanner(temp_dir, ".html", exclude=("_files", "saved_resource"))
+
+        assert [p.name for p in scanner.scan()] == ["1.1 - Intro.html", "1.2 - Regler.html"]
+
+    def test_recursive_scan_prunes_asset_folders(self, temp_dir, monkeypatch):
+        """Test that a recursive walk never lists a *_files folder."""
+        _make_book(temp_dir)
+        listed = []
+        real_scandir = os.scandir
+
+        def recording_scandir(path):
+            listed.append(os.path.basename(path))
+            return real_scandir(path)
+
+        monkeypatch.setattr(scanner_module.os, "scandir", recording_scandir)
+        monkeypatch.setattr(scanner_module, "_listing_cache", {})
+
+        found = DirectoryScanner(temp_dir, ".html", recursive=True).scan()
+
+        assert [p.relative_to(temp_dir).as_posix() for p in found] == [
+            "1.1 - Intro.html",
+            "1.2 - Regler.html",
+            "bok2/2.1 - Skilt.html",
+            "saved_resource.html",
+        ]
+        assert not any(name.endswith("_files") for name in listed)
+
+    def test_listing_is_cached_until_directory_changes(self, temp_dir, monkeypatch, age):
+        """Test that unchanged directories are not listed again."""
+        _make_book(temp_dir)
+        age(temp_dir)
+        calls = []
+        real_scandir = os.scandir
+
+        def counting_scandir(path):
+            calls.append(path)
+            return real_scandir(path)
+
+        monkeypatch.setattr(scanner_module.os, "scandir", counting_scandir)
+        monkeypatch.setattr(scanner_module, "_listing_cache", {})
+        scanner = DirectoryScanner(temp_dir, ".html", exclude=("_files", "saved_resource"))
+
+        first = scanner.scan()
+        assert scanner.scan() == first
+        assert len(calls) == 1
+
+        (temp_dir / "1.3 - Nye regler.html").write_text("<html></html>", encoding="utf-8")
+        # A different, still old mtime, as a coarse clock could leave it unchanged
+        os.utime(temp_dir, (1_100_000_000, 1_100_000_000))
+
+        assert [p.name for p in scanner.scan()][-1] == "1.3 - Nye regler.html"
+        assert len(calls) == 2
+
+    def test_missing_directory_has_no_files(self, temp_dir):
+        """Test that scanning a missing directory returns nothing."""
+        assert DirectoryScanner(temp_dir / "missing", ".md").scan() == []
+
+    def test_snapshot_reports_mtime_and_size(self, temp_dir):
+        """Test that the snapshot has the stat of every matching file."""
+        _make_book(temp_dir)
+        snapshot = DirectoryScanner(temp_dir, ".html", exclude=("saved_resource",)).snapshot()
+
+        intro = temp_dir / "1.1 - Intro.html"
+        assert snapshot[intro] == (intro.stat().st_mtime_ns, len("<html></html>"))
@@ -0,0 +1,61 @@
+"""Unit tests for the theory book search index."""
+
+from forerkortet_tools.question_generator.models import Answer, Question
+from forerkortet_tools.question_generator.search import (
+    HIGHLIGHT_START,
+    TheorySearchIndex,
+    build_match_query,
+)
+
+
+def test_search_ranks_subsections(sample_markdown_file, temp_dir):
+    """Test that searches return the best matching subsection first."""
+    index = TheorySearchIndex(temp_dir)
+    assert index.update() == (1, 0)
+
+    passages = index.search("safety vehicle")
+
+    assert [passage.section for passage in passages] == ["Subsection 2"]
+    assert passages[0].chapter_number == "1.1.1"
+    assert passages[0].chapter_title == "Test Chapter"
+    assert HIGHLIGHT_START + "Safety" in passages[0].snippet
+    assert len(index.search("content")) == 3
+    assert index.search("safety traffic", match_all=True) == []
+    assert index.search("traf*")[0].section == "Subsection 1"
+
+    question = Question(
+        question="What is paramount when operating a vehicle?",
+        answers=[Answer(text="Safety", is_correct=True), Answer(text="Speed", is_correct=False)],
+    )
+    assert index.passages_for_question(question)[0].section == "Subsection 2"
+    index.close()
+
+
+def test_update_only_reindexes_changed_chapters(sample_markdown_file, temp_dir, age):
+    """Test that the index is kept up to date incrementally across runs."""
+    age(sample_markdown_file, seconds=120)
+    TheorySearchIndex(temp_dir).update()
+
+    index = TheorySearchIndex(temp_dir)
+    assert index.update() == (0, 0)
+
+    sample_markdown_file.write_text(
+        sample_markdown_file.read_text(encoding="utf-8").replace("Safety", "Visibility"),
+        encoding="utf-8",
+    )
+    age(sample_markdown_file)
+    assert index.update() == (1, 0)
+    assert index.search("safety") == []
+    assert index.search("visibility")[0].section == "Subsection 2"
+
+    sample_markdown_file.unlink()
+    assert index.update() == (0, 1)
+    assert index.search("visibility") == []
+    index.close()
+
+
+def test_build_match_query_ignores_operators():
+    """Test that free text can't inject FTS5 syntax."""
+    assert build_match_query('Hva er "NEAR" (fart)?') == '"hva" OR "er" OR "near" OR "fart"'
+    assert build_match_query("vike* plikt", match_all=True) == '"vike"* AND "plikt"'
+    assert build_match_query("?!") is None
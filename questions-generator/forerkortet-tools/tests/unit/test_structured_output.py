@@ -0,0 +1,112 @@
+"""Unit tests for structured output and incremental response parsing."""
+
+import json
+from types import SimpleNamespace
+
+from forerkortet_tools.question_generator.models import ChapterContent, GeneratedQuestions
+from forerkortet_tools.question_generator.openai_client import QuestionGeneratorClient
+from forerkortet_tools.question_generator.response_cache import ResponseCache
+from forerkortet_tools.question_generator.structured_output import (
+    QUESTIONS_RESPONSE_FORMAT,
+    QuestionStreamParser,
+    parse_questions,
+)
+
+
+def _question(number):
+    return {
+        "question": f'Hva betyr "skilt {number}" {{og}} [dette]?',
+        "correct_answer": "Riktig \\ svar",
+        "incorrect_answers": ["Feil", "Også feil"],
+        "explanation": "Fordi.",
+        "category": "Trafikkskilt",
+        "difficulty": "easy",
+    }
+
+
+def test_parser_yields_questions_as_they_complete():
+    """Test that questions come out once complete, and a cut-off tail is dropped."""
+    response = json.dumps({"questions": [_question(i) for i in range(3)]}, ensure_ascii=False)
+    truncated = response[: response.index("skilt 2")]
+
+    parser = QuestionStreamParser()
+    yielded_at = []
+    for end in range(7, len(truncated) + 7, 7):
+        yielded_at.extend(end for _ in parser.feed(truncated[end - 7 : end]))
+
+    assert len(yielded_at) == 2
+    # The first question is out before any of the second one is fed
+    assert yielded_at[0] <= response.index("skilt 1")
+    assert GeneratedQuestions.model_validate_json(response).questions[2].difficulty == "easy"
+
+    # Only the first array holds questions
+    assert parse_questions('[{"a": 1}] Se også: [{"c": 1}]') == [{"a": 1}]
+
+
+def test_parse_response_keeps_complete_questions(monkeypatch):
+    """Test that truncated and partly malformed responses keep their good questions."""
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+    client = QuestionGeneratorClient()
+    chapter = ChapterContent(title="Skilt", chapter_number="2.1", content="Tekst.")
+
+    items = [_question(0), {"question": "Mangler svar?"}, _question(2), _question(3)]
+    response = "```json\n" + json.dumps(items, ensure_ascii=False) + "\n```"
+    questions = client._parse_response(response[: response.index("skilt 3")], chapter)
+
+    assert [q.question for q in questions] == [
+        'Hva betyr "skilt 0" {og} [dette]?',
+        'Hva betyr "skilt 2" {og} [dette]?',
+    ]
+    assert questions[0].get_correct_answer().text == "Riktig \\ svar"
+    assert questions[0].chapter == "2.1"
+    assert client._parse_response("Beklager, det kan jeg ikke.", chapter) == []
+
+
+def test_structured_output_requests_schema(monkeypatch):
+    """Test that structured output mode sends the strict schema of the questions."""
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+    chapter = ChapterContent(title="Skilt", chapter_number="2.1", content="Tekst.")
+
+    [request] = QuestionGeneratorClient()._chapter_requests(chapter, 2, 3)
+    assert "response_format" not in request
+
+    [request] = QuestionGeneratorClient(structured_output=True)._chapter_requests(chapter, 2, 3)
+    assert request["response_format"] is QUESTIONS_RESPONSE_FORMAT
+    schema = QUESTIONS_RESPONSE_FORMAT["json_schema"]["schema"]
+    item = schema["$defs"]["GeneratedQuestion"]
+    assert QUESTIONS_RESPONSE_FORMAT["json_schema"]["strict"]
+    assert schema["additionalProperties"] is item["additionalProperties"] is False
+    assert sorted(item["required"]) == sorted(item["properties"])
+
+
+def test_refused_and_truncated_responses_arent_cached(monkeypatch, temp_dir):
+    """Test that refusals give no questions, and cut-off responses are used uncached."""
+    monkeypatch.setenv("AZURE_OPENAI_KEY", "test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+    chapter = ChapterContent(title="Skilt", chapter_number="2.1", content="Tekst.")
+    cache = ResponseCache(temp_dir)
+    client = QuestionGeneratorClient(structured_output=True, cache=cache)
+    [request] = client._chapter_requests(chapter, 2, 3)
+
+    def respond(content, finish_reason, refusal=None):
+        message = SimpleNamespace(content=content, refusal=refusal)
+        choice = SimpleNamespace(message=message, finish_reason=finish_reason)
+        raw_response = SimpleNamespace(headers={}, parse=lambda: SimpleNamespace(choices=[choice]))
+        raw = SimpleNamespace(create=lambda **kwargs: raw_response)
+        completions = SimpleNamespace(with_raw_response=raw)
+        client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    respond(None, "stop", refusal="Det kan jeg ikke hjelpe med.")
+    assert client.generate_questions(chapter, 2, 3) == []
+    assert cache.get(request) is None
+
+    response = json.dumps({"questions": [_question(0), _question(1)]}, ensure_ascii=False)
+    respond(response[: response.index("skilt 1")], "length")
+    assert len(client.generate_questions(chapter, 2, 3)) == 1
+    assert cache.get(request) is None
+
+    respond(response, "stop")
+    assert len(client.generate_questions(chapter, 2, 3)) == 2
+    assert cache.get(request) == response